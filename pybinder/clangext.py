@@ -20,9 +20,111 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+from array import array
+from ctypes import byref, c_int, c_uint, c_void_p, cast, sizeof
+from functools import lru_cache
+
 import clang
+from clang.cindex import (Cursor, CursorKind, File, SourceRange, Type,
+                          _CXString, c_object_p, conf)
+
+__all__ = ['monkeypatch_type', 'monkeypatch_cursor', 'get_clang_version',
+           'cursor_key', 'type_key', 'extent_key', 'extract_columns',
+           'CursorColumns', 'CymbalException']
+
+try:
+    cursor_visit_callback = clang.cindex.cursor_visit_callback
+except AttributeError:
+    # Older bindings
+    cursor_visit_callback = clang.cindex.callbacks['cursor_visit']
+
+# Result of the visitor to continue with the children of a cursor
+CXChildVisit_Recurse = 2
+
+# Range of reference cursor kinds and kinds of null cursors
+FIRST_REF = CursorKind.OBJC_SUPER_CLASS_REF.value
+LAST_REF = CursorKind.VARIABLE_REF.value
+NULL_KINDS = frozenset([CursorKind.INVALID_FILE.value,
+                        CursorKind.NO_DECL_FOUND.value,
+                        CursorKind.NOT_IMPLEMENTED.value,
+                        CursorKind.INVALID_CODE.value])
+
+
+def _layout(cls):
+    """
+    Get the names and sizes of the fields of a ctypes structure.
+    """
+    return [(name, sizeof(type_)) for name, type_ in cls._fields_]
+
+
+# The keys are read from the fields of the libclang structures when the
+# bindings lay them out as expected, otherwise from the public API
+RAW_KEYS = (
+    _layout(Cursor) == [('_kind_id', sizeof(c_int)), ('xdata', sizeof(c_int)),
+                        ('data', 3 * sizeof(c_void_p))] and
+    _layout(Type) == [('_kind_id', sizeof(c_int)),
+                      ('data', 2 * sizeof(c_void_p))] and
+    _layout(SourceRange) == [('ptr_data', 2 * sizeof(c_void_p)),
+                             ('begin_int_data', sizeof(c_uint)),
+                             ('end_int_data', sizeof(c_uint))])
 
-__all__ = ['monkeypatch_type', 'monkeypatch_cursor', 'CymbalException']
+
+@lru_cache(maxsize=None)
+def declaration_kinds():
+    """
+    Get the ids of the declaration cursor kinds. Found when first needed so
+    the libclang library is not loaded on import.
+    """
+    return frozenset(kind.value for kind in CursorKind.get_all_kinds()
+                     if kind.is_declaration())
+
+
+def cursor_key(cursor):
+    """
+    Get a key that identifies a cursor the same way clang_equalCursors does.
+    Unlike the cursor hash, different cursors never share a key.
+    :param clang.cindex.Cursor cursor: The cursor.
+    :return: The key.
+    :rtype: tuple
+    """
+    if not RAW_KEYS:
+        start, end = cursor.extent.start, cursor.extent.end
+        return (cursor.kind.value, cursor.hash, cursor.get_usr(),
+                cursor.spelling, start.file and start.file.name,
+                start.offset, end.offset)
+    data = cursor.data
+    # The second pointer is not set consistently for declarations
+    if cursor._kind_id in declaration_kinds():
+        return cursor._kind_id, cursor.xdata, data[0], data[2]
+    return cursor._kind_id, cursor.xdata, data[0], data[1], data[2]
+
+
+def type_key(type_):
+    """
+    Get a key that identifies a type.
+    :param clang.cindex.Type type_: The type.
+    :return: The key.
+    :rtype: tuple
+    """
+    if not RAW_KEYS:
+        decl = type_.get_declaration()
+        return (type_.kind.value, type_.spelling,
+                cursor_key(decl) if decl.kind.value else None)
+    return type_._kind_id, type_.data[0], type_.data[1]
+
+
+def extent_key(extent):
+    """
+    Get a key that identifies a source range.
+    :param clang.cindex.SourceRange extent: The source range.
+    :return: The key.
+    :rtype: tuple
+    """
+    if not RAW_KEYS:
+        start, end = extent.start, extent.end
+        return start.file and start.file.name, start.offset, end.offset
+    return (extent.ptr_data[0], extent.ptr_data[1], extent.begin_int_data,
+            extent.end_int_data)
 
 
 def find_libclang_function(function_):
@@ -56,3 +158,190 @@ def monkeypatch_type(method_name, library_function, args, result):
 def monkeypatch_cursor(method_name, library_function, args, result):
     monkeypatch_helper(clang.cindex.Cursor, method_name, library_function,
                        args, result)
+
+
+def get_clang_version():
+    """
+    Get the version string of the loaded libclang library.
+    """
+    f = find_libclang_function('clang_getClangVersion')
+    f.argtypes = []
+    f.restype = clang.cindex._CXString
+    version = clang.cindex._CXString.from_result(f())
+    if isinstance(version, bytes):
+        version = version.decode()
+    return version
+
+
+def to_str(result):
+    """
+    Convert the result of a libclang function returning a CXString. Older
+    bindings already convert it.
+    """
+    if isinstance(result, _CXString):
+        return _CXString.from_result(result)
+    return result
+
+
+class CursorColumns(object):
+    """
+    Attributes of cursors in columns, one row per cursor. Each extracted
+    subtree is stored in depth-first preorder starting with its root.
+    :ivar array.array kind: The cursor kind ids.
+    :ivar array.array parent: Row of the parent cursor in the walk or -1 for
+        a root.
+    :ivar array.array end: Row following the last descendant of the cursor.
+    :ivar array.array file: Index into *files* of the file of the cursor
+        location or -1 if it has none.
+    :ivar array.array line: The line of the cursor location.
+    :ivar array.array access: The access specifier ids.
+    :ivar array.array spelling: Index into *strings* of the spelling.
+    :ivar array.array usr: Index into *strings* of the USR or -1 if not
+        extracted.
+    :ivar array.array referenced: Index into *strings* of the USR of the
+        cursor a reference refers to or -1.
+    :ivar array.array referenced_file: Index into *files* of the file of the
+        cursor a reference refers to or -1.
+    :ivar list(str) files: The file names.
+    :ivar list(str) strings: The spellings and USRs.
+    """
+
+    def __init__(self):
+        self.kind = array('i')
+        self.parent = array('i')
+        self.end = array('i')
+        self.file = array('i')
+        self.line = array('i')
+        self.access = array('i')
+        self.spelling = array('i')
+        self.usr = array('i')
+        self.referenced = array('i')
+        self.referenced_file = array('i')
+        self.files = []
+        self.strings = []
+        self._file_ids = {}
+        self._string_ids = {}
+
+    def __len__(self):
+        return len(self.kind)
+
+    def string_id(self, s):
+        """
+        Get the index of a string in *strings*, adding it if needed.
+        :param str s: The string.
+        :return: The index.
+        :rtype: int
+        """
+        try:
+            return self._string_ids[s]
+        except KeyError:
+            i = self._string_ids[s] = len(self.strings)
+            self.strings.append(s)
+            return i
+
+    def file_id(self, name):
+        """
+        Get the index of a file name in *files*, adding it if needed.
+        :param str name: The file name.
+        :return: The index.
+        :rtype: int
+        """
+        try:
+            return self._file_ids[name]
+        except KeyError:
+            i = self._file_ids[name] = len(self.files)
+            self.files.append(name)
+            return i
+
+
+def extract_columns(cursor, usr=False, references=False, columns=None):
+    """
+    Walk a cursor and all of its descendants with a single call into libclang
+    and gather their attributes into columns. No Cursor objects are kept.
+
+    .. note:: The rows follow the recursive visit of libclang which may
+        include implicit expression cursors that *get_children* of an
+        expression does not return. Declarations and references match.
+
+    :param clang.cindex.Cursor cursor: The root cursor.
+    :param bool usr: Option to extract the USR of each cursor.
+    :param bool references: Option to extract the USR and file of the cursor
+        each reference refers to.
+    :param pybinder.clangext.CursorColumns columns: Columns to append the
+        rows to. New columns are created if not given.
+    :return: The columns.
+    :rtype: pybinder.clangext.CursorColumns
+    """
+    lib = conf.lib
+    if columns is None:
+        columns = CursorColumns()
+    kinds, parents = columns.kind, columns.parent
+    files, lines = columns.file, columns.line
+    accesses, spellings, usrs = columns.access, columns.spelling, columns.usr
+    referenced, referenced_files = columns.referenced, columns.referenced_file
+    string_id = columns.string_id
+    first = len(kinds)
+    rows = {}
+    file_ids = {}
+    f, line, column, offset = c_object_p(), c_uint(), c_uint(), c_uint()
+    errors = []
+
+    def location_file(c):
+        loc = lib.clang_getCursorLocation(c)
+        lib.clang_getInstantiationLocation(loc, byref(f), byref(line),
+                                           byref(column), byref(offset))
+        if not f:
+            return -1
+        address = cast(f, c_void_p).value
+        try:
+            return file_ids[address]
+        except KeyError:
+            file_id = file_ids[address] = columns.file_id(File(f).name)
+            return file_id
+
+    def add(c, parent_row):
+        rows[bytes(c)] = len(kinds)
+        kinds.append(c._kind_id)
+        parents.append(parent_row)
+        files.append(location_file(c))
+        lines.append(line.value)
+        accesses.append(lib.clang_getCXXAccessSpecifier(c))
+        spellings.append(string_id(to_str(lib.clang_getCursorSpelling(c))))
+        if usr:
+            usrs.append(string_id(to_str(lib.clang_getCursorUSR(c))))
+        else:
+            usrs.append(-1)
+        if references and FIRST_REF <= c._kind_id <= LAST_REF:
+            ref = lib.clang_getCursorReferenced(c)
+            if ref is None or ref._kind_id in NULL_KINDS:
+                referenced.append(-1)
+                referenced_files.append(-1)
+            else:
+                referenced.append(
+                    string_id(to_str(lib.clang_getCursorUSR(ref))))
+                referenced_files.append(location_file(ref))
+        else:
+            referenced.append(-1)
+            referenced_files.append(-1)
+
+    def visitor(child, parent, _):
+        try:
+            add(child, rows[bytes(parent)])
+        except Exception as e:
+            errors.append(e)
+            return 0
+        return CXChildVisit_Recurse
+
+    add(cursor, -1)
+    lib.clang_visitChildren(cursor, cursor_visit_callback(visitor), None)
+    if errors:
+        raise errors[0]
+
+    # Extent of each subtree from the parent rows
+    ends = [i + 1 for i in range(first, len(kinds))]
+    for i in range(len(kinds) - 1, first, -1):
+        p = parents[i] - first
+        if ends[i - first] > ends[p]:
+            ends[p] = ends[i - first]
+    columns.end.extend(ends)
+    return columns
@@ -21,16 +21,30 @@ import os
 import re
 import sys
 import io
+import json
 import hashlib
+import multiprocessing
+import time
+import traceback
 import warnings
-from collections import OrderedDict
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from copy import deepcopy
+from heapq import heapify, heappop, heappush
+from concurrent.futures import ProcessPoolExecutor
 from ctypes import c_uint
-from fnmatch import fnmatch
-from functools import cached_property
+from fnmatch import fnmatch, translate
 from glob import glob
+from tempfile import TemporaryDirectory
+
+try:
+    import resource
+except ImportError:
+    resource = None
 
 from clang.cindex import (AccessSpecifier, Index, TranslationUnit,
-                          CursorKind, TypeKind, Cursor, LibclangError, conf)
+                          TranslationUnitLoadError, CursorKind, TypeKind,
+                          Cursor, LibclangError, conf)
 
 try:
     conf.get_cindex_library()
@@ -41,6 +55,9 @@ except LibclangError:
 
 
 from pybinder import clangext
+from pybinder.clangext import cursor_key, extent_key, type_key
+from pybinder.snapshot import write_snapshot
+from pybinder.ir import BindingIR, ModuleNode, Node, TypeNode
 from pybinder.common import SRC_PREFIX, PY_OPERATORS
 
 
@@ -61,7 +78,27 @@ clangext.monkeypatch_cursor('get_overloaded_decl',
                             'clang_getOverloadedDecl',
                             [Cursor, c_uint], Cursor)
 
-logger = open('log.txt', 'w')
+# Worker processes started by spawning import this module again and must not
+# truncate the log of the main process. They are named before the import.
+if multiprocessing.current_process().name == 'MainProcess':
+    logger = open('log.txt', 'w')
+else:
+    logger = io.StringIO()
+
+# Kinds of null cursors which are never shared between binders
+NULL_CURSOR_KINDS = frozenset([CursorKind.INVALID_FILE,
+                               CursorKind.NO_DECL_FOUND,
+                               CursorKind.NOT_IMPLEMENTED,
+                               CursorKind.INVALID_CODE])
+
+# Canonical spellings used as is for aliases. Hack for `const Standard_Address`,
+# `const Standard_Address &`, `const Standard_CString &`
+ALIAS_CANONICAL_SPELLINGS = frozenset([
+    "void *const",
+    "void *const &",
+    "const char *const &",
+    "const std::string &",
+])
 
 
 def overwrite_if_changed(path: str, source: io.StringIO):
@@ -80,6 +117,416 @@ def overwrite_if_changed(path: str, source: io.StringIO):
         f.write(data)
 
 
+def module_from_filename(fname):
+    """
+    Get the module name of a header file based on its prefix (e.g.,
+    "gp_Pnt.hxx" --> "gp").
+    :param str fname: The header file name.
+    :return: The module name.
+    :rtype: str
+    """
+    delimiter = '.'
+    if '_' in fname:
+        delimiter = '_'
+    return fname.split(delimiter)[0]
+
+
+def parse_partition(file_, args, fname, manifest=None,
+                    options=TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD):
+    """
+    Parse a header in a worker process and save the translation unit.
+    :param str file_: The header file to parse.
+    :param list(str) args: The compiler arguments.
+    :param str fname: The filename of the saved AST.
+    :param tuple manifest: The file states and start time taken before
+        parsing by *stat_files* and *time.time_ns* to also write the manifest
+        of included files used to validate a cached AST.
+    :param int options: The parse options.
+    :return: The filename of the saved AST.
+    :rtype: str
+    """
+    tu = Index.create().parse(file_, args, options=options)
+    tu.save(fname)
+    if manifest is not None:
+        write_manifest(tu, fname, *manifest)
+    return fname
+
+
+def cache_key(data, args, options):
+    """
+    Fingerprint the inputs of a parse that are known before parsing.
+    :param bytes data: The contents of the main include file.
+    :param list(str) args: The compiler arguments including include
+        directories.
+    :param int options: The parse options.
+    :return: The key.
+    :rtype: str
+    """
+    h = hashlib.sha256(data)
+    for arg in args:
+        h.update(arg.encode())
+        h.update(b'\0')
+    h.update(str(options).encode())
+    h.update(clangext.get_clang_version().encode())
+    return h.hexdigest()
+
+
+def bind_worker(func, module, path, settings=None):
+    """
+    Bind a module in a worker process. The log is captured and returned so it
+    can be written in order by the main process.
+    :param callable func: The binding function taking the module and path.
+    :param pybinder.ir.ModuleNode module: The module.
+    :param str path: The output path.
+    :param dict settings: The binding settings of the main process.
+    :return: The log.
+    :rtype: str
+    """
+    global logger
+    if settings is not None:
+        Generator.set_bind_settings(settings)
+    logger = io.StringIO()
+    func(module, path)
+    return logger.getvalue()
+
+
+def peak_memory():
+    """
+    Get the peak resident memory of this process and its finished child
+    processes since the process started.
+    :return: The peak memory in MB or *None* if not available.
+    :rtype: float
+    """
+    if resource is None:
+        return None
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # Reported in bytes on macOS and kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return usage / 1024 ** 2
+    return usage / 1024
+
+
+def stat_files(dirs):
+    """
+    Get the modification time and size of the files in directories and their
+    subdirectories. Taken before parsing so a file changed while parsing
+    invalidates the cache.
+    :param list(str) dirs: The directories.
+    :return: Dictionary of the absolute path to the modification time in
+        nanoseconds and size.
+    :rtype: dict(str, tuple(int, int))
+    """
+    stats = {}
+    stack = [os.path.abspath(dir_) for dir_ in dirs]
+    visited = set()
+    while stack:
+        dir_ = stack.pop()
+        real_dir = os.path.realpath(dir_)
+        if real_dir in visited:
+            continue
+        visited.add(real_dir)
+        try:
+            entries = os.scandir(dir_)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        st = entry.stat()
+                        stats[entry.path] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    continue
+    return stats
+
+
+def write_manifest(tu, fname, stats, start):
+    """
+    Record the modification time and size of every file included by a saved
+    translation unit as they were before parsing.
+    :param clang.cindex.TranslationUnit tu: The translation unit.
+    :param str fname: The filename of the saved AST.
+    :param dict stats: The file states taken by *stat_files* before parsing.
+    :param int start: The time the parse started in nanoseconds. Other
+        included files modified since then are never valid.
+    :return: None.
+    """
+    files = []
+    for inc in tu.get_includes():
+        path = os.path.abspath(inc.include.name)
+        try:
+            mtime, size = stats[path]
+        except KeyError:
+            st = os.stat(path)
+            mtime, size = st.st_mtime_ns, st.st_size
+            if mtime >= start:
+                mtime = -1
+        files.append([path, mtime, size])
+    with open(fname + '.json', 'w') as f:
+        json.dump({'files': files}, f)
+
+
+def is_cache_valid(fname):
+    """
+    Check that a saved AST exists and none of the files it includes changed.
+    :param str fname: The filename of the saved AST.
+    :return: *True* if valid, *False* otherwise.
+    :rtype: bool
+    """
+    if not os.path.exists(fname) or not os.path.exists(fname + '.json'):
+        return False
+    try:
+        with open(fname + '.json', 'r') as f:
+            files = json.load(f)['files']
+    except (ValueError, KeyError):
+        return False
+    for path, mtime, size in files:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if st.st_mtime_ns != mtime or st.st_size != size:
+            return False
+    return True
+
+
+class cached_slot(object):
+    """
+    Like *functools.cached_property* but for classes using *__slots__*. The
+    value is stored in the slot named after the property with a trailing
+    underscore, which the class must declare.
+    :param function func: The function computing the value.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name):
+        self.slot = getattr(owner, name + '_')
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return self.slot.__get__(instance, owner)
+        except AttributeError:
+            value = self.func(instance)
+            self.slot.__set__(instance, value)
+            return value
+
+    def __set__(self, instance, value):
+        self.slot.__set__(instance, value)
+
+
+class PatternMatcher(object):
+    """
+    Matcher for a set of *fnmatch* patterns. Patterns without wildcards are
+    checked with a set lookup and the others with a single compiled regular
+    expression. Results are cached per name.
+    :param iterable(str) patterns: The patterns.
+    """
+
+    def __init__(self, patterns=()):
+        self.exact = set()
+        wildcards = []
+        for pattern in patterns:
+            pattern = os.path.normcase(pattern)
+            # A "[" is escaped as "[[]" when reading the configuration
+            if any(c in pattern.replace('[[]', '') for c in '*?['):
+                wildcards.append(pattern)
+            else:
+                self.exact.add(pattern.replace('[[]', '['))
+        self.regex = None
+        if wildcards:
+            self.regex = re.compile('|'.join(
+                translate(pattern) for pattern in sorted(wildcards)))
+        self._results = {}
+
+    def match(self, name):
+        """
+        Check if the name matches any of the patterns.
+        :param str name: The name.
+        :return: *True* if it matches, *False* otherwise.
+        :rtype: bool
+        """
+        try:
+            return self._results[name]
+        except KeyError:
+            pass
+        normalized = os.path.normcase(name)
+        result = normalized in self.exact or (
+            self.regex is not None and
+            self.regex.match(normalized) is not None)
+        self._results[name] = result
+        return result
+
+
+class PatternSet(set):
+    """
+    Set of *fnmatch* patterns that compiles them into a *PatternMatcher* when
+    first matched after the set was created or changed.
+    :param iterable(str) patterns: The patterns.
+    """
+
+    def __init__(self, patterns=()):
+        super(PatternSet, self).__init__(patterns)
+        self._matcher = None
+
+    def __reduce__(self):
+        # The compiled matcher is not pickled
+        return self.__class__, (list(self),)
+
+    @property
+    def matcher(self):
+        """
+        :return: The matcher of the current patterns.
+        :rtype: binder.core.PatternMatcher
+        """
+        if self._matcher is None:
+            self._matcher = PatternMatcher(self)
+        return self._matcher
+
+    def match(self, name):
+        """
+        Check if the name matches any of the patterns.
+        :param str name: The name.
+        :return: *True* if it matches, *False* otherwise.
+        :rtype: bool
+        """
+        return self.matcher.match(name)
+
+
+def _invalidate_matcher(name):
+    method = getattr(set, name)
+
+    def wrapper(self, *args):
+        self._matcher = None
+        return method(self, *args)
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+for _name in ('add', 'clear', 'difference_update', 'discard',
+              'intersection_update', 'pop', 'remove',
+              'symmetric_difference_update', 'update', '__iand__', '__ior__',
+              '__isub__', '__ixor__'):
+    setattr(PatternSet, _name, _invalidate_matcher(_name))
+del _name
+
+
+class IncludeOrder(object):
+    """
+    Order of declarations as found when parsing the complete main include
+    file in a single translation unit. The include directives of the main
+    file and the available headers are followed depth first and each header
+    is only entered the first time it is included. Includes of other headers
+    are not followed and preprocessor conditions are ignored.
+    :param str file_: The main include file.
+    :param list(clang.cindex.TranslationUnit) tus: The translation units used
+        to find the included files.
+    :param set(str) available_incs: The available header file names.
+    :param list(str) dirs: The include directories to search for headers
+        that are not part of the translation units.
+    """
+
+    pattern = re.compile(r'^[ \t]*#[ \t]*include[ \t]*[<"]([^>"]+)[>"]',
+                         re.MULTILINE)
+
+    def __init__(self, file_, tus, available_incs, dirs=()):
+        paths = {}
+        for tu in tus:
+            for inc in tu.get_includes():
+                path = inc.include.name
+                paths.setdefault(path.replace('\\', '/').split('/')[-1], path)
+        self._paths = paths
+        self._dirs = [os.path.dirname(os.path.abspath(file_))] + list(dirs)
+
+        # Each file has a list of (line, sequence) checkpoints at its start
+        # and after each of its includes
+        self._lines = {}
+        self._seqs = {}
+        self._count = 0
+        main = file_.replace('\\', '/').split('/')[-1]
+        self._visit(main, file_, {main}, available_incs)
+
+    def _visit(self, name, path, visited, available_incs):
+        """
+        Enter a file and the headers it includes for the first time.
+        """
+        self._checkpoint(name, 0)
+        for line, spelling in self._includes(path):
+            inc = spelling.split('/')[-1]
+            if inc in visited or inc not in available_incs:
+                continue
+            inc_path = self._find(inc, spelling)
+            if inc_path is None:
+                continue
+            visited.add(inc)
+            self._visit(inc, inc_path, visited, available_incs)
+            self._checkpoint(name, line)
+
+    def _find(self, inc, spelling):
+        """
+        Find the path of an included header.
+        """
+        try:
+            return self._paths[inc]
+        except KeyError:
+            pass
+        for dir_ in self._dirs:
+            path = os.path.join(dir_, spelling)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def _checkpoint(self, name, line):
+        self._lines.setdefault(name, []).append(line)
+        self._seqs.setdefault(name, []).append(self._count)
+        self._count += 1
+
+    @classmethod
+    def _includes(cls, path):
+        """
+        Get the include directives of a file.
+        :param str path: The file path.
+        :return: The line numbers and the included files as spelled.
+        :rtype: list(tuple(int, str))
+        """
+        try:
+            with open(path, 'r', errors='ignore') as f:
+                txt = f.read()
+        except OSError:
+            return []
+        includes = []
+        line, pos = 1, 0
+        for match in cls.pattern.finditer(txt):
+            line += txt.count('\n', pos, match.start())
+            pos = match.start()
+            includes.append((line, match.group(1).replace('\\', '/')))
+        return includes
+
+    def key(self, binder):
+        """
+        Get the sort key of a declaration.
+        :param binder.core.CursorBinder binder: The binder.
+        :return: The key.
+        :rtype: tuple(int, int)
+        """
+        line = binder.cursor.location.line
+        try:
+            lines = self._lines[binder.filename]
+        except KeyError:
+            return self._count, line
+        i = bisect_left(lines, line) - 1
+        return self._seqs[binder.filename][max(i, 0)], line
+
+
 class MacroForHandle(object):
     """
     Special class for handling of certain macros
@@ -126,10 +573,10 @@ class Generator(object):
     available_incs = set()
     available_templates = set()
     excluded_classes = set()
-    excluded_functions = set()
-    excluded_rtypes = set()
+    excluded_functions = PatternSet()
+    excluded_rtypes = PatternSet()
     excluded_enums = set()
-    excluded_fnames = set()
+    excluded_fnames = PatternSet()
     excluded_mods = set()
     excluded_typedefs = set()
     excluded_fields = set()
@@ -148,6 +595,11 @@ class Generator(object):
     # Mapping of package name to module
     namespace = dict()
 
+    # Namespace of each module and the module and namespace of each header,
+    # see get_header_module
+    module_namespaces = dict()
+    header_modules = dict()
+
     # Includes added to all modules
     common_includes = set()
 
@@ -168,6 +620,21 @@ class Generator(object):
 
     sort_order = dict() # type: dict[str, list[str, int]]
 
+    # Index of the traversed declarations
+    index = None
+
+    # Inheritance graph of the traversed classes
+    hierarchy = None
+
+    # Settings used by the binding functions which are sent to worker
+    # processes
+    bind_settings = ('namespace', 'module_namespaces', 'header_modules',
+                     'common_includes', 'available_templates',
+                     'excluded_classes', 'excluded_functions',
+                     'excluded_bases', 'nested_classes', 'split',
+                     'import_guards', 'plus_headers', 'python_names',
+                     'before_type', 'after_type', 'patches', 'before_module')
+
     _mods = OrderedDict()
 
     def __init__(self, package_name, namespace, all_includes, include_dirs=None):
@@ -193,11 +660,37 @@ class Generator(object):
         self._tu = None
         self._tu_binder = None
 
+        # Parsed without function bodies and detailed preprocessing record
+        self._lean = False
+
+        # Names of the modules to parse and bind if not all of them
+        self.selected_modules = None
+
+        # Main include file and options of the last parse
+        self._main_file = None
+        self._parse_options = {}
+
+        # Translation units of a parallel parse and the modules each one is
+        # responsible for
+        self._partitions = []
+
+        # Intermediate representation of the bound modules
+        self._ir = None
+
         # Build available include files
         Generator.namespace = namespace
         Generator.common_includes = set([f'py{package_name}_Common.hxx'])
         Generator.available_incs = frozenset(all_includes)
         Generator.available_mods = frozenset(namespace[package_name])
+        Generator.module_namespaces = {}
+        for name, mods in namespace.items():
+            for mod in mods:
+                Generator.module_namespaces.setdefault(mod, name)
+        Generator.header_modules = {}
+        for inc in all_includes:
+            Generator.get_header_module(inc)
+        Generator.index = DeclarationIndex()
+        Generator.hierarchy = ClassHierarchy()
 
         # Turn on/off binding of certain declarations for debugging
         self.bind_enums = True
@@ -206,6 +699,9 @@ class Generator(object):
         self.bind_typedefs = True
         self.bind_class_templates = True
 
+        # Import modules only used by method signatures when first called.
+        # Turned on by "+iguard*" in a configuration file.
+        self.auto_import_guards = False
 
     @property
     def tu(self):
@@ -223,6 +719,19 @@ class Generator(object):
         """
         return self._tu_binder
 
+    @property
+    def translation_units(self):
+        """
+        :return: All translation units. There is more than one if the headers
+            were parsed in parallel.
+        :rtype: list(clang.cindex.TranslationUnit)
+        """
+        if self._partitions:
+            return [tu for _, tu in self._partitions]
+        if self._tu is None:
+            return []
+        return [self._tu]
+
     @property
     def modules(self):
         """
@@ -231,6 +740,88 @@ class Generator(object):
         """
         return list(self._mods.values())
 
+    def reset_config(self):
+        """
+        Clear all settings from processed configuration files.
+        :return: None.
+        """
+        self.compiler_args = {}
+        self.include_dirs = []
+        self.auto_import_guards = False
+        for settings in (self.excluded_classes, self.excluded_functions,
+                         self.excluded_rtypes, self.excluded_enums,
+                         self.excluded_fnames, self.excluded_mods,
+                         self.excluded_typedefs, self.excluded_fields,
+                         self.excluded_headers, self.nodelete,
+                         self.nested_classes, self.downcast_classes,
+                         self.skipped, self.immutable, self.split,
+                         self.opaque_types, self.excluded_bases,
+                         self.import_guards, self.plus_headers,
+                         self.minus_headers, self.python_names,
+                         self.excluded_imports, self.call_guards,
+                         self.keep_alive, self.before_type, self.after_type,
+                         self.patches, self.return_policies,
+                         self.before_module, self.sort_order):
+            settings.clear()
+
+    def reset_modules(self):
+        """
+        Clear the modules and bound templates of a previous traversal.
+        :return: None.
+        """
+        self._ir = None
+        Generator._mods.clear()
+        Generator.available_templates.clear()
+        Generator.index.clear()
+        Generator.hierarchy.clear()
+        CursorBinder.clear_instances()
+        TypeBinder.clear_instances()
+
+    def select_modules(self, patterns):
+        """
+        Select a subset of the available modules to parse and bind. Only the
+        headers of these modules and what they include are parsed and only
+        their source files are written. Their declarations are ordered as if
+        all the modules were parsed so the source files are the same, except
+        for imports only left out when all the modules are parsed since they
+        are imported transitively by a module that is not selected. A
+        warning is given for a pattern that matches no module.
+        :param patterns: Module names or glob patterns. May be a comma
+            separated string (e.g., "gp,TopoDS,BRep*").
+        :type patterns: str or collections.Iterable(str)
+        :return: Names of the selected modules.
+        :rtype: set(str)
+        """
+        if isinstance(patterns, str):
+            patterns = patterns.split(',')
+        patterns = [pattern.strip() for pattern in patterns if pattern.strip()]
+        self.selected_modules = set()
+        for pattern in patterns:
+            names = {name for name in Generator.available_mods
+                     if fnmatch(name, pattern)}
+            if not names:
+                msg = 'No available module matches {}'.format(pattern)
+                logger.write('\t{}.\n'.format(msg))
+                warnings.warn(msg, RuntimeWarning)
+            self.selected_modules.update(names)
+        logger.write('Selected modules: {}\n'.format(
+            ', '.join(sorted(self.selected_modules))))
+        return self.selected_modules
+
+    def filter_modules(self, modules=None):
+        """
+        Restrict module names to the selected modules.
+        :param collections.Iterable(str) modules: Module names. If *None* all
+            modules are considered.
+        :return: Names of the modules to bind or *None* for all of them.
+        :rtype: set(str)
+        """
+        if self.selected_modules is None:
+            return modules
+        if modules is None:
+            return self.selected_modules
+        return self.selected_modules.intersection(modules)
+
     def process_config(self, fn):
         """
         Process a configuration file.
@@ -267,7 +858,8 @@ class Generator(object):
                         self.include_dirs.append(line)
                         continue
 
-                    # Sort order
+                    # Sort order. Only orders the types whose dependencies
+                    # are already bound.
                     if line.startswith('+sort'):
                         line = line.replace('+sort', '').strip()
                         mod, value = line.split(':')
@@ -344,6 +936,11 @@ class Generator(object):
                         self.excluded_mods.add(line)
                         continue
 
+                    # Automatic import guards
+                    if line.startswith('+iguard*'):
+                        self.auto_import_guards = True
+                        continue
+
                     # Import guards
                     if line.startswith('+iguard'):
                         line = line.replace('+iguard', '')
@@ -446,11 +1043,10 @@ class Generator(object):
                         qname, mod = line.split('-->', 1)
                         qname = qname.strip()
                         mod = mod.strip()
-                        txt = 'py::call_guard<Import{}>()'.format(mod)
                         if qname in self.call_guards:
-                            self.call_guards[qname].append(txt)
+                            self.call_guards[qname].append(mod)
                         else:
-                            self.call_guards[qname] = [txt]
+                            self.call_guards[qname] = [mod]
                         continue
 
                     # Keep alive
@@ -555,14 +1151,106 @@ class Generator(object):
                     i = line_number + 1
                     raise RuntimeError(f"Error in config at line {i}: {e}")
 
-    def parse(self, file_):
+    def parse(self, file_, jobs=1, cache_dir=None, lean=False):
         """
         Parse the main include file.
         :param str file_: The main include file to parse.
+        :param int jobs: Number of worker processes. If more than one, the
+            main include file is split by module and each part is parsed in
+            its own process.
+        :param str cache_dir: Directory of cached translation units. If
+            given, a saved AST is loaded instead of parsing when the main
+            include file, compiler arguments, libclang version and included
+            headers are unchanged. Otherwise the new AST is saved there.
+        :param bool lean: Option to skip function bodies and the detailed
+            preprocessing record. Handle macros are then found by scanning
+            the headers of the available modules instead.
         :return: None
+
+        .. note:: If modules were selected, only the includes of their
+            headers are parsed.
         """
         logger.write('Parsing headers...\n')
+        start = time.perf_counter()
+        memory_before = peak_memory()
+
+        # Binders of a previous translation unit
+        CursorBinder.clear_instances()
+        TypeBinder.clear_instances()
+
+        options = TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD
+        if lean:
+            options = TranslationUnit.PARSE_SKIP_FUNCTION_BODIES
+        self._lean = lean
+        self._main_file = file_
+        self._parse_options = {'jobs': jobs, 'cache_dir': cache_dir,
+                               'lean': lean}
+
+        args = self.get_compiler_args()
+
+        # States of the headers before parsing for the cache manifest
+        manifest = None
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            main_dir = os.path.dirname(os.path.abspath(file_))
+            manifest = (stat_files(self.include_dirs + self._main_includes +
+                                   [main_dir]), time.time_ns())
+
+        self._partitions = []
+        with TemporaryDirectory(prefix='pybinder_') as tmp_dir:
+            # Parse only the includes of the selected modules
+            if self.selected_modules is not None and jobs <= 1:
+                common, mod2lines = self.partition_includes(file_)
+                lines = list(common)
+                for mod_lines in mod2lines.values():
+                    lines += mod_lines
+                main_dir = os.path.dirname(os.path.abspath(file_))
+                args = args + [''.join(['-I', main_dir])]
+                if cache_dir is None:
+                    file_ = os.path.join(tmp_dir, 'selected.h')
+                else:
+                    key = cache_key(''.join(lines).encode(), args, options)
+                    file_ = os.path.join(cache_dir, key + '.h')
+                with open(file_, 'w') as f:
+                    f.writelines(lines)
+
+            if jobs > 1:
+                self.parse_parallel(file_, args, jobs, cache_dir, options,
+                                    manifest)
+            elif cache_dir is not None:
+                with open(file_, 'rb') as f:
+                    key = cache_key(f.read(), args, options)
+                fname = os.path.join(cache_dir, key + '.ast')
+                if is_cache_valid(fname):
+                    logger.write('\tLoading cached AST: {}\n'.format(fname))
+                    self._tu = TranslationUnit.from_ast_file(fname,
+                                                             self._indx)
+                else:
+                    self._tu = self._indx.parse(file_, args, options=options)
+                    logger.write('\tSaving cached AST: {}\n'.format(fname))
+                    self._tu.save(fname)
+                    write_manifest(self._tu, fname, *manifest)
+            else:
+                self._tu = self._indx.parse(file_, args, options=options)
 
+        msg = '\tParse time: {:.2f}s\n'.format(time.perf_counter() - start)
+        logger.write(msg)
+        # The peak of the process so far and how much parsing raised it
+        memory = peak_memory()
+        if memory is not None:
+            logger.write('\tPeak memory: {:.1f} MB (+{:.1f} MB)\n'.format(
+                memory, memory - memory_before))
+        logger.write('done.\n\n')
+
+        self._tu_binder = CursorBinder(self.tu.cursor)
+
+    def get_compiler_args(self):
+        """
+        Get the compiler arguments for the current platform including the
+        include directories.
+        :return: The compiler arguments.
+        :rtype: list(str)
+        """
         args = []
         # Any
         if 'any' in self.compiler_args:
@@ -592,11 +1280,110 @@ class Generator(object):
             args += [''.join(['-I', path])]
             logger.write('\tInclude path: {}\n'.format(path))
 
-        self._tu = self._indx.parse(file_, args,
-                                    options=TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD)
-        logger.write('done.\n\n')
+        return args
+
+    def partition_includes(self, file_):
+        """
+        Split the main include file by module. Lines that are not an include
+        of a header in an available module are kept in every part. Includes
+        of modules that are not selected are removed.
+        :param str file_: The main include file.
+        :return: The common lines and the include lines of each module in the
+            order they are first found.
+        :rtype: tuple(list(str), collections.OrderedDict)
+        """
+        common = []
+        mod2lines = OrderedDict()
+        with open(file_, 'r') as f:
+            for line in f:
+                match = re.match(r'\s*#\s*include\s*[<"](.+)[>"]', line)
+                if match:
+                    inc = match.group(1).replace('\\', '/').split('/')[-1]
+                    mod_name = Generator.get_header_module(inc)[0]
+                    if mod_name in Generator.available_mods:
+                        if (self.selected_modules is None or
+                                mod_name in self.selected_modules):
+                            mod2lines.setdefault(mod_name, []).append(line)
+                        continue
+                common.append(line)
+        return common, mod2lines
+
+    def parse_parallel(self, file_, args, jobs, cache_dir=None,
+                       options=TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD,
+                       manifest=None):
+        """
+        Parse the main include file split by module in a process pool. Each
+        worker saves its translation unit which is then loaded here. When
+        traversing, each translation unit only provides the declarations of
+        its own modules so declarations found in more than one part are only
+        bound once.
+        :param str file_: The main include file.
+        :param list(str) args: The compiler arguments.
+        :param int jobs: Number of worker processes.
+        :param str cache_dir: Directory of cached translation units. If
+            given, each part is cached separately.
+        :param int options: The parse options.
+        :param tuple manifest: The file states and start time taken before
+            parsing for the manifest of each cached part.
+        :return: None.
+        """
+        if cache_dir is not None and manifest is None:
+            main_dir = os.path.dirname(os.path.abspath(file_))
+            manifest = (stat_files(self.include_dirs + self._main_includes +
+                                   [main_dir]), time.time_ns())
+        common, mod2lines = self.partition_includes(file_)
+        if not mod2lines:
+            self._tu = self._indx.parse(file_, args, options=options)
+            return
 
-        self._tu_binder = CursorBinder(self.tu.cursor)
+        # Quoted includes are relative to the main include file
+        main_dir = os.path.dirname(os.path.abspath(file_))
+        args = args + [''.join(['-I', main_dir])]
+
+        # Group the modules into one part per job keeping their order and
+        # balancing the number of headers
+        mod_names = list(mod2lines)
+        nlines = sum(len(lines) for lines in mod2lines.values())
+        size = nlines / min(jobs, len(mod_names))
+        parts, count = [[]], 0
+        for mod_name in mod_names:
+            if parts[-1] and count >= size * len(parts):
+                parts.append([])
+            parts[-1].append(mod_name)
+            count += len(mod2lines[mod_name])
+
+        # Cached parts are kept next to their AST since it refers to them
+        futures = []
+        with TemporaryDirectory(prefix='pybinder_') as tmp_dir, \
+                ProcessPoolExecutor(max_workers=jobs) as pool:
+            for i, part in enumerate(parts):
+                lines = list(common)
+                for mod_name in part:
+                    lines += mod2lines[mod_name]
+                if cache_dir is None:
+                    name = os.path.join(tmp_dir, 'part{}'.format(i))
+                else:
+                    key = cache_key(''.join(lines).encode(), args, options)
+                    name = os.path.join(cache_dir, key)
+                part_file, fname = name + '.h', name + '.ast'
+                if cache_dir is not None and is_cache_valid(fname):
+                    logger.write('\tLoading cached AST: {}\n'.format(fname))
+                    futures.append((part, fname, None))
+                    continue
+                with open(part_file, 'w') as f:
+                    f.writelines(lines)
+                future = pool.submit(parse_partition, part_file, args, fname,
+                                     manifest, options)
+                futures.append((part, fname, future))
+                logger.write('\tParsing modules: {}\n'.format(', '.join(part)))
+
+            for part, fname, future in futures:
+                if future is not None:
+                    future.result()
+                tu = TranslationUnit.from_ast_file(fname, self._indx)
+                self._partitions.append((set(part), tu))
+
+        self._tu = self._partitions[0][1]
 
     def dump_diagnostics(self, severity=4):
         """
@@ -611,7 +1398,9 @@ class Generator(object):
         print('DIAGNOSTIC INFORMATION')
         print('----------------------')
         other_issues = 0
-        for diag in self.tu.diagnostics:
+        diagnostics = [diag for tu in self.translation_units
+                       for diag in tu.diagnostics]
+        for diag in diagnostics:
             if diag.severity < severity:
                 other_issues += 1
                 continue
@@ -634,30 +1423,50 @@ class Generator(object):
         """
         self.tu.save(fname)
 
-    def load(self, fname):
+    def load(self, fname, lean=False):
         """
         Load a TranslationUnit from a saved AST file.
         :param str fname: The filename.
+        :param bool lean: Option if the AST was parsed without the detailed
+            preprocessing record so the handle macros are found by scanning
+            the headers.
         :return: None.
         """
+        self._partitions = []
+        self._lean = lean
+        self._main_file = None
+        self._parse_options = {}
+        CursorBinder.clear_instances()
+        TypeBinder.clear_instances()
         self._tu = TranslationUnit.from_ast_file(fname, self._indx)
+        self._tu_binder = CursorBinder(self.tu.cursor)
 
-    def traverse(self):
+    def traverse(self, modules=None):
         """
         Traverse parsed headers and gather binders.
+        :param collections.Iterable(str) modules: Names of the modules whose
+            declarations are indexed. The declarations of other modules are
+            still added to them but their cursors are walked by libclang when
+            needed. If *None* all modules are indexed.
         :return: None.
         """
-        available_macros = {}
+        self._ir = None
+        self.index.clear()
+        self.hierarchy.clear()
+
+        # Each translation unit and the modules it provides (all if None)
+        if self._partitions:
+            tu_binders = [(mods, CursorBinder(tu.cursor))
+                          for mods, tu in self._partitions]
+        else:
+            tu_binders = [(None, self.tu_binder)]
+
         # First gather all the handle macros to handle them specially
-        for binder in self.tu_binder.get_children_of_kind(
-                CursorKind.MACRO_INSTANTIATION):
-            if binder.spelling.upper() in MacroForHandle.relevant_macros:
-                tokens = list(binder.cursor.get_tokens())
-                macro = tokens[0].spelling
-                txt = ''.join([t.spelling for t in tokens])
-                type1, type2 = re.findall(r'\((.*)\)', txt)[0].split(',')
-                macro = MacroForHandle(macro, type1, type2)
-                available_macros[type1] = macro
+        if self._lean:
+            available_macros = self.scan_handle_macros()
+        else:
+            available_macros = self.find_handle_macros(
+                [tu_binder for _, tu_binder in tu_binders])
 
         # What to bind
         to_bind = set()
@@ -694,9 +1503,41 @@ class Generator(object):
         }
 
         logger.write('Traversing...\n')
-        # Traverse the translation unit and group the binders into modules
-        for binder in self.tu_binder.get_children():
-            self.traverse_binder(binder, logs, canonical_types, available_macros)
+        # Traverse the translation units for the declarations to bind
+        found = []
+        for mods, tu_binder in tu_binders:
+            for binder in tu_binder.get_children():
+                self.traverse_binder(binder, found, mods)
+
+        # Parts of the main include file are not parsed in its order so use
+        # the order of a single translation unit of the complete file
+        if self._main_file is not None and (
+                self._partitions or self.selected_modules is not None):
+            order = IncludeOrder(self._main_file, self.translation_units,
+                                 self.available_incs,
+                                 self._main_includes + self.include_dirs)
+            found.sort(key=order.key)
+
+        # Group the binders into modules
+        if modules is not None:
+            modules = set(modules)
+        usrs = {}
+        unique = []
+        for binder in found:
+            # Bind an entity once even if it is declared again, in the same
+            # or in another translation unit. A definition replaces the
+            # declarations found before it.
+            if binder.usr:
+                if binder.usr in usrs:
+                    i = usrs[binder.usr]
+                    if binder.is_definition and not unique[i].is_definition:
+                        unique[i] = binder
+                    continue
+                usrs[binder.usr] = len(unique)
+            unique.append(binder)
+        for binder in unique:
+            self.add_binder(binder, logs, canonical_types, available_macros,
+                            modules)
         logger.write('done.\n\n')
 
         logger.write('Enums...\n')
@@ -729,13 +1570,120 @@ class Generator(object):
             logger.write(txt)
         logger.write('done.\n\n')
 
+    def is_macro_header(self, inc_file):
+        """
+        Check if a header is scanned for handle macros in a lean parse.
+        :param str inc_file: The header file name.
+        :return: *True* if it is an available header of an available module,
+            *False* otherwise.
+        :rtype: bool
+        """
+        return (inc_file not in self.excluded_headers and
+                inc_file in self.available_incs and
+                Generator.get_header_module(inc_file)[0] in
+                Generator.available_mods)
+
+    def find_handle_macros(self, tu_binders):
+        """
+        Find the handle macros from the macro instantiations of the detailed
+        preprocessing record.
+        :param list(binder.core.CursorBinder) tu_binders: The binders of the
+            translation units.
+        :return: Dictionary of the first macro argument to the macro.
+        :rtype: dict(str, binder.core.MacroForHandle)
+        """
+        available_macros = {}
+        for tu_binder in tu_binders:
+            for binder in tu_binder.get_children_of_kind(
+                    CursorKind.MACRO_INSTANTIATION):
+                if binder.spelling.upper() not in MacroForHandle.relevant_macros:
+                    continue
+                tokens = binder.tokens
+                macro = tokens[0]
+                txt = ''.join(tokens)
+                type1, type2 = re.findall(r'\((.*)\)', txt)[0].split(',')
+                macro = MacroForHandle(macro, type1, type2)
+                available_macros[type1] = macro
+        return available_macros
+
+    def scan_handle_macros(self):
+        """
+        Find the handle macros by scanning the text of the included headers
+        of the available modules. Used instead of the macro instantiations
+        when parsed without the detailed preprocessing record.
+        :return: Dictionary of the first macro argument to the macro.
+        :rtype: dict(str, binder.core.MacroForHandle)
+        """
+        names = '|'.join(MacroForHandle.relevant_macros)
+        pattern = re.compile(r'\b({})\s*\(([^()]*)\)'.format(names),
+                             re.IGNORECASE)
+        comments = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+        directives = re.compile(r'^\s*#(?:[^\n]*\\\n)*[^\n]*', re.MULTILINE)
+
+        available_macros = {}
+        visited = set()
+        for tu in self.translation_units:
+            for inc in tu.get_includes():
+                path = inc.include.name
+                if path in visited:
+                    continue
+                visited.add(path)
+
+                inc_file = path.replace('\\', '/').split('/')[-1]
+                if not self.is_macro_header(inc_file):
+                    continue
+
+                with open(path, 'r', errors='ignore') as f:
+                    txt = f.read()
+                if 'DEFINE_H' not in txt.upper():
+                    continue
+                txt = directives.sub('', comments.sub('', txt))
+                for macro, args in pattern.findall(txt):
+                    args = ''.join(args.split())
+                    type1, type2 = args.split(',')
+                    macro = MacroForHandle(macro, type1, type2)
+                    available_macros[type1] = macro
+        return available_macros
+
+    def export_snapshot(self, fname):
+        """
+        Export the traversed declarations with their members, type references
+        and locations to a columnar file that can be memory-mapped and
+        queried without libclang using *pybinder.snapshot.Snapshot*. Must be
+        called after *traverse*.
+        :param str fname: The filename.
+        :return: None.
+        """
+        start = time.perf_counter()
+        columns = clangext.CursorColumns()
+        qualified_names = {}
+        for qname, binders in self.index.qualified_names.items():
+            for binder in binders:
+                qualified_names[len(columns)] = qname
+                clangext.extract_columns(binder.cursor, usr=True,
+                                         references=True, columns=columns)
+        kinds = {kind.value: kind.name
+                 for kind in CursorKind.get_all_kinds()}
+        write_snapshot(fname, columns, qualified_names, kinds)
+        logger.write('Exported snapshot {}: {} declarations, {} rows in '
+                     '{:.2f}s.\n'.format(fname, len(qualified_names),
+                                         len(columns),
+                                         time.perf_counter() - start))
+
     def traverse_binder(
         self,
         binder: "CursorBinder",
-        logs: dict[str, list[str]],
-        canonical_types: dict,
-        available_macros: dict,
+        found: list["CursorBinder"],
+        mods: set[str] = None,
     ):
+        """
+        Find the declarations to bind in a binder and its namespaces.
+        :param binder.core.CursorBinder binder: The binder.
+        :param list(binder.core.CursorBinder) found: The declarations found.
+        :param set(str) mods: The modules provided by the translation unit or
+            *None* for all of them.
+        :return: None.
+        """
         # Only bind definitions
         # TODO Why is IGESFile and StepFile not considered definitions?
         if (not binder.is_definition and
@@ -748,7 +1696,7 @@ class Generator(object):
             if binder.spelling.startswith("__") or binder.spelling in self.excluded_namespaces:
                 return
             for binder in binder.get_children():
-                self.traverse_binder(binder, logs, canonical_types, available_macros)
+                self.traverse_binder(binder, found, mods)
             return
 
         # Bind only these types of cursors
@@ -773,6 +1721,27 @@ class Generator(object):
         if mod_name not in Generator.available_mods:
             return
 
+        # Only the translation unit of the module provides its declarations
+        if mods is not None and mod_name not in mods:
+            return
+
+        found.append(binder)
+
+    def add_binder(self, binder, logs, canonical_types, available_macros,
+                   modules=None):
+        """
+        Add a declaration found by *traverse_binder* to its module.
+        :param binder.core.CursorBinder binder: The binder.
+        :param dict logs: The log messages by category.
+        :param dict canonical_types: The first binder of each canonical type
+            spelling used to find aliases.
+        :param dict available_macros: The handle macros by type name.
+        :param set(str) modules: Names of the modules whose declarations are
+            indexed or *None* for all of them.
+        :return: None.
+        """
+        mod_name = binder.module_name
+
         # Add to module
         mod = self.get_module(mod_name)
         if not mod:
@@ -797,6 +1766,8 @@ class Generator(object):
             logger.write(msg)
             return
 
+        self.index.add(binder, qname, modules is None or mod_name in modules)
+
         if binder.is_enum:
             mod.enums.append(binder)
             msg = '\tFound enum: {}\n'.format(qname)
@@ -840,85 +1811,606 @@ class Generator(object):
             msg = '\tFound unknown cursor: {}\n'.format(qname)
             logs["unknown"].append(msg)
 
-    def build_includes(self):
+    def build_includes(self, modules=None):
         """
         Build include files for the modules.
+        :param collections.Iterable(str) modules: Names of the modules to
+            build. If *None* all modules are built.
         :return: None.
         """
+        self._ir = None
         logger.write('Building includes...\n')
-        for mod in self.modules:
+        for mod in self.get_modules(modules):
             mod.build_includes()
         logger.write('done.\n\n')
 
-    def build_imports(self):
+    def build_imports(self, modules=None):
         """
         Build module imports.
+        :param collections.Iterable(str) modules: Names of the modules to
+            build. The imports of the other modules are kept. If *None* all
+            modules are built.
         :return: None.
         """
-        # Import module based on prefix of header files
-        for mod in self.modules:
+        self._ir = None
+        # Import the modules of the header files that have a namespace
+        get_header_module = Generator.get_header_module
+        for mod in self.get_modules(modules):
+            names = {}
             for inc_file in mod.includes:
-                if '_' in inc_file:
-                    delim = '_'
-                else:
-                    delim = '.'
-                try:
-                    other_name = inc_file.split(delim)[0]
-                except (IndexError, AttributeError):
-                    continue
+                other_name, namespace = get_header_module(inc_file)
+                if namespace is not None:
+                    names[other_name] = None
+
+            # Don't add this module or excluded ones
+            skip = set(mod.imports)
+            skip.add(mod.name)
+            skip.update(Generator.excluded_imports.get(mod.name, ()))
+            mod.imports += [name for name in names if name not in skip]
+
+        if self.auto_import_guards:
+            self.find_lazy_imports(modules)
+        self.reduce_imports()
+
+    def find_lazy_imports(self, modules=None):
+        """
+        Find the imports of each module that are only needed when some of its
+        methods are called. An import is lazy if the types of its module are
+        only referenced by the parameter and return types of methods, or by
+        method bodies. Base classes, fields, default arguments, class
+        templates and everything else need the module when registered so
+        they keep it eager. The methods referencing a lazy import get a call
+        guard importing it.
+        :param collections.Iterable(str) modules: Names of the modules to
+            check. If *None* all modules are checked.
+        :return: None.
+        """
+        get_header_module = Generator.get_header_module
+        ref_modules = {}
 
-                # Check available
-                if Generator.get_namespace(other_name) is None:
-                    continue
+        def ref_module(item):
+            # Same checks as the includes the imports are built from
+            key = cursor_key(item.cursor)
+            try:
+                return ref_modules[key]
+            except KeyError:
+                pass
+            f = item.get_definition().filename
+            if (f is None or f not in Generator.available_incs or
+                    f in Generator.excluded_headers):
+                name = None
+            else:
+                name = get_header_module(f)[0]
+            ref_modules[key] = name
+            return name
+
+        for mod in self.get_modules(modules):
+            mod.lazy_imports = []
+            mod.method_guards = {}
+            if mod.is_excluded:
+                continue
+            guarded = Generator.import_guards.get(mod.name, ())
+            candidates = {name for name in mod.imports
+                          if name != mod.name and name not in guarded}
+
+            # Number of references to each module. Modules referenced by
+            # anything but classes or by base classes stay eager.
+            total = {}
+            classes = []
+            for binder in mod.sorted_binders:
+                for binder_ in [binder] + binder.grouped_binders:
+                    names = set()
+                    for item in Module.get_refs(binder_):
+                        name = ref_module(item)
+                        names.add(name)
+                        total[name] = total.get(name, 0) + 1
+                    if not binder_.is_class:
+                        candidates -= names
+                        continue
+                    for base in binder_.get_children_of_kind(
+                            CursorKind.CXX_BASE_SPECIFIER):
+                        for item in Module.get_refs(base):
+                            candidates.discard(ref_module(item))
+                    classes.append((binder_, names))
+            # Class templates are bound in their own headers without guards
+            for binder in mod.templates:
+                for item in Module.get_refs(binder):
+                    candidates.discard(ref_module(item))
+            if not candidates:
+                continue
 
-                # Don't add this module
-                if mod.name == other_name:
+            # Iterators are bound without call guards
+            classes = [(binder_, names) for binder_, names in classes
+                       if not candidates.isdisjoint(names)]
+            for binder_, names in classes:
+                if binder_.is_maybe_iterable:
+                    candidates -= names
+
+            # How many references are in the signatures or bodies of methods
+            in_signatures, in_bodies = {}, {}
+            uses = {}
+            for binder_, names in classes:
+                if candidates.isdisjoint(names):
                     continue
+                for method in binder_.get_children_of_kind(
+                        CursorKind.CXX_METHOD):
+                    signature, body = Module.get_method_refs(method)
+                    names = uses[method] = set()
+                    for item in signature:
+                        name = ref_module(item)
+                        names.add(name)
+                        in_signatures[name] = in_signatures.get(name, 0) + 1
+                    for item in body:
+                        name = ref_module(item)
+                        in_bodies[name] = in_bodies.get(name, 0) + 1
+
+            for name in mod.imports:
+                if name not in candidates:
+                    continue
+                n = in_signatures.get(name, 0)
+                if n and n + in_bodies.get(name, 0) == total.get(name, 0):
+                    mod.lazy_imports.append(name)
+
+            for method, names in uses.items():
+                names = [name for name in mod.lazy_imports if name in names]
+                if names:
+                    mod.method_guards[method] = names
+
+    def reduce_imports(self):
+        """
+        Find the imports each module calls when initialized. An import is
+        left out if another import of the module already imports it
+        transitively, so only the transitive reduction of the import graph
+        is called. Guarded imports are not called on initialization and do
+        not import anything transitively. An import is only used to cover
+        another if it does not import this module back and is not imported
+        back by the other, so imports in a cycle are all kept. The imports of
+        modules that are not parsed are unknown so they cover nothing.
+        :return: None.
+        """
+        # Imports called on initialization of each module
+        graph = {}
+        for mod in self.modules:
+            guarded = Generator.import_guards.get(mod.name, ())
+            graph[mod.name] = [name for name in mod.imports
+                               if name != mod.name and name not in guarded
+                               and name not in mod.lazy_imports]
+        for mod in self.modules:
+            if mod.is_excluded:
+                # Not generated so its imports are unknown
+                graph[mod.name] = []
 
-                # Check excluded
-                if mod.name in Generator.excluded_imports:
-                    if other_name in Generator.excluded_imports[mod.name]:
-                        continue
+        reached = {}
+
+        def reach(name):
+            # Modules imported transitively by a module
+            try:
+                return reached[name]
+            except KeyError:
+                pass
+            visited, stack = set(), list(graph.get(name, ()))
+            while stack:
+                other = stack.pop()
+                if other in visited:
+                    continue
+                visited.add(other)
+                stack.extend(graph.get(other, ()))
+            reached[name] = visited
+            return visited
 
-                # Add import
-                if other_name not in mod.imports:
-                    mod.imports.append(other_name)
+        for mod in self.modules:
+            imports = graph[mod.name]
+            covers = [name for name in imports if mod.name not in reach(name)]
+            mod.reduced_imports = [
+                name for name in imports
+                if not any(name != other and name in reach(other) and
+                           other not in reach(name) for other in covers)]
 
-    def sort_binders(self):
+    def sort_binders(self, modules=None):
         """
         Sort class binders so they are ordered based on their base
         classes.
+        :param collections.Iterable(str) modules: Names of the modules to
+            sort. If *None* all modules are sorted.
         :return: None.
         """
+        self._ir = None
         logger.write('Sorting binders...\n')
-        for mod in self.modules:
+        for mod in self.get_modules(modules):
             mod.sort_binders()
         logger.write('done.\n\n')
 
-    def bind(self, path):
+    def build_ir(self, modules=None):
+        """
+        Build the intermediate representation of the modules which the
+        binding functions generate the source from. Must be called after the
+        binders are sorted and the includes and imports are built.
+        :param collections.Iterable(str) modules: Names of the modules to
+            include. If *None* all modules are included. Only selected
+            modules are included if there is a selection.
+        :return: The representation.
+        :rtype: pybinder.ir.BindingIR
+        """
+        logger.write('Building binding IR...\n')
+        modules = self.filter_modules(modules)
+        mods = [mod for mod in self.modules
+                if modules is None or mod.name in modules]
+        self._ir = IRBuilder().build(self.package_name, mods, self.modules)
+        logger.write('done.\n\n')
+        return self._ir
+
+    def has_ir(self, modules=None):
+        """
+        Check if the intermediate representation was built or loaded and
+        includes the modules.
+        :param collections.Iterable(str) modules: Names of the modules. If
+            *None* all modules are checked.
+        :return: *True* if it includes the modules, *False* otherwise.
+        :rtype: bool
+        """
+        if self._ir is None:
+            return False
+        names = {mod.name for mod in self._ir.modules}
+        return all(mod.name in names for mod in self.modules
+                   if modules is None or mod.name in modules)
+
+    def get_ir(self, modules=None):
+        """
+        Get the intermediate representation, building it if it does not
+        include the modules.
+        :param collections.Iterable(str) modules: Names of the modules to
+            include. If *None* all modules are included.
+        :return: The representation.
+        :rtype: pybinder.ir.BindingIR
+        """
+        if self.has_ir(modules):
+            return self._ir
+        return self.build_ir(modules)
+
+    def save_ir(self, fname):
+        """
+        Save the intermediate representation to a file.
+        :param str fname: The filename.
+        :return: None.
+        """
+        self.get_ir().save(fname)
+
+    def load_ir(self, fname):
+        """
+        Load an intermediate representation saved with *save_ir*. The
+        bindings can then be generated without parsing the headers or
+        processing the configuration files since the configuration it was
+        built with is applied.
+        :param str fname: The filename.
+        :return: None.
+        """
+        self._ir = BindingIR.load(fname)
+        self.set_bind_settings(deepcopy(self._ir.settings))
+
+    @staticmethod
+    def get_bind_settings():
+        """
+        :return: The settings used by the binding functions by name.
+        :rtype: dict
+        """
+        return {name: getattr(Generator, name)
+                for name in Generator.bind_settings}
+
+    @staticmethod
+    def set_bind_settings(settings):
+        """
+        Apply settings returned by *get_bind_settings*.
+        :param dict settings: The settings by name.
+        :return: None.
+        """
+        for name, value in settings.items():
+            setattr(Generator, name, value)
+
+    def bind_modules(self, func, modules, path, jobs=1):
+        """
+        Call a binding function for each module. If more than one job is
+        given, the modules are distributed to a process pool. The log of
+        each module is written in order so the output does not depend on the
+        number of jobs.
+        :param callable func: The binding function taking the module and
+            path. Must be a module level function.
+        :param list(str) modules: Names of the modules.
+        :param str path: The output path.
+        :param int jobs: Number of worker processes.
+        :return: None.
+
+        .. note:: The workers only get the nodes of the intermediate
+            representation and never use the binders or the translation
+            units of this process.
+        """
+        ir = self.get_ir(modules)
+        items = [mod for mod in ir.modules if mod.name in modules]
+        if jobs <= 1 or len(items) <= 1:
+            for mod in items:
+                func(mod, path)
+            return
+
+        # Don't let the workers inherit buffered text
+        logger.flush()
+        settings = self.get_bind_settings()
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(bind_worker, func, item, path, settings)
+                       for item in items]
+            for future in futures:
+                logger.write(future.result())
+
+    def bind(self, path, modules=None, jobs=1):
         """
         Bind the library.
         :param str path: Path to write sub-folders.
+        :param collections.Iterable(str) modules: Names of the modules to
+            bind. If *None* all modules are bound. Only selected modules are
+            bound if there is a selection.
+        :param int jobs: Number of worker processes. If more than one, the
+            modules are bound in parallel.
         :return:
         """
+        modules = self.filter_modules(modules)
         logger.write('Binding types...\n')
-        for mod in self.modules:
+        ir = self.get_ir(modules)
+        Generator.available_templates.update(ir.templates)
+        mods = []
+        for mod in ir.modules:
             if mod.is_excluded:
                  continue
-            mod.bind(path)
+            if modules is not None and mod.name not in modules:
+                continue
+            mods.append(mod.name)
+        self.bind_modules(bind_module, mods, path, jobs)
         logger.write('done.\n\n')
 
-    def bind_templates(self, path):
+    def bind_templates(self, path, modules=None, jobs=1):
         """
         Bind the library.
         :param str path: Path to write sub-folders.
+        :param collections.Iterable(str) modules: Names of the modules to
+            bind. The templates of other modules are only registered as
+            available. Only selected modules are bound if there is a
+            selection.
+        :param int jobs: Number of worker processes. If more than one, the
+            templates of the modules are bound in parallel.
         :return:
         """
+        modules = self.filter_modules(modules)
         logger.write('Binding templates...\n')
-        for mod in self.modules:
-            mod.bind_templates(path)
+        ir = self.get_ir(modules)
+        Generator.available_templates.update(ir.templates)
+        mods = [mod.name for mod in ir.modules
+                if modules is None or mod.name in modules]
+        self.bind_modules(bind_module_templates, mods, path, jobs)
         logger.write('done.\n\n')
 
+    def generate(self, path, template_path=None, modules=None, jobs=1):
+        """
+        Run all the steps after parsing to generate the bindings.
+        :param str path: Path to write sub-folders.
+        :param str template_path: Path to write class templates. If *None*
+            they are written to *path*.
+        :param collections.Iterable(str) modules: Names of the modules to
+            bind. If *None* all modules are bound.
+        :param int jobs: Number of worker processes to bind the modules.
+        :return: None.
+        """
+        if template_path is None:
+            template_path = path
+        self.reset_modules()
+        self.traverse()
+        self.sort_binders()
+        self.build_includes()
+        self.build_imports()
+        self.check_circular()
+        self.bind_templates(template_path, modules, jobs)
+        self.bind(path, modules, jobs)
+
+    def regenerate(self, path, modules, template_path=None, jobs=1):
+        """
+        Generate the bindings of some modules again after their headers were
+        parsed again. Only their declarations are indexed and their includes
+        and imports built while those of the other modules are kept from the
+        previous run. Other modules whose called imports change are bound
+        again too.
+        :param str path: Path to write sub-folders.
+        :param collections.Iterable(str) modules: Names of the modules to
+            bind.
+        :param str template_path: Path to write class templates. If *None*
+            they are written to *path*.
+        :param int jobs: Number of worker processes to bind the modules.
+        :return: Names of the bound modules.
+        :rtype: set(str)
+        """
+        if template_path is None:
+            template_path = path
+        modules = set(modules)
+        previous = {mod.name: mod for mod in self.modules}
+        self.reset_modules()
+        self.traverse(modules)
+        self.sort_binders(modules)
+        self.build_includes(modules)
+        for mod in self.modules:
+            if mod.name not in modules and mod.name in previous:
+                other = previous[mod.name]
+                mod.includes = other.includes
+                mod.imports = other.imports
+                mod.lazy_imports = other.lazy_imports
+        self.build_imports(modules)
+
+        # The imports of these are unchanged but their call guards are needed
+        changed = {mod.name for mod in self.modules
+                   if mod.name not in modules and mod.name in previous and
+                   mod.reduced_imports != previous[mod.name].reduced_imports}
+        if changed:
+            self.sort_binders(changed)
+            if self.auto_import_guards:
+                self.find_lazy_imports(changed)
+            modules |= changed
+
+        self.check_circular()
+        self.bind_templates(template_path, modules, jobs)
+        self.bind(path, modules, jobs)
+        return modules
+
+    def affected_modules(self, headers):
+        """
+        Get the modules that depend on any of the given headers directly or
+        through the bases of their classes.
+        :param collections.Iterable(str) headers: The header file names.
+        :return: Names of the affected modules.
+        :rtype: set(str)
+        """
+        headers = set(headers)
+        names = set()
+        for mod in self.modules:
+            includes = set(mod.includes)
+            for binder in mod.templates:
+                includes.update(binder.includes)
+            for binder in mod.types:
+                if not binder.is_class:
+                    continue
+                for base in Generator.hierarchy.get_all_bases(binder):
+                    decl = ClassHierarchy.resolve(base)
+                    if decl is not None:
+                        includes.add(decl.filename)
+            if not headers.isdisjoint(includes):
+                names.add(mod.name)
+        return names
+
+    def reparse(self, file_, options):
+        """
+        Parse the headers again after some of them changed. A single
+        translation unit is reparsed by libclang. Otherwise the main include
+        file is parsed again with the given options so only the parts whose
+        cached AST is no longer valid are parsed.
+        :param str file_: The main include file.
+        :param dict options: The options of *parse*.
+        :return: None.
+        """
+        if not self._partitions:
+            try:
+                self.tu.reparse()
+            except TranslationUnitLoadError:
+                # Loaded from an AST or its main file was temporary
+                pass
+            else:
+                self._tu_binder = CursorBinder(self.tu.cursor)
+                return
+        self.parse(file_, **options)
+
+    def watch(self, file_, path, config_files=(), template_path=None,
+              interval=1.0, count=None):
+        """
+        Generate the bindings and then keep the translation unit in memory,
+        regenerating them whenever a header or configuration file changes.
+        Changed headers are parsed again with the options of the last parse
+        and only the modules that depend on them are bound again. If the
+        headers were split by module, a cache is used so only the parts that
+        include a changed header are parsed again. Editing a configuration
+        file reloads all of them and binds every module. Errors are logged
+        and the next change is waited for. Stop with a keyboard interrupt.
+        :param str file_: The main include file to parse.
+        :param str path: Path to write sub-folders.
+        :param collections.Iterable(str) config_files: The configuration
+            files to reload when edited.
+        :param str template_path: Path to write class templates. If *None*
+            they are written to *path*.
+        :param float interval: Seconds between checks for changes.
+        :param int count: Number of checks for changes before returning. If
+            *None*, watch until interrupted.
+        :return: None.
+        """
+        def get_states():
+            files = [file_] + list(config_files)
+            files += [inc.include.name for tu in self.translation_units
+                      for inc in tu.get_includes()]
+            states = {}
+            for fname in files:
+                try:
+                    st = os.stat(fname)
+                    states[fname] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    states[fname] = None
+            return states
+
+        options = dict(self._parse_options)
+        with TemporaryDirectory(prefix='pybinder_') as tmp_dir:
+            # Keep the parts of a parallel parse to parse only some again
+            if (options.get('jobs', 1) > 1 and
+                    options.get('cache_dir') is None):
+                options['cache_dir'] = tmp_dir
+                self.parse(file_, **options)
+            elif self.tu is None:
+                self.parse(file_, **options)
+            self.generate(path, template_path)
+            states = get_states()
+            logger.write('Watching for changes...\n')
+            logger.flush()
+
+            try:
+                while count is None or count > 0:
+                    if count is not None:
+                        count -= 1
+                    time.sleep(interval)
+                    new_states = get_states()
+                    changed = {f for f, state in new_states.items()
+                               if states.get(f) != state}
+                    if not changed:
+                        continue
+                    states = new_states
+                    try:
+                        self._regenerate_changed(file_, path, changed,
+                                                 config_files, template_path,
+                                                 options)
+                    except Exception:
+                        logger.write('Failed to regenerate:\n{}\n'.format(
+                            traceback.format_exc()))
+                        logger.flush()
+                        continue
+                    states = get_states()
+            except KeyboardInterrupt:
+                pass
+
+    def _regenerate_changed(self, file_, path, changed, config_files,
+                            template_path, options):
+        """
+        Regenerate the bindings after some files changed while watching.
+        """
+        start = time.perf_counter()
+        headers = changed.difference(config_files)
+
+        # Any setting may affect any module
+        modules = None
+        if changed.intersection(config_files):
+            args = self.get_compiler_args()
+            self.reset_config()
+            for fn in config_files:
+                self.process_config(fn)
+            if self.get_compiler_args() != args:
+                self.parse(file_, **options)
+                headers = set()
+        elif file_ not in changed:
+            modules = self.affected_modules(
+                f.replace('\\', '/').split('/')[-1] for f in headers)
+
+        if headers:
+            if file_ in changed:
+                self.parse(file_, **options)
+            else:
+                self.reparse(file_, options)
+
+        if modules is None:
+            self.generate(path, template_path)
+            names = 'all'
+        else:
+            modules = self.regenerate(path, modules, template_path)
+            names = ', '.join(sorted(modules)) or 'none'
+        logger.write('Regenerated modules ({:.2f}s): {}\n'.format(
+            time.perf_counter() - start, names))
+        logger.flush()
+
     def is_module(self, name):
         """
         Check if the name is an available module.
@@ -928,20 +2420,126 @@ class Generator(object):
         """
         return name in self._mods
 
-    def check_circular(self):
+    def find_circular(self):
+        """
+        Find the circular imports. The import graph of the modules is built
+        once and its strongly connected components are found with Tarjan's
+        algorithm in linear time. Each component with more than one module,
+        or a module importing itself, is a group of circular imports.
+        :return: The groups in module order. Each one is a dictionary with
+            the names of its *modules*, all import *edges* between them as
+            (importer, imported) pairs and a *cycle* of module names starting
+            and ending with the first module, following the fewest imports.
+        :rtype: list(dict)
+        """
+        names = [mod.name for mod in self.modules]
+        known = set(names)
+        graph = {}
+        for mod in self.modules:
+            graph[mod.name] = [name for name in mod.imports if name in known]
+
+        # Iterative Tarjan's algorithm
+        index, lowlink, on_stack = {}, {}, set()
+        stack, components = [], []
+        for root in names:
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(graph[root]))]
+            while work:
+                name, imports = work[-1]
+                for other in imports:
+                    if other not in index:
+                        index[other] = lowlink[other] = len(index)
+                        stack.append(other)
+                        on_stack.add(other)
+                        work.append((other, iter(graph[other])))
+                        break
+                    if other in on_stack:
+                        lowlink[name] = min(lowlink[name], index[other])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[name])
+                    if lowlink[name] == index[name]:
+                        component = set()
+                        while True:
+                            other = stack.pop()
+                            on_stack.discard(other)
+                            component.add(other)
+                            if other == name:
+                                break
+                        components.append(component)
+
+        order = {name: i for i, name in enumerate(names)}
+        groups = []
+        for component in components:
+            first = min(component, key=order.get)
+            if len(component) == 1 and first not in graph[first]:
+                continue
+            modules = sorted(component, key=order.get)
+            edges = [(name, other) for name in modules
+                     for other in graph[name] if other in component]
+            groups.append({'modules': modules, 'edges': edges,
+                           'cycle': self._shortest_cycle(first, graph,
+                                                         component)})
+        groups.sort(key=lambda group: order[group['modules'][0]])
+        return groups
+
+    @staticmethod
+    def _shortest_cycle(first, graph, component):
+        """
+        Find the cycle through a module with the fewest imports.
+        :param str first: The module name.
+        :param dict(str, list(str)) graph: The imports of each module.
+        :param set(str) component: The modules the cycle may go through.
+        :return: The module names starting and ending with the first.
+        :rtype: list(str)
+        """
+        previous = {}
+        queue = deque([first])
+        while queue:
+            name = queue.popleft()
+            for other in graph[name]:
+                if other not in component:
+                    continue
+                if other == first:
+                    cycle = [first, name]
+                    while name != first:
+                        name = previous[name]
+                        cycle.append(name)
+                    cycle.reverse()
+                    return cycle
+                if other not in previous:
+                    previous[other] = name
+                    queue.append(other)
+        return [first]
+
+    def check_circular(self, fname=None):
         """
         Check for circular imports.
-        :return: None.
+        :param str fname: Option to write the groups of circular imports to
+            this file as JSON.
+        :return: The groups of circular imports, see *find_circular*.
+        :rtype: list(dict)
         """
         logger.write('Finding circular imports...\n')
-        mods = self.modules
-        for i, mod1 in enumerate(mods):
-            for mod2 in mods[i + 1:-1]:
-                if mod1.is_circular(mod2):
-                    name1, name2 = mod1.name, mod2.name
-                    msg = '\tFound circular import: {} <--> {}\n'.format(name1,
-                                                                         name2)
-                    logger.write(msg)
+        groups = self.find_circular()
+        for group in groups:
+            msg = '\tFound circular import: {}\n'.format(
+                ' --> '.join(group['cycle']))
+            logger.write(msg)
+            if len(group['modules']) > len(group['cycle']) - 1:
+                msg = '\t\tCircular imports between: {}\n'.format(
+                    ', '.join(group['modules']))
+                logger.write(msg)
+        if fname is not None:
+            with open(fname, 'w') as f:
+                json.dump(groups, f, indent=2)
+        return groups
 
     @classmethod
     def get_module(cls, name):
@@ -961,6 +2559,19 @@ class Generator(object):
             cls._mods[name] = mod
             return mod
 
+    def get_modules(self, names=None):
+        """
+        Get the existing modules with the given names.
+        :param collections.Iterable(str) names: The module names. If *None*
+            all modules are returned.
+        :return: The modules.
+        :rtype: list(binder.core.Module)
+        """
+        if names is None:
+            return self.modules
+        names = set(names)
+        return [mod for mod in self._mods.values() if mod.name in names]
+
     @classmethod
     def get_namespace(cls, name):
         """
@@ -969,9 +2580,25 @@ class Generator(object):
         :return: The module namespace name or None.
         :rtype: str
         """
-        for namespace, mods in cls.namespace.items():
-            if name in mods:
-                return namespace
+        return cls.module_namespaces.get(name)
+
+    @classmethod
+    def get_header_module(cls, fname):
+        """
+        Get the module of a header file and the namespace of the module. The
+        available include files are mapped up front and others when first
+        used.
+        :param str fname: The header file name.
+        :return: The module name and the namespace name or None.
+        :rtype: tuple(str)
+        """
+        try:
+            return cls.header_modules[fname]
+        except KeyError:
+            mod = sys.intern(module_from_filename(fname))
+            result = cls.header_modules[fname] = (
+                mod, cls.module_namespaces.get(mod))
+            return result
 
 
 class Module(object):
@@ -991,6 +2618,12 @@ class Module(object):
     :ivar list(binder.core.CursorBinder) templates: List of binders around
         class templates.
     :ivar list(binder.core.Module) imports: List of other modules to import.
+    :ivar list(str) reduced_imports: Names of the modules to import when
+        initialized. Modules imported through another import are left out.
+    :ivar list(str) lazy_imports: Names of the modules only imported by the
+        call guards of methods.
+    :ivar dict(binder.core.CursorBinder, list(str)) method_guards: Names of
+        the lazy imports needed by each method.
     :ivar list(binder.core.CursorBinder) sorted_binders: List of binders after
         sorting.
     """
@@ -1007,6 +2640,9 @@ class Module(object):
 
         self.includes = []
         self.imports = []
+        self.reduced_imports = []
+        self.lazy_imports = []
+        self.method_guards = {}
 
     def __repr__(self):
         return 'Module: {}'.format(self.name)
@@ -1041,70 +2677,95 @@ class Module(object):
                 spelling2func[func.spelling] = func
                 self.sorted_binders.append(func)
 
-        # Bind types
-        self.sorted_binders += self.types
-        original_order = {
-            v: i
-            for i, v in enumerate(self.sorted_binders)
-        }
+        # Bind types after the types they depend on
+        self.sorted_binders = self.sort_types(self.sorted_binders + self.types)
 
-        if sort_order := Generator.sort_order.get(self.name):
-            # Hack to workaround TColgp not ordering
-            # base classes properly
-            def sort_fn(v):
-                priority = 10000
-                # TODO: Push into config
-                for pattern, prio in sort_order:
-                    if pattern in v.spelling:
-                        priority = prio
-                return (priority, original_order[v])
-
-
-            self.sorted_binders.sort(key=sort_fn)
-
-
-        # binders1 = list(self.classes)
-        # canonical2original = {}
-        # # Use canonical for typedefs
-        # for binder in self.typedefs:
-        #     ut = binder.underlying_typedef_type
-        #     binders1.append(ut.get_canonical().get_declaration())
-        #     canonical2original[binders1[-1]] = binder
-        #
-        # binders2 = [b.qualified_name for b in binders1]
-        # if not binders2:
-        #     return None
-        #
-        # repeat = True
-        # while repeat:
-        #     repeat = False
-        #
-        #     for b in binders1:
-        #         if b.qualified_name not in binders2:
-        #             continue
-        #         i1 = binders2.index(b.qualified_name)
-        #         for dep in b.all_bases:
-        #             dep = dep.get_definition()
-        #             if dep.qualified_name not in binders2:
-        #                 continue
-        #             i2 = binders2.index(dep.qualified_name)
-        #             if i1 < i2:
-        #                 binders1[i1], binders1[i2] = (binders1[i2],
-        #                                               binders1[i1])
-        #                 binders2[i1], binders2[i2] = (binders2[i2],
-        #                                               binders2[i1])
-        #                 repeat = True
-        #
-        #                 n1 = binders1[i2].spelling
-        #                 n2 = binders1[i1].spelling
-        #                 msg = '\tSwapping {}<-->{}.\n'.format(n1, n2)
-        #                 logger.write(msg)
-        #
-        # for binder in binders1:
-        #     if binder in canonical2original:
-        #         self.sorted_binders.append(canonical2original[binder])
-        #     else:
-        #         self.sorted_binders.append(binder)
+    def sort_types(self, binders):
+        """
+        Sort binders so each type comes after the base classes and aliases it
+        depends on. Of the binders whose dependencies are already bound, the
+        one with the lowest +sort priority and then the earliest position
+        comes next, so the order is kept if it is already valid.
+        :param list(binder.core.CursorBinder) binders: The binders in their
+            preferred order.
+        :return: The sorted binders.
+        :rtype: list(binder.core.CursorBinder)
+        """
+        # Types of this module by canonical spelling
+        members = set(binders)
+        providers = {}
+        for binder in binders:
+            if binder.is_class or binder.is_typedef:
+                spelling = binder.type.get_canonical().spelling
+                providers.setdefault(spelling, binder)
+
+        def dependencies(binder):
+            deps = []
+            if binder.is_typedef:
+                # Aliases of other modules are bound by their own module
+                if binder.alias in members:
+                    deps.append(binder.alias)
+                decl = binder.type.get_canonical().get_declaration()
+                if not decl.is_class:
+                    return deps
+                bases = decl.bases
+                if not bases:
+                    # Implicit instantiations have no children so use the
+                    # non-dependent bases of the template
+                    spec = decl.get_specialization()
+                    if not spec.no_decl and spec.is_class_template:
+                        bases = spec.bases
+            elif binder.is_class:
+                bases = binder.bases
+            else:
+                return deps
+            for base in bases:
+                dep = providers.get(base.type.get_canonical().spelling)
+                if dep is not None:
+                    deps.append(dep)
+            return deps
+
+        # Manual priorities only order the binders that are ready together
+        sort_order = Generator.sort_order.get(self.name, [])
+
+        def sort_key(i):
+            priority = 10000
+            for pattern, prio in sort_order:
+                if pattern in binders[i].spelling:
+                    priority = prio
+            return priority, i
+
+        # Topological sort counting the pending dependencies of each binder
+        pending = [0] * len(binders)
+        dependents = {}
+        for i, binder in enumerate(binders):
+            for dep in set(dependencies(binder)):
+                if dep is not binder:
+                    pending[i] += 1
+                    dependents.setdefault(dep, []).append(i)
+        ready = [sort_key(i) for i in range(len(binders)) if not pending[i]]
+        heapify(ready)
+        sorted_binders = []
+        done = set()
+        while ready:
+            _, i = heappop(ready)
+            binder = binders[i]
+            if binder in done:
+                continue
+            done.add(binder)
+            sorted_binders.append(binder)
+            for j in dependents.get(binder, []):
+                pending[j] -= 1
+                if not pending[j]:
+                    heappush(ready, sort_key(j))
+
+        # Cycles are not possible for base classes. Keep any other binders
+        # left in a cycle in their order.
+        for i, binder in enumerate(binders):
+            if pending[i] and binder not in done:
+                done.add(binder)
+                sorted_binders.append(binder)
+        return sorted_binders
 
     def build_includes(self):
         """
@@ -1125,6 +2786,9 @@ class Module(object):
                     self.includes.append(inc)
 
         # Headers for binders in module
+        skip = set(self.includes)
+        skip.update(minus_headers)
+        skip.update(Generator.excluded_headers)
         all_binders = self.sorted_binders + self.templates
         for binder in all_binders:
             binders = [binder] + binder.grouped_binders
@@ -1135,218 +2799,417 @@ class Module(object):
                 if binder_.is_class_template:
                     continue
                 for f in temp:
-                    if (f not in self.includes and
-                            f not in minus_headers and
-                            f not in Generator.excluded_headers):
+                    if f not in skip:
+                        skip.add(f)
                         self.includes.append(f)
 
-    def is_dependent(self, other):
+    @staticmethod
+    def get_refs(binder):
         """
-        Check to see if the this module is dependent on the other module based on their imports.
-        :param binder.core.Module other: The other module.
-        :return: *True* if dependent, *False* otherwise.
-        :rtype: bool
+        Get the type and template references of a binder.
+        :param binder.core.CursorBinder binder: The binder.
+        :return: The references in depth-first order.
+        :rtype: list(binder.core.CursorBinder)
         """
-        if not self.imports and not other.imports:
-            return False
-
-        visited, stack = set(), list(self.imports)
+        refs = Generator.index.get_type_refs(binder)
+        if refs is not None:
+            return refs
+        refs = []
+        stack = [binder]
         while stack:
-            mod_name = stack.pop(0)
-            if mod_name in visited:
-                continue
-            visited.add(mod_name)
-            if mod_name == other.name:
-                return True
-            mod = Generator.get_module(mod_name)
-            if mod is None:
-                return False  # External namespace
-            stack = list(mod.imports) + stack
-        return False
-
-    def is_circular(self, other):
-        """
-        Check if this module and the other try to import each other.
-        :param binder.core.Module other: The other module.
-        :return: *True* if circular, *False* otherwise.
-        :rtype: bool
-        """
-        return self.is_dependent(other) and other.is_dependent(self)
+            item = stack.pop()
+            if item.is_type_ref or item.is_template_ref:
+                refs.append(item)
+            stack.extend(reversed(list(item.get_children())))
+        return refs
+
+    @staticmethod
+    def get_method_refs(method):
+        """
+        Get the type and template references of a method split into those of
+        its parameter and return types and those of its body. References in
+        default arguments are in neither.
+        :param binder.core.CursorBinder method: The method.
+        :return: The signature and body references.
+        :rtype: tuple(list(binder.core.CursorBinder))
+        """
+        signature, body = [], []
+        for child in method.get_children():
+            if child.is_type_ref or child.is_template_ref:
+                signature.append(child)
+            elif child.kind == CursorKind.PARM_DECL:
+                for item in child.get_children():
+                    if item.is_type_ref or item.is_template_ref:
+                        signature.append(item)
+            elif child.kind == CursorKind.COMPOUND_STMT:
+                body += Module.get_refs(child)
+        return signature, body
 
     @property
     def is_excluded(self):
         return self.name in Generator.excluded_mods
 
-    def bind_templates(self, path):
+
+class DeclarationIndex(object):
+    """
+    Index of the declarations found when traversing. The cursors of each
+    declaration are walked once and later queries for their children and type
+    references use the index instead of libclang.
+    :ivar dict(str, list(binder.core.CursorBinder)) qualified_names: Binders
+        by qualified name used to export snapshots.
+    :ivar dict(str, binder.core.CursorBinder) usrs: Binders by USR.
+    :ivar dict(tuple, list(binder.core.CursorBinder)) children: Children of
+        every indexed cursor by cursor key.
+    :ivar dict(tuple, dict) kinds: Children grouped by cursor kind of every
+        indexed cursor by cursor key.
+    :ivar dict(tuple, list(binder.core.CursorBinder)) type_refs: Type and
+        template references in depth-first order of each declaration by
+        cursor key.
+    """
+
+    def __init__(self):
+        self.qualified_names = {}
+        self.usrs = {}
+        self.children = {}
+        self.kinds = {}
+        self.type_refs = {}
+
+    def clear(self):
         """
-        Bind templates.
-        :param str path: Path to write templates.
-        :return:
+        Clear the index.
+        :return: None.
         """
-        # Create module folder
-        if not os.path.isdir(path):
-            os.makedirs(path)
-
-        # Get ordered binders and generate source
-        binders = self.templates
-        for binder in binders:
-            binder.bind(path)
+        self.qualified_names.clear()
+        self.usrs.clear()
+        self.children.clear()
+        self.kinds.clear()
+        self.type_refs.clear()
 
-    def bind(self, path):
+    def add(self, binder, qname, walk=True):
         """
-        Bind the module.
-        :param str path: Path to write sub-directory.
+        Add a declaration and walk all of its descendants.
+        :param binder.core.CursorBinder binder: The binder.
+        :param str qname: The qualified name.
+        :param bool walk: Option to walk the descendants. If not, only the
+            declaration is added and its children are found by libclang.
         :return: None.
         """
-        # Create module folder and main source file
-        if not os.path.isdir(path):
-            os.makedirs(path)
-        fname = '/'.join([path, self.name + '.cxx'])
+        self.qualified_names.setdefault(qname, []).append(binder)
+        if binder.usr:
+            self.usrs[binder.usr] = binder
+        if not walk:
+            return
 
-        # Check if module is split
-        is_split = self.name in Generator.split
+        type_refs = []
+        stack = [binder]
+        while stack:
+            item = stack.pop()
+            if item.is_type_ref or item.is_template_ref:
+                type_refs.append(item)
+            children = [CursorBinder.from_cursor(c)
+                        for c in item.cursor.get_children()]
+            kinds = {}
+            for child in children:
+                kinds.setdefault(child.kind, []).append(child)
+            key = cursor_key(item.cursor)
+            self.children[key] = children
+            self.kinds[key] = kinds
+            stack.extend(reversed(children))
+        self.type_refs[cursor_key(binder.cursor)] = type_refs
+
+    def get_binder(self, usr):
+        """
+        Get an indexed declaration by USR.
+        :param str usr: The USR.
+        :return: The binder or *None* if not indexed.
+        :rtype: binder.core.CursorBinder
+        """
+        return self.usrs.get(usr)
 
-        fout = io.StringIO()
+    def get_children(self, binder):
+        """
+        Get the indexed children of a binder.
+        :param binder.core.CursorBinder binder: The binder.
+        :return: The children or *None* if not indexed.
+        :rtype: list(binder.core.CursorBinder)
+        """
+        if binder.cursor is None:
+            return None
+        return self.children.get(cursor_key(binder.cursor))
 
-        # File header
-        fout.write(SRC_PREFIX)
+    def get_children_of_kind(self, binder, kind):
+        """
+        Get the indexed children of a binder of the given kind.
+        :param binder.core.CursorBinder binder: The binder.
+        :param clang.cindex.CursorKind kind: The cursor kind.
+        :return: The children or *None* if not indexed.
+        :rtype: list(binder.core.CursorBinder)
+        """
+        if binder.cursor is None:
+            return None
+        kinds = self.kinds.get(cursor_key(binder.cursor))
+        if kinds is None:
+            return None
+        return kinds.get(kind, [])
 
-        # Generate binding source and headers
-        binders = self.sorted_binders
-        extra_headers = []
-        for binder in binders:
-            headers = binder.bind(path)
-            if headers:
-                extra_headers += headers
-
-        # Write include files
-        used_includes = set()
-        inc_src = []
-        for inc in self.includes + extra_headers:
-            if inc in used_includes:
-                continue
-            used_includes.add(inc)
-            line = '#include <{}>\n'.format(inc)
-            fout.write(line)
-            inc_src.append(line)
-        fout.write('\n')
+    def get_type_refs(self, binder):
+        """
+        Get the type and template references of an indexed declaration.
+        :param binder.core.CursorBinder binder: The binder.
+        :return: The references or *None* if not indexed.
+        :rtype: list(binder.core.CursorBinder)
+        """
+        if binder.cursor is None:
+            return None
+        return self.type_refs.get(cursor_key(binder.cursor))
 
-        # Write opaque types
-        has_opaque = False
-        for binder in binders:
-            for opaque in binder.opaque:
-                has_opaque = True
-                fout.write(opaque)
-        if has_opaque:
-            fout.write('\n')
-
-        # Write manual text before module
-        before_mod_src = []
-        if self.name in Generator.before_module:
-            for txt in Generator.before_module[self.name]:
-                fout.write('{}\n'.format(txt))
-                before_mod_src.append(txt)
-            fout.write('\n')
-
-        # Write split function signature
-        if is_split:
-            fout.write('// Functions for split modules\n')
-            fout.write('void bind_{}_2(py::module&);\n\n'.format(self.name))
-
-        # Initialize
-        fout.write('PYBIND11_MODULE({}, mod) {{\n\n'.format(self.name))
-
-        # Import other modules
-        has_guards = self.name in Generator.import_guards
-        guarded = set()
-        if has_guards:
-            guarded = Generator.import_guards[self.name]
-        for mod_name in self.imports:
-            if mod_name in guarded:
-                continue
-            if mod_name != self.name:
-                package_name = Generator.get_namespace(mod_name)
-                fout.write('py::module::import(\"{}.{}\");\n'.format(
-                    package_name, mod_name))
-        fout.write('\n')
 
-        # Import guards
-        for mod_name in guarded:
-            package_name = Generator.get_namespace(mod_name)
-            fout.write('struct Import{}{{\n'.format(mod_name))
-            fout.write(
-                '\tImport{}() {{ py::module::import(\"{}.{}\"); }}\n'.format(
-                    mod_name, package_name, mod_name))
-            fout.write('};\n\n')
-
-        # If the module is split in two, only bind half and save the rest for another file
-        split_binders = []
-        if is_split:
-            indx = len(binders) // 2
-            binders, split_binders = binders[:indx], binders[indx:]
+class ClassHierarchy(object):
+    """
+    Inheritance graph of the traversed classes. The bases of each class are
+    resolved once and the transitive bases and summaries of a class are
+    derived from those of its direct bases.
+    :ivar dict(tuple, list) bases: Base specifiers of each class with the
+        class they resolve to by cursor key.
+    :ivar dict(tuple, list(binder.core.CursorBinder)) all_bases: All base
+        specifiers of each class by cursor key.
+    :ivar dict(tuple, bool) transient: Whether a class derives from
+        Standard_Transient by cursor key.
+    :ivar dict(tuple, tuple(set, set)) methods: Names of the pure virtual
+        and other methods of each class definition by cursor key.
+    :ivar dict(tuple, bool) unimplemented: Whether a class has pure virtual
+        methods left by cursor key.
+    """
 
-        # Main bind loop
-        src = []
-        for binder in binders:
-            src.extend(binder.src)
+    def __init__(self):
+        self.bases = {}
+        self.all_bases = {}
+        self.transient = {}
+        self.methods = {}
+        self.unimplemented = {}
 
-        # Patch the file
-        # TODO: Line Number is off
-        patch_src(self.name, src)
+    def clear(self):
+        """
+        Clear the graph.
+        :return: None.
+        """
+        self.bases.clear()
+        self.all_bases.clear()
+        self.transient.clear()
+        self.methods.clear()
+        self.unimplemented.clear()
 
-        # Write it out
-        for line in src:
-            fout.write(line)
-        fout.write('\n')
+    @staticmethod
+    def resolve(base):
+        """
+        Resolve a base specifier to the class whose bases are inherited.
+        :param binder.core.CursorBinder base: The base specifier.
+        :return: The class or *None* if not found.
+        :rtype: binder.core.CursorBinder
+        """
+        decl = base.type.get_declaration()
+        if decl.no_decl:
+            return None
 
-        # Call the split function
-        if is_split:
-            line = 'bind_{}_2(mod);\n\n'.format(self.name)
-            fout.write(line)
+        # Class template
+        if decl.is_class_template:
+            return decl
 
-        # End module
-        fout.write('}\n')
-        overwrite_if_changed(fname, fout)
+        # Template specialization if possible
+        spec = decl.get_specialization()
+        if not spec.no_decl and spec.is_class_template:
+            return spec
+
+        # Regular class
+        if decl.is_class:
+            return decl
+
+        # Underlying type of a typedef
+        if decl.is_typedef:
+            decl = decl.underlying_typedef_type.get_declaration()
+            # Check for a template
+            spec = decl.get_specialization()
+            if not spec.no_decl and spec.is_class_template:
+                return spec
+            return decl
+
+        # Should never get here
+        warnings.warn('Failed to find a base for {}'.format(base.spelling),
+                      RuntimeWarning)
+        return None
+
+    @staticmethod
+    def start(binder):
+        """
+        Get the class to start from when looking up the bases of a binder.
+        If it is a template specialization the template is used.
+        :param binder.core.CursorBinder binder: The binder.
+        :return: The class.
+        :rtype: binder.core.CursorBinder
+        """
+        spec = binder.get_specialization()
+        if not spec.no_decl and spec.is_class_template:
+            return spec
+        return binder
 
-        # Create the split file
-        if is_split:
-            fname = '/'.join([path, self.name + '_2.cxx'])
-            fout = io.StringIO()
+    def get_bases(self, binder):
+        """
+        Get the direct bases of a class.
+        :param binder.core.CursorBinder binder: The class.
+        :return: The base specifiers and the class each resolves to.
+        :rtype: list(tuple(binder.core.CursorBinder))
+        """
+        key = cursor_key(binder.cursor)
+        try:
+            return self.bases[key]
+        except KeyError:
+            bases = [(base, self.resolve(base)) for base in binder.bases]
+            self.bases[key] = bases
+            return bases
 
-            # File header
-            fout.write(SRC_PREFIX)
+    def _get_all_bases(self, binder):
+        key = cursor_key(binder.cursor)
+        try:
+            return self.all_bases[key]
+        except KeyError:
+            pass
+        # Guard against cycles through recursive templates
+        self.all_bases[key] = []
+        bases = []
+        for base, decl in self.get_bases(binder):
+            bases.append(base)
+            if decl is not None:
+                bases += self._get_all_bases(decl)
+        self.all_bases[key] = bases
+        return bases
 
-            # Duplicate all the include files for now
-            fout.writelines(inc_src)
-            fout.write('\n')
+    def get_all_bases(self, binder):
+        """
+        Get all base specifiers of a class in depth-first order.
+        :param binder.core.CursorBinder binder: The class.
+        :return: The base specifiers.
+        :rtype: list(binder.core.CursorBinder)
+        """
+        return self._get_all_bases(self.start(binder))
 
-            # Duplicate text before module
-            if before_mod_src:
-                fout.writelines(before_mod_src)
-                fout.write('\n\n')
+    def _is_transient(self, binder):
+        key = cursor_key(binder.cursor)
+        try:
+            return self.transient[key]
+        except KeyError:
+            pass
+        self.transient[key] = False
+        result = False
+        for base, decl in self.get_bases(binder):
+            if base.type.spelling == 'Standard_Transient' or (
+                    decl is not None and self._is_transient(decl)):
+                result = True
+                break
+        self.transient[key] = result
+        return result
 
-            # Function signature
-            line = 'void bind_{}_2(py::module &mod)\n'.format(self.name)
-            fout.write(line)
-            fout.write('{\n\n')
+    def is_transient(self, binder):
+        """
+        Check if a class is Standard_Transient or derived from it.
+        :param binder.core.CursorBinder binder: The class.
+        :return: *True* if transient, *False* otherwise.
+        :rtype: bool
+        """
+        if binder.type.spelling == 'Standard_Transient':
+            return True
+        return self._is_transient(self.start(binder))
+
+    def get_methods(self, binder):
+        """
+        Get the method names of a class definition.
+        :param binder.core.CursorBinder binder: The class definition.
+        :return: The names of the pure virtual and of the other methods.
+        :rtype: tuple(set(str))
+        """
+        key = cursor_key(binder.cursor)
+        try:
+            return self.methods[key]
+        except KeyError:
+            pure, implemented = set(), set()
+            for m in binder.methods:
+                if m.is_pure_virtual_method:
+                    pure.add(m.spelling)
+                else:
+                    implemented.add(m.spelling)
+            self.methods[key] = pure, implemented
+            return pure, implemented
 
-            # Main bind loop
-            src = []
-            for binder in split_binders:
-                src.extend(binder.src)
+    def has_unimplemented_methods(self, binder):
+        """
+        Check if a class has pure virtual methods of its own or of its bases
+        without an implementation.
+        :param binder.core.CursorBinder binder: The class.
+        :return: *True* if there are any, *False* otherwise.
+        :rtype: bool
+        """
+        # TODO: Doesn't support overloads
+        key = cursor_key(binder.cursor)
+        try:
+            return self.unimplemented[key]
+        except KeyError:
+            pass
+        pure, implemented = self.get_methods(binder)
+        if pure:
+            result = True
+        else:
+            all_virtual_methods = set()
+            all_methods = set(implemented)
+            for base in self.get_all_bases(binder):
+                base = base.get_definition()
+                if base.is_null:
+                    continue
+                pure, implemented = self.get_methods(base)
+                all_virtual_methods.update(pure)
+                all_methods.update(implemented)
+            result = bool(all_virtual_methods.difference(all_methods))
+        self.unimplemented[key] = result
+        return result
 
-            # Patch the split file
-            # TODO: Line Number is off
-            patch_src(self.name, src)
 
-            # Write it out
-            for line in src:
-                fout.write(line)
-            fout.write('\n')
+class MemberIndex(object):
+    """
+    Members of a class gathered in one pass over its children.
+    :param binder.core.CursorBinder binder: The class.
+    :ivar list(binder.core.CursorBinder) ctors: The constructors.
+    :ivar list(binder.core.CursorBinder) dtors: The destructors.
+    :ivar list(binder.core.CursorBinder) fields: The fields.
+    :ivar list(binder.core.CursorBinder) methods: The methods.
+    :ivar list(binder.core.CursorBinder) enums: The enums.
+    :ivar list(binder.core.CursorBinder) nested_classes: The nested classes
+        and structs.
+    :ivar set(str) public_method_names: Names of the public methods.
+    """
 
-            # End module
-            fout.write('}\n')
-            overwrite_if_changed(fname, fout)
+    def __init__(self, binder):
+        self.ctors = []
+        self.dtors = []
+        self.fields = []
+        self.methods = []
+        self.enums = []
+        self.nested_classes = []
+        self.public_method_names = set()
+
+        by_kind = {
+            CursorKind.CONSTRUCTOR: self.ctors,
+            CursorKind.DESTRUCTOR: self.dtors,
+            CursorKind.FIELD_DECL: self.fields,
+            CursorKind.CXX_METHOD: self.methods,
+            CursorKind.ENUM_DECL: self.enums,
+            CursorKind.CLASS_DECL: self.nested_classes,
+            CursorKind.STRUCT_DECL: self.nested_classes,
+        }
+        for child in binder.get_children():
+            members = by_kind.get(child.kind)
+            if members is None:
+                continue
+            members.append(child)
+            if members is self.methods and child.is_public:
+                self.public_method_names.add(child.spelling)
 
 
 class CursorBinder(object):
@@ -1356,73 +3219,169 @@ class CursorBinder(object):
     :ivar clang.cindex.Cursor cursor: The underlying cursor.
     :ivar binder.core.CursorBinder alias: The alias of this binder if
         applicable.
-    :ivar str parent_name: The name of the binding parent.
     :ivar str python_name: Name for binder in Python if different than
         spelling.
-    :ivar str bind_name: Function name for binding.
     :ivar list(str) includes: List of relevant include files for this binder.
     :ivar str module_name: The module name for this binder.
     :ivar str filename: The file where this binder is located.
+
+    .. note:: Use *from_cursor* to get the same binder for the same cursor so
+        cached properties are shared.
+
+    .. note:: Binders use *__slots__* since one is created for every cursor.
+        Lists only used by top-level binders are created on first access and
+        names are interned.
+
+    .. note:: The kind is read when the binder is created. The location,
+        access specifier and method flags are read from libclang at most once
+        when first used.
+
+    .. note:: Binders are equal if their cursors have the same USR, so the
+        same declaration compares equal across translation units, processes
+        and reparsed headers. This also makes the forward declarations and
+        redeclarations of an entity equal to its definition. Cursors without
+        a USR (e.g., references) are compared by their cursor key.
     """
 
+    __slots__ = ('cursor', 'kind', 'alias', '_pname', 'skip', 'macro',
+                 # Storage of the cached_slot properties
+                 'filename_', 'module_name_', 'access_', 'is_definition_',
+                 'is_virtual_method_', 'is_pure_virtual_method_',
+                 'is_abstract_', 'is_const_method_', 'is_static_method_',
+                 'includes_', 'grouped_binders_',
+                 '_display_names_', '_spellings_', 'qualified_display_name_',
+                 'qualified_name_', 'qualified_spelling_',
+                 '_default_python_name_', 'members_',
+                 'default_value_', 'alias_declaration_spelling_',
+                 'is_immutable_', 'usr_', 'identity_')
+
+    # Binders by cursor key
+    _instances = {}
+
+    # Token spellings by source extent
+    _tokens = {}
+
     def __init__(self, cursor):
         self.cursor = cursor
+        try:
+            self.kind = cursor.kind
+        except AttributeError:
+            self.kind = CursorKind.NO_DECL_FOUND
         self.alias = None
-        self.parent_name = 'mod'
         self._pname = None
-        self.bind_name = None
-        self.includes = []
-        self.grouped_binders = []
         self.skip = False
-        self.src = []
-        self.opaque = []
         self.macro = None
 
-        # Filename
+    @cached_slot
+    def filename(self):
+        """
+        :return: The file where this binder is located.
+        :rtype: str
+        """
         try:
-            fname = cursor.location.file.name
-            fname = fname.replace('\\', '/').split('/')[-1]
+            fname = self.cursor.location.file.name
         except AttributeError:
-            fname = None
-        self.filename = fname
+            return None
+        return sys.intern(fname.replace('\\', '/').split('/')[-1])
 
-        # Module name based on filename
-        name = '__None__'
-        if fname is not None:
-            name = fname
-            delimiter = '.'
-            if '_' in name:
-                delimiter = '_'
-            name = name.split(delimiter)[0]
-        self.module_name = name
+    @cached_slot
+    def module_name(self):
+        """
+        :return: The module name based on the filename.
+        :rtype: str
+        """
+        fname = self.filename
+        if fname is None:
+            return '__None__'
+        return Generator.get_header_module(fname)[0]
+
+    @classmethod
+    def from_cursor(cls, cursor):
+        """
+        Get the binder of a cursor. The same binder is returned for the same
+        cursor until the binders are cleared.
+        :param clang.cindex.Cursor cursor: The cursor.
+        :return: The binder.
+        :rtype: binder.core.CursorBinder
+        """
+        if cursor is None or cursor.kind in NULL_CURSOR_KINDS:
+            return cls(cursor)
+        key = cursor_key(cursor)
+        try:
+            return cls._instances[key]
+        except KeyError:
+            binder = cls._instances[key] = cls(cursor)
+            return binder
+
+    @classmethod
+    def clear_instances(cls):
+        """
+        Clear the shared binders. Must be called when their translation unit
+        is no longer valid.
+        :return: None.
+        """
+        cls._instances.clear()
+        cls._tokens.clear()
+
+    @cached_slot
+    def includes(self):
+        """
+        :return: List of relevant include files for this binder.
+        :rtype: list(str)
+        """
+        return []
+
+    @cached_slot
+    def grouped_binders(self):
+        """
+        :return: Binders grouped with this one, like overloaded functions.
+        :rtype: list(binder.core.CursorBinder)
+        """
+        return []
+
+    @cached_slot
+    def usr(self):
+        """
+        :return: The Unified Symbol Resolution of the cursor or an empty
+            string if it has none.
+        :rtype: str
+        """
+        if self.is_null:
+            return ''
+        return sys.intern(self.cursor.get_usr())
+
+    @cached_slot
+    def identity(self):
+        """
+        :return: The USR and if the cursor is a definition if it has a USR,
+            else its cursor key. A forward declaration is not equal to the
+            definition of the entity.
+        :rtype: tuple
+        """
+        if self.cursor is None:
+            return None
+        if self.usr:
+            return self.usr, self.is_definition
+        return cursor_key(self.cursor)
 
     def __hash__(self):
-        return self.cursor.hash
+        return hash(self.identity)
 
     def __eq__(self, other):
-        return self.cursor.hash == other.cursor.hash
+        if not isinstance(other, CursorBinder):
+            return NotImplemented
+        return self.identity == other.identity
 
     def __repr__(self):
         return 'Cursor: {} ({})'.format(self.qualified_name, self.kind)
 
-    @property
-    def kind(self):
-        """
-        :return: The cursor kind.
-        :rtype: clang.cindex.CursorKind
-        """
-        try:
-            return self.cursor.kind
-        except AttributeError:
-            return CursorKind.NO_DECL_FOUND
-
     @property
     def type(self) -> "TypeBinder":
         """
         :return: The cursor type.
         :rtype: binder.core.TypeBinder
         """
-        return TypeBinder(self.cursor.type)
+        return TypeBinder.from_type(self.cursor.type)
 
     @property
     def canonical(self) -> "CursorBinder":
@@ -1430,7 +3389,7 @@ class CursorBinder(object):
         :return: The canonical cursor.
         :rtype: binder.core.CursorBinder
         """
-        return CursorBinder(self.cursor.canonical)
+        return CursorBinder.from_cursor(self.cursor.canonical)
 
     @property
     def underlying_typedef_type(self) -> "TypeBinder":
@@ -1438,7 +3397,7 @@ class CursorBinder(object):
         :return: The cursor underlying typedef type.
         :rtype: binder.core.TypeBinder
         """
-        return TypeBinder(self.cursor.underlying_typedef_type)
+        return TypeBinder.from_type(self.cursor.underlying_typedef_type)
 
     @property
     def rtype(self) -> "TypeBinder":
@@ -1446,7 +3405,7 @@ class CursorBinder(object):
         :return: The cursor result type.
         :rtype: binder.core.TypeBinder
         """
-        return TypeBinder(self.cursor.result_type)
+        return TypeBinder.from_type(self.cursor.result_type)
 
     @property
     def display_name(self) -> str:
@@ -1459,21 +3418,43 @@ class CursorBinder(object):
         except AttributeError:
             return 'NULL'
 
-    @property
+    @cached_slot
+    def _display_names(self):
+        """
+        :return: The display names of the semantic parents and this binder,
+            stopping at the first parent without one. Derived from the
+            cached names of the parent.
+        :rtype: tuple(str)
+        """
+        if self.is_null or self.is_tu:
+            return ()
+        name = self.display_name
+        if not name:
+            return ()
+        return self.parent._display_names + (sys.intern(name),)
+
+    @cached_slot
+    def _spellings(self):
+        """
+        :return: The spellings of the semantic parents and this binder,
+            stopping at the first parent without one. Derived from the
+            cached spellings of the parent.
+        :rtype: tuple(str)
+        """
+        if self.is_null or self.is_tu:
+            return ()
+        name = self.spelling
+        if not name:
+            return ()
+        return self.parent._spellings + (sys.intern(name),)
+
+    @cached_slot
     def qualified_display_name(self) -> str:
         """
         :return: The qualified display name.
         :rtype: str
         """
-        names = []
-        b = self
-        while not b.is_null and not b.is_tu:
-            if name := b.display_name:
-                names.append(name)
-            else:
-                break
-            b = b.parent
-        names.reverse()
+        names = list(self._display_names)
         if "__1" in names:
             # Hack for std::__1::basic_ostream
             names.remove("__1")
@@ -1482,9 +3463,9 @@ class CursorBinder(object):
         if 'operator()' in qname:
             # Hack for call operator...
             qname = qname.split('()')[0]
-            return ''.join([qname, '()'])
+            return sys.intern(''.join([qname, '()']))
 
-        return qname
+        return sys.intern(qname)
 
     @property
     def spelling(self) -> str:
@@ -1594,60 +3575,57 @@ class CursorBinder(object):
     def is_namespace(self) -> bool:
         return self.kind == CursorKind.NAMESPACE
 
+    @cached_slot
+    def access(self):
+        """
+        :return: The access specifier.
+        :rtype: clang.cindex.AccessSpecifier
+        """
+        return self.cursor.access_specifier
+
     @property
     def is_public(self):
-        return not self.is_private and not self.is_protected
+        return self.access not in (AccessSpecifier.PRIVATE,
+                                   AccessSpecifier.PROTECTED)
 
     @property
     def is_private(self):
-        return self.cursor.access_specifier == AccessSpecifier.PRIVATE
+        return self.access == AccessSpecifier.PRIVATE
 
     @property
     def is_protected(self):
-        return self.cursor.access_specifier == AccessSpecifier.PROTECTED
+        return self.access == AccessSpecifier.PROTECTED
 
-    @property
+    @cached_slot
     def is_definition(self):
         return self.cursor.is_definition()
 
-    @property
+    @cached_slot
     def is_virtual_method(self):
         return self.cursor.is_virtual_method()
 
-    @property
+    @cached_slot
     def is_pure_virtual_method(self):
         return self.cursor.is_pure_virtual_method()
 
-    @property
+    @cached_slot
     def is_abstract(self):
         return self.cursor.is_abstract_record()
 
     @property
     def has_unimplemented_methods(self):
-        # TODO: Doesn't support overloads
-        all_virtual_methods = set()
-        all_methods = set()
-        for m in self.methods:
-            if m.is_pure_virtual_method:
-                return True
-            all_methods.add(m.spelling)
-
-        for base in self._all_bases:
-            base = base.get_definition()
-            if base.is_null:
-                continue
-            for m in base.methods:
-                if m.is_pure_virtual_method:
-                    all_virtual_methods.add(m.spelling)
-                else:
-                    all_methods.add(m.spelling)
-        return all_virtual_methods.difference(all_methods)
+        """
+        :return: Check if the class or its bases have pure virtual methods
+            that are not implemented.
+        :rtype: bool
+        """
+        return Generator.hierarchy.has_unimplemented_methods(self)
 
-    @property
+    @cached_slot
     def is_const_method(self):
         return self.cursor.is_const_method()
 
-    @property
+    @cached_slot
     def is_static_method(self):
         return self.cursor.is_static_method()
 
@@ -1679,10 +3657,9 @@ class CursorBinder(object):
             name = self.qualified_name
             # Special case trying to exclude functions with certain signatures
             dname = self.qualified_display_name
-            rtype = self.rtype.spelling
-            return (any(fnmatch(name, pat) for pat in Generator.excluded_functions) or
-                    any(fnmatch(dname, pat) for pat in Generator.excluded_functions) or
-                    any(fnmatch(rtype, pat) for pat in Generator.excluded_rtypes))
+            functions = Generator.excluded_functions
+            return (functions.match(name) or functions.match(dname) or
+                    Generator.excluded_rtypes.match(self.rtype.spelling))
         elif self.is_class or self.is_class_template:
             return self.qualified_name in Generator.excluded_classes
         elif self.is_typedef:
@@ -1697,11 +3674,11 @@ class CursorBinder(object):
             if self.is_static_method:
                 name += '_'
                 fname += '_'
-            rtype = self.rtype.spelling
-            return (any(fnmatch(name, pat) for pat in Generator.excluded_functions) or
-                    any(fnmatch(fname, pat) for pat in Generator.excluded_fnames) or
-                    any(fnmatch(dname, pat) for pat in Generator.excluded_functions) or
-                    any(fnmatch(rtype, pat) for pat in Generator.excluded_rtypes))
+            functions = Generator.excluded_functions
+            return (functions.match(name) or
+                    Generator.excluded_fnames.match(fname) or
+                    functions.match(dname) or
+                    Generator.excluded_rtypes.match(self.rtype.spelling))
 
         return False
 
@@ -1712,13 +3689,7 @@ class CursorBinder(object):
             from it.
         :rtype: bool
         """
-        if self.type.spelling == 'Standard_Transient':
-            return True
-        bases = self._all_bases
-        for base in bases:
-            if base.type.spelling == 'Standard_Transient':
-                return True
-        return False
+        return Generator.hierarchy.is_transient(self)
 
     @property
     def is_operator(self):
@@ -1737,9 +3708,7 @@ class CursorBinder(object):
         """
         if self.is_cxx_method and self.is_public and self.rtype.is_lvalue:
             setter_name = f'Set{self.spelling}'
-            for method in self.parent.methods:
-                if method.spelling == setter_name and method.is_public:
-                    return True
+            return setter_name in self.parent.members.public_method_names
         return False
 
     @property
@@ -1754,7 +3723,7 @@ class CursorBinder(object):
             return False
         return True
 
-    @property
+    @cached_slot
     def is_immutable(self):
         """
         :return: Check if the type is a Python immutable type.
@@ -1772,59 +3741,34 @@ class CursorBinder(object):
             methods).
         :rtype: bool
         """
-        method_names = set()
-        for f in self.methods:
-            if not f.is_public:
-                continue
-            method_names.add(f.spelling)
-
+        method_names = self.members.public_method_names
         return 'begin' in method_names and 'end' in method_names
 
-    @property
+    @cached_slot
     def qualified_name(self):
         """
         :return: The fully qualified displayed name.
         :rtype: str
         """
-        names = []
-        b = self
-        while not b.is_null and not b.is_tu:
-            name = b.display_name
-            if name:
-                names.append(b.display_name)
-            else:
-                break
-            b = b.parent
-        names.reverse()
-        qname = '::'.join(names)
+        qname = '::'.join(self._display_names)
 
         if 'operator()' in qname:
             # Hack for call operator...
             qname = qname.split('()')[0]
-            return ''.join([qname, '()'])
+            return sys.intern(''.join([qname, '()']))
         # Don't return function interface portion
         elif '(' in qname:
-            return qname.split('(')[0]
+            return sys.intern(qname.split('(')[0])
         else:
-            return qname
+            return sys.intern(qname)
 
-    @property
+    @cached_slot
     def qualified_spelling(self):
         """
         :return: The fully qualified spelling.
         :rtype: str
         """
-        names = []
-        b = self
-        while not b.is_null and not b.is_tu:
-            name = b.spelling
-            if name:
-                names.append(b.spelling)
-            else:
-                break
-            b = b.parent
-        names.reverse()
-        return '::'.join(names)
+        return sys.intern('::'.join(self._spellings))
 
     @property
     def python_name(self):
@@ -1834,12 +3778,19 @@ class CursorBinder(object):
         """
         if self._pname is not None:
             return self._pname
+        return self._default_python_name
+
+    @cached_slot
+    def _default_python_name(self):
+        """
+        :return: The Python name if not set.
+        :rtype: str
+        """
         if self.is_nested:
             name = self.spelling
         else:
             name = self.qualified_spelling
-        name = name.replace('::', '_')
-        return name
+        return name.replace('::', '_')
 
     @python_name.setter
     def python_name(self, pname):
@@ -1851,7 +3802,7 @@ class CursorBinder(object):
         :return: The parent binder.
         :rtype: binder.core.CursorBinder
         """
-        return CursorBinder(self.cursor.semantic_parent)
+        return CursorBinder.from_cursor(self.cursor.semantic_parent)
 
     @property
     def docs(self):
@@ -1872,63 +3823,21 @@ class CursorBinder(object):
         """
         return list(self.get_children_of_kind(CursorKind.CXX_BASE_SPECIFIER))
 
-    @cached_property
+    @property
     def _all_bases(self):
         """
         :return: All base classes.
         :rtype: list(binder.core.CursorBinder)
         """
+        return Generator.hierarchy.get_all_bases(self)
 
-        def _get_bases(_c):
-            for base in _c.bases:
-                bases.append(base)
-                # Get declaration
-                _decl = base.type.get_declaration()
-                if _decl.no_decl:
-                    continue
-
-                # Get bases of class template
-                if _decl.is_class_template:
-                    _get_bases(_decl)
-                    continue
-
-                # Get template specialization if possible
-                _spec = _decl.get_specialization()
-                if not _spec.no_decl and _spec.is_class_template:
-                    _get_bases(_spec)
-                    continue
-
-                # Get bases of regular class
-                if _decl.is_class:
-                    _get_bases(_decl)
-                    continue
-
-                # Get bases of a typedef
-                if _decl.is_typedef:
-                    # Get underlying type if a typedef
-                    # c = base.type.get_canonical().get_declaration()
-                    _decl = _decl.underlying_typedef_type.get_declaration()
-                    # Check for a template
-                    _spec = _decl.get_specialization()
-                    if not _spec.no_decl and _spec.is_class_template:
-                        _get_bases(_spec)
-                    else:
-                        _get_bases(_decl)
-                    continue
-
-                # Should never get here
-                warnings.warn('Failed to find a base for {}'.format(base.spelling), RuntimeWarning)
-
-        bases = []
-        # If "self" is a template specialization, try and get it first before
-        # starting search for base classes.
-        # Get template specialization if possible
-        spec = self.get_specialization()
-        if not spec.no_decl and spec.is_class_template:
-            _get_bases(spec)
-        else:
-            _get_bases(self)
-        return bases
+    @cached_slot
+    def members(self):
+        """
+        :return: The members of the class.
+        :rtype: binder.core.MemberIndex
+        """
+        return MemberIndex(self)
 
     @property
     def ctors(self):
@@ -1936,7 +3845,7 @@ class CursorBinder(object):
         :return: List of constructors.
         :rtype: list(binder.core.CursorBinder)
         """
-        return list(self.get_children_of_kind(CursorKind.CONSTRUCTOR))
+        return list(self.members.ctors)
 
     @property
     def dtors(self):
@@ -1944,7 +3853,7 @@ class CursorBinder(object):
         :return: List of destructors.
         :rtype: list(binder.core.CursorBinder)
         """
-        return list(self.get_children_of_kind(CursorKind.DESTRUCTOR))
+        return list(self.members.dtors)
 
     @property
     def has_public_dtor(self):
@@ -1952,7 +3861,7 @@ class CursorBinder(object):
         :return: Check if the binder has a public destructor.
         :rtype: bool
         """
-        return any(self.get_children_of_kind(CursorKind.DESTRUCTOR, True))
+        return any(dtor.is_public for dtor in self.members.dtors)
 
     @property
     def fields(self):
@@ -1960,7 +3869,7 @@ class CursorBinder(object):
         :return: List of fields.
         :rtype: list(binder.core.CursorBinder)
         """
-        return list(self.get_children_of_kind(CursorKind.FIELD_DECL))
+        return list(self.members.fields)
 
     @property
     def enums(self):
@@ -1968,7 +3877,7 @@ class CursorBinder(object):
         :return: List of enums.
         :rtype: list(binder.core.CursorBinder)
         """
-        return list(self.get_children_of_kind(CursorKind.ENUM_DECL))
+        return list(self.members.enums)
 
     @property
     def methods(self):
@@ -1976,7 +3885,7 @@ class CursorBinder(object):
         :return: List of class methods.
         :rtype: list(binder.core.CursorBinder)
         """
-        return list(self.get_children_of_kind(CursorKind.CXX_METHOD))
+        return list(self.members.methods)
 
     @property
     def nested_classes(self):
@@ -1984,7 +3893,7 @@ class CursorBinder(object):
         :return: List of nested classes.
         :rtype: list(binder.core.CursorBinder)
         """
-        return list(self.get_children_of_kind(CursorKind.CLASS_DECL, CursorKind.STRUCT_DECL))
+        return list(self.members.nested_classes)
 
     @property
     def parameters(self):
@@ -1995,6 +3904,21 @@ class CursorBinder(object):
         return list(self.get_children_of_kind(CursorKind.PARM_DECL))
 
     @property
+    def tokens(self):
+        """
+        :return: The spellings of the tokens of the cursor extent. Each
+            extent is only tokenized once.
+        :rtype: tuple(str)
+        """
+        key = extent_key(self.cursor.extent)
+        try:
+            return CursorBinder._tokens[key]
+        except KeyError:
+            tokens = tuple(t.spelling for t in self.cursor.get_tokens())
+            CursorBinder._tokens[key] = tokens
+            return tokens
+
+    @cached_slot
     def default_value(self):
         """
         :return: A string representation of the default value if available
@@ -2004,15 +3928,39 @@ class CursorBinder(object):
         if not (self.is_param or self.is_template_type_param):
             return ''
         txt = ''
-        for t in self.cursor.get_tokens():
-            if t.spelling == ">>":
+        for t in self.tokens:
+            if t == ">>":
                 txt += ">" # clang bug?
             else:
-                txt += t.spelling
+                txt += t
         if not txt or '=' not in txt:
             return ''
         return txt.split('=')[-1]
 
+    @cached_slot
+    def alias_declaration_spelling(self):
+        """
+        :return: The spelling of the aliased type of a using or type alias
+            declaration from its tokens.
+        :rtype: str
+        """
+        toks = []
+        MODIFIERS = ("const", "long", "unsigned", "typename")
+        all_toks = self.tokens
+        for i, v in enumerate(all_toks):
+            # Keep space after const and long
+            if v in MODIFIERS:
+                toks.append(f"{v} ")
+                continue
+            # HACK...
+            last_tok = toks[-1] if toks else None
+            next_tok = all_toks[i+1] if i+1 < len(all_toks) else None
+            if v == "handle" and next_tok == "<" and last_tok != ":":
+                toks.append("opencascade::handle")
+                continue
+            toks.append(v)
+        return "".join(toks[3:])
+
     @property
     def enum_constants(self):
         """
@@ -2074,12 +4022,8 @@ class CursorBinder(object):
         """
         if self.is_abstract:
             return False
-        items = [self] + self._all_bases
-        for item in items:
-            item.get_definition()
-            if item.ctors:
-                return False
-        return True
+        # Only the constructors declared by the class itself are checked
+        return not self.ctors
 
     def get_definition(self):
         """
@@ -2089,7 +4033,7 @@ class CursorBinder(object):
         :return: The definition.
         :rtype: binder.core.CursorBinder
         """
-        return CursorBinder(self.cursor.get_definition())
+        return CursorBinder.from_cursor(self.cursor.get_definition())
 
     def get_specialization(self):
         """
@@ -2107,7 +4051,7 @@ class CursorBinder(object):
             #    child._tu = self._tu
             # AttributeError: 'Cursor' object has no attribute '_tu
             spec._tu = self.cursor._tu
-        return CursorBinder(spec)
+        return CursorBinder.from_cursor(spec)
 
     def get_children(self):
         """
@@ -2115,8 +4059,13 @@ class CursorBinder(object):
         :return: The children.
         :rtype: list(binder.core.CursorBinder)
         """
+        if Generator.index is not None:
+            children = Generator.index.get_children(self)
+            if children is not None:
+                yield from children
+                return
         for child in self.cursor.get_children():
-            yield CursorBinder(child)
+            yield CursorBinder.from_cursor(child)
 
     def get_children_of_kind(self, *kind, only_public=False):
         """
@@ -2126,6 +4075,14 @@ class CursorBinder(object):
         :return: List of children.
         :rtype: Generator(binder.core.CursorBinder)
         """
+        if len(kind) == 1 and Generator.index is not None:
+            children = Generator.index.get_children_of_kind(self, kind[0])
+            if children is not None:
+                for c in children:
+                    if only_public and not c.is_public:
+                        continue
+                    yield c
+                return
         for c in self.get_children():
             if c.kind not in kind:
                 continue
@@ -2141,7 +4098,7 @@ class CursorBinder(object):
         """
         for cursor in self.cursor.walk_preorder():
             if not cursor.kind.is_translation_unit():
-                yield CursorBinder(cursor)
+                yield CursorBinder.from_cursor(cursor)
 
     def build_includes(self):
         """
@@ -2159,7 +4116,10 @@ class CursorBinder(object):
                     includes.append(f)
 
         # Traverse the binder and look for any type references.
-        for item in self.dfs():
+        type_refs = Generator.index.get_type_refs(self)
+        if type_refs is None:
+            type_refs = self.dfs()
+        for item in type_refs:
             if not item.is_type_ref and not item.is_template_ref:
                 continue
 
@@ -2212,64 +4172,58 @@ class CursorBinder(object):
 
         return self.includes
 
-    def bind(self, path):
-        """
-        Bind the type.
-        :return: None.
-        """
-        logger.write('\tBinding {}.\n'.format(self.qualified_spelling))
-        if self.is_enum:
-            return bind_enum(self)
-        elif self.is_function:
-            return bind_function(self)
-        elif self.is_class:
-            return bind_class(self)
-        elif self.is_typedef:
-            return bind_typedef(self)
-        elif self.is_class_template:
-            bind_class_template(self, path)
-        else:
-            logger.write('\tUnsupported {}.\n'.format(self.qualified_spelling))
-
-    def generate(self):
-        """
-        Generate the source text for the binder.
-        :return: The source text.
-        :rtype: list(str)
-        """
-        if self.is_enum:
-            return generate_enum(self)
-        elif self.is_function:
-            return generate_function(self)
-        elif self.is_class:
-            return generate_class(self)
-        elif self.is_typedef:
-            return generate_typedef2(self)
-        elif self.is_class_template:
-            return generate_class_template(self)
-        elif self.is_cxx_method:
-            return generate_method(self)
-        elif self.is_field:
-            return generate_field(self)
-        elif self.is_constructor:
-            return generate_ctor(self)
-        return []
-
 
 class TypeBinder(object):
     """
     Binder for types.
     :param clang.cindex.Type type_: The type.
     :ivar clang.cindex.Type type: The underlying type.
+
+    .. note:: Use *from_type* to get the same binder for the same type.
     """
 
+    __slots__ = ('type',
+                 # Storage of the cached_slot properties
+                 'spelling_', 'kind_', 'alias_spelling_', 'is_alias_',
+                 'is_opaque_', 'resolution_')
+
+    # Binders by type kind and data
+    _instances = {}
+
     def __init__(self, type_):
         self.type = type_
 
+    @classmethod
+    def from_type(cls, type_):
+        """
+        Get the binder of a type. The same binder is returned for the same
+        type until the binders are cleared.
+        :param clang.cindex.Type type_: The type.
+        :return: The binder.
+        :rtype: binder.core.TypeBinder
+        """
+        if type_ is None:
+            return cls(type_)
+        key = type_key(type_)
+        try:
+            return cls._instances[key]
+        except KeyError:
+            binder = cls._instances[key] = cls(type_)
+            return binder
+
+    @classmethod
+    def clear_instances(cls):
+        """
+        Clear the shared binders. Must be called when their translation unit
+        is no longer valid.
+        :return: None.
+        """
+        cls._instances.clear()
+
     def __repr__(self):
         return 'Type: {} ({})'.format(self.spelling, self.kind)
 
-    @property
+    @cached_slot
     def spelling(self):
         """
         :return: The spelling.
@@ -2277,34 +4231,44 @@ class TypeBinder(object):
         """
         return self.type.spelling
 
-    @property
+    @cached_slot
     def alias_spelling(self):
         """
         :return: The spelling of the aliased type (using).
         :rtype: str
+
+        .. note:: Pointees and underlying typedef types are resolved in a
+            loop and the spelling of each type along the way is cached.
         """
-        canonical_spelling = self.get_canonical().spelling
-        # Hack for `const Standard_Address`, `const Standard_Address &`, `const Standard_CString &`
-        if canonical_spelling in (
-            "void *const",
-            "void *const &",
-            "const char *const &",
-            "const std::string &",
-        ):
-            return canonical_spelling
-
-        spelling = default_spelling = self.spelling
-        if self.is_pointer_like:
-            ref = self.get_pointee()
-            if self.is_pointer:
-                c = "*"
-            elif self.is_lvalue:
-                c = "&"
-            else:
-                c = "&&"
-            spelling = f"{ref.alias_spelling}{c}"
-        else:
-            d = self.get_declaration()
+        # Types wrapping the one resolved next with their canonical
+        # spelling, spelling and suffix
+        frames = []
+        type_ = self
+        while True:
+            try:
+                spelling = type_.alias_spelling_
+                break
+            except AttributeError:
+                pass
+
+            canonical_spelling = type_.get_canonical().spelling
+            if canonical_spelling in ALIAS_CANONICAL_SPELLINGS:
+                spelling = type_.alias_spelling_ = canonical_spelling
+                break
+
+            spelling = default_spelling = type_.spelling
+            if type_.is_pointer_like:
+                if type_.is_pointer:
+                    c = "*"
+                elif type_.is_lvalue:
+                    c = "&"
+                else:
+                    c = "&&"
+                frames.append((type_, canonical_spelling, default_spelling, c))
+                type_ = type_.get_pointee()
+                continue
+
+            d = type_.get_declaration()
             if d.is_enum:
                 spelling = d.qualified_display_name
             elif d.is_class and d.is_nested:
@@ -2317,27 +4281,33 @@ class TypeBinder(object):
             elif d.is_typedef:
                 underlying_type = d.underlying_typedef_type
                 if underlying_type.is_fn_ptr:
-                    spelling = self.get_canonical().spelling
+                    spelling = canonical_spelling
                 else:
-                    spelling = underlying_type.alias_spelling
+                    frames.append((type_, canonical_spelling,
+                                   default_spelling, ""))
+                    type_ = underlying_type
+                    continue
             elif d.is_using_decl or d.is_type_alias_decl:
-                toks = []
-                MODIFIERS = ("const", "long", "unsigned", "typename")
-                all_toks = [it.spelling for it in d.cursor.get_tokens()]
-                for i, v in enumerate(all_toks):
-                    # Keep space after const and long
-                    if v in MODIFIERS:
-                        toks.append(f"{v} ")
-                        continue
-                    # HACK...
-                    last_tok = toks[-1] if toks else None
-                    next_tok = all_toks[i+1] if i+1 < len(all_toks) else None
-                    if v == "handle" and next_tok == "<" and last_tok != ":":
-                        toks.append("opencascade::handle")
-                        continue
-                    toks.append(v)
-                spelling = "".join(toks[3:])
+                spelling = d.alias_declaration_spelling
+            spelling = type_.alias_spelling_ = type_._qualify_alias_spelling(
+                spelling, canonical_spelling, default_spelling)
+            break
+
+        for type_, canonical_spelling, default_spelling, c in reversed(frames):
+            spelling = type_.alias_spelling_ = type_._qualify_alias_spelling(
+                f"{spelling}{c}", canonical_spelling, default_spelling)
+        return spelling
 
+    def _qualify_alias_spelling(self, spelling, canonical_spelling,
+                                default_spelling):
+        """
+        Add the const qualifier of the type to an alias spelling.
+        :param str spelling: The alias spelling.
+        :param str canonical_spelling: The spelling of the canonical type.
+        :param str default_spelling: The spelling of the type.
+        :return: The qualified alias spelling.
+        :rtype: str
+        """
         if self.is_const_qualified and not spelling.startswith("const "):
             if default_spelling.endswith("*const") and spelling.endswith("*"):
                 # Apparently there is a difference between 'const T*' and 'T *const'
@@ -2349,11 +4319,30 @@ class TypeBinder(object):
 
         return spelling
 
-    @property
+    @cached_slot
+    def resolution(self):
+        """
+        :return: The spelling to use in bindings, whether the type is an
+            alias, opaque, array-like and pointer-like. The spelling is the
+            alias spelling for aliases and a void pointer for opaque types.
+        :rtype: tuple(str, bool, bool, bool, bool)
+        """
+        is_alias = self.is_alias
+        is_opaque = self.is_opaque
+        if is_opaque:
+            spelling = f"void* /* {self.spelling} */"
+        elif is_alias:
+            spelling = self.alias_spelling
+        else:
+            spelling = self.spelling
+        return (spelling, is_alias, is_opaque, self.is_array_like,
+                self.is_pointer_like)
+
+    @cached_slot
     def kind(self):
         """
-        :return: The cursor kind.
-        :rtype: clang.cindex.CursorKind
+        :return: The type kind.
+        :rtype: clang.cindex.TypeKind
         """
         return self.type.kind
 
@@ -2409,7 +4398,7 @@ class TypeBinder(object):
     def is_const_qualified(self):
         return self.type.is_const_qualified()
 
-    @property
+    @cached_slot
     def is_opaque(self):
         """ An opaque type with no known definition """
         if self.is_pointer:
@@ -2426,23 +4415,21 @@ class TypeBinder(object):
                 return True
         return False
 
-    @property
+    @cached_slot
     def is_alias(self):
-        if self.is_elaborated:
-            d = self.get_declaration()
-            return (
-                d.is_type_alias_decl
-                or d.is_using_decl
-                or d.is_typedef
-                or d.is_class
-                or d.is_enum
-            )
-        elif self.is_pointer_like:
-            try:
-                return self.get_pointee().is_alias
-            except RecursionError:
-                pass
-        return False
+        type_ = self
+        while not type_.is_elaborated:
+            if not type_.is_pointer_like:
+                return False
+            type_ = type_.get_pointee()
+        d = type_.get_declaration()
+        return (
+            d.is_type_alias_decl
+            or d.is_using_decl
+            or d.is_typedef
+            or d.is_class
+            or d.is_enum
+        )
 
     def get_declaration(self):
         """
@@ -2450,7 +4437,7 @@ class TypeBinder(object):
         :return: The declaration.
         :rtype: binder.core.CursorBinder
         """
-        return CursorBinder(self.type.get_declaration())
+        return CursorBinder.from_cursor(self.type.get_declaration())
 
     def get_canonical(self):
         """
@@ -2458,7 +4445,7 @@ class TypeBinder(object):
         :return: The canonical type.
         :rtype: binder.core.TypeBinder
         """
-        return TypeBinder(self.type.get_canonical())
+        return TypeBinder.from_type(self.type.get_canonical())
 
     def get_pointee(self):
         """
@@ -2466,14 +4453,317 @@ class TypeBinder(object):
         :return: The pointee.
         :rtype: binder.core.TypeBinder
         """
-        return TypeBinder(self.type.get_pointee())
+        return TypeBinder.from_type(self.type.get_pointee())
+
+
+class IRBuilder(object):
+    """
+    Builder of the intermediate representation of the bindings. Each binder
+    is converted to a node once so the nodes are shared like the binders.
+    Only the public members of classes are converted.
+    """
+
+    def __init__(self):
+        self._nodes = {}
+
+    def build(self, package_name, modules, all_modules=None):
+        """
+        Build the representation of the modules.
+        :param str package_name: Name of the main package.
+        :param list(binder.core.Module) modules: The sorted modules.
+        :param list(binder.core.Module) all_modules: The modules whose class
+            templates are available to the others. If *None* only those of
+            the given modules are.
+        :return: The representation.
+        :rtype: pybinder.ir.BindingIR
+        """
+        ir = BindingIR(package_name, deepcopy(Generator.get_bind_settings()))
+        for mod in modules:
+            ir.modules.append(self.module(mod))
+        if all_modules is None:
+            all_modules = modules
+        ir.templates = [template_bind_name(binder) for mod in all_modules
+                        for binder in mod.templates]
+        return ir
+
+    def module(self, mod):
+        """
+        Build the representation of a module.
+        :param binder.core.Module mod: The sorted module.
+        :return: The module.
+        :rtype: pybinder.ir.ModuleNode
+        """
+        node = ModuleNode(mod.name)
+        node.is_excluded = mod.is_excluded
+        node.includes = list(mod.includes)
+        node.imports = list(mod.imports)
+        node.reduced_imports = list(mod.reduced_imports)
+        guarded = Generator.import_guards.get(mod.name, set())
+        node.import_guards = [name for name in mod.imports
+                              if name in guarded or name in mod.lazy_imports]
+        node.import_guards += sorted(set(guarded).difference(mod.imports))
+        node.lazy_imports = list(mod.lazy_imports)
+        if not node.is_excluded:
+            node.binders = [self.node(b) for b in mod.sorted_binders]
+        node.templates = [self.node(b) for b in mod.templates]
+        return node
+
+    def node(self, binder):
+        """
+        Get the node of a binder.
+        :param binder.core.CursorBinder binder: The binder.
+        :return: The node.
+        :rtype: pybinder.ir.Node
+        """
+        if binder.is_null:
+            return Node(binder.kind.name)
+        key = cursor_key(binder.cursor)
+        try:
+            return self._nodes[key]
+        except KeyError:
+            pass
+        node = self._nodes[key] = Node(binder.kind.name)
+        fill = IRBuilder.FILL_FUNCTIONS.get(binder.kind, IRBuilder.fill_other)
+        fill(self, node, binder)
+        return node
+
+    @staticmethod
+    def type_node(type_, signature=False):
+        """
+        Get the node of a type.
+        :param binder.core.TypeBinder type_: The type.
+        :param bool signature: Option to resolve aliases and opaque types
+            for parameter and return types.
+        :return: The node.
+        :rtype: pybinder.ir.TypeNode
+        """
+        node = TypeNode()
+        node.spelling = type_.spelling
+        node.is_const_qualified = type_.is_const_qualified
+        node.is_pointer_like = type_.is_pointer_like
+        node.is_array_like = type_.is_array_like
+        node.is_record = type_.is_record
+        if signature:
+            node.resolution = type_.resolution
+            node.is_alias = type_.is_alias
+            node.is_opaque = type_.is_opaque
+            if node.is_alias:
+                node.alias_spelling = type_.alias_spelling
+        return node
+
+    def fill_declaration(self, node, binder):
+        node.usr = binder.usr
+        node.spelling = binder.spelling
+        node.qualified_name = binder.qualified_name
+        node.is_public = binder.is_public
+        node.is_excluded = binder.is_excluded
+
+    def fill_other(self, node, binder):
+        # Scopes of the declarations
+        if binder.is_tu or binder.is_namespace:
+            return
+        node.spelling = binder.spelling
+        node.qualified_name = binder.qualified_name
+        node.python_name = binder.python_name
+        node.is_class_template = binder.is_class_template
+        node.type = self.type_node(binder.type)
+
+    def fill_enum(self, node, binder):
+        self.fill_declaration(node, binder)
+        node.qualified_spelling = binder.qualified_spelling
+        node.python_name = binder.python_name
+        node.docs = binder.docs
+        node.type = self.type_node(binder.type)
+        node.enum_constants = [self.node(e) for e in binder.enum_constants]
+        node.grouped_binders = [self.node(b) for b in binder.grouped_binders]
+
+    def fill_enum_constant(self, node, binder):
+        node.spelling = binder.spelling
+        node.qualified_name = binder.qualified_name
+        node.type = self.type_node(binder.type)
+
+    def fill_function(self, node, binder):
+        self.fill_declaration(node, binder)
+        node.qualified_spelling = binder.qualified_spelling
+        node.python_name = binder.python_name
+        node.docs = binder.docs
+        node.rtype = self.type_node(binder.rtype, True)
+        node.parameters = [self.node(a) for a in binder.parameters]
+        node.grouped_binders = [self.node(b) for b in binder.grouped_binders]
+
+    def fill_parameter(self, node, binder):
+        node.spelling = binder.spelling
+        node.default_value = binder.default_value
+        node.type = self.type_node(binder.type, True)
+        node.is_immutable = binder.is_immutable
+
+    def fill_template_parameter(self, node, binder):
+        node.spelling = binder.spelling
+        node.display_name = binder.display_name
+        node.default_value = binder.default_value
+        node.is_template_type_param = binder.is_template_type_param
+        node.type = self.type_node(binder.type)
+
+    def fill_class(self, node, binder):
+        self.fill_declaration(node, binder)
+        node.qualified_spelling = binder.qualified_spelling
+        node.python_name = binder.python_name
+        node.module_name = binder.module_name
+        node.is_class = binder.is_class
+        node.is_class_template = binder.is_class_template
+        node.is_nested = binder.is_nested
+        node.parent = self.node(binder.parent)
+        node.type = self.type_node(binder.type)
+        node.includes = list(binder.includes)
+        if binder.alias is not None:
+            node.alias = self.node(binder.alias)
+        if node.is_class_template:
+            node.template_parameters = [
+                self.node(t) for t in binder.template_parameters]
+
+        # Classes bound by a macro have no members
+        node.macro = binder.macro
+        if node.macro is None:
+            self.fill_members(node, binder)
+
+    def fill_members(self, node, binder):
+        qname = node.qualified_name
+        node.docs = binder.docs
+        node.has_children = any(binder.get_children())
+        node.holder_type = binder.holder_type
+        node.nodelete = binder.needs_nodelete or qname in Generator.nodelete
+        node.bases = [self.base_node(b) for b in binder.bases]
+        node.is_abstract = binder.is_abstract
+        node.ctors = [self.node(item) for item in binder.ctors
+                      if item.is_public]
+        if not node.ctors and not node.is_abstract:
+            node.needs_default_ctor = binder.needs_default_ctor
+            if node.needs_default_ctor:
+                node.has_unimplemented_methods = \
+                    binder.has_unimplemented_methods
+        node.fields = [self.node(item) for item in binder.fields
+                       if item.is_public]
+        node.methods = [self.node(item) for item in binder.methods
+                        if item.is_public]
+        node.enums = [self.node(item) for item in binder.enums
+                      if item.is_public]
+        node.nested_classes = [
+            self.node(item) for item in binder.nested_classes
+            if item.qualified_name in Generator.nested_classes and
+            item.is_public]
+        node.is_maybe_iterable = binder.is_maybe_iterable
+
+    def base_node(self, binder):
+        """
+        Get the node of a base class with the holder type of its declaration.
+        :param binder.core.CursorBinder binder: The base class specifier.
+        :return: The node.
+        :rtype: pybinder.ir.Node
+        """
+        node = Node(binder.kind.name)
+        node.is_public = binder.is_public
+        node.type = self.type_node(binder.type)
+        if node.is_public:
+            # A total hack to try and figure out holder type. Might be a
+            # libclang issue. Seems like the same cursor comes back from both
+            # methods but only one returns an 'opencascade::handle' holder
+            # type. So, if either of them returns that just use it.
+            type_ = binder.type
+            holder1 = type_.get_declaration().holder_type
+            holder2 = type_.get_canonical().get_declaration().holder_type
+            if 'opencascade::handle' in [holder1, holder2]:
+                node.holder_type = 'opencascade::handle'
+        return node
+
+    def fill_ctor(self, node, binder):
+        self.fill_declaration(node, binder)
+        node.is_move_ctor = binder.is_move_ctor
+        node.parameters = [self.node(a) for a in binder.parameters]
+
+    def fill_field(self, node, binder):
+        self.fill_declaration(node, binder)
+        node.docs = binder.docs
+        node.is_bitfield = binder.is_bitfield
+        node.parent = self.node(binder.parent)
+        node.type = self.type_node(binder.type)
+
+    def fill_method(self, node, binder):
+        self.fill_declaration(node, binder)
+        node.docs = binder.docs
+        node.parent = self.node(binder.parent)
+        node.rtype = self.type_node(binder.rtype, True)
+        node.parameters = [self.node(a) for a in binder.parameters]
+        node.is_static_method = binder.is_static_method
+        node.is_const_method = binder.is_const_method
+        node.is_pure_virtual_method = binder.is_pure_virtual_method
+        node.is_operator = binder.is_operator
+        node.needs_inout_method = binder.needs_inout_method
+
+        # Policies
+        qname = node.qualified_name
+        if qname in Generator.return_policies:
+            node.return_policy = Generator.return_policies[qname]
+        elif binder.is_getter_method:
+            node.return_policy = 'reference_internal'
+        node.keep_alive = Generator.keep_alive.get(qname)
+        guards = list(Generator.call_guards.get(qname, ()))
+        mod = Generator.get_module(binder.parent.module_name)
+        if mod is not None:
+            for name in mod.method_guards.get(binder, ()):
+                if name not in guards:
+                    guards.append(name)
+        node.call_guards = guards or None
+
+    def fill_typedef(self, node, binder):
+        self.fill_declaration(node, binder)
+        node.qualified_spelling = binder.qualified_spelling
+        node.python_name = binder.python_name
+        node.module_name = binder.module_name
+        node.type = self.type_node(binder.type)
+        alias = binder.alias
+        if alias is not None:
+            node.alias = self.node(alias)
+            # Bound as an attribute of the alias
+            if binder.module_name == alias.module_name:
+                return
+
+        # The declaration of the canonical type. Only classes that can be
+        # bound as the typedef are converted in full.
+        type_ = binder.type.get_canonical()
+        canonical = node.type.canonical = self.type_node(type_)
+        decl = CursorBinder(type_.type.get_declaration())
+        template = decl.get_specialization()
+        node_ = canonical.declaration = Node(decl.kind.name)
+        node_.spelling = decl.spelling
+        node_.is_class = decl.is_class
+        node_.specialization = Node(template.kind.name)
+        node_.specialization.is_class_template = template.is_class_template
+        if type_.is_record and decl.is_class and not template.is_class_template:
+            self.fill_class(node_, decl)
+
+    FILL_FUNCTIONS = {
+        CursorKind.ENUM_DECL: fill_enum,
+        CursorKind.ENUM_CONSTANT_DECL: fill_enum_constant,
+        CursorKind.FUNCTION_DECL: fill_function,
+        CursorKind.PARM_DECL: fill_parameter,
+        CursorKind.TEMPLATE_TYPE_PARAMETER: fill_template_parameter,
+        CursorKind.TEMPLATE_NON_TYPE_PARAMETER: fill_template_parameter,
+        CursorKind.CLASS_DECL: fill_class,
+        CursorKind.STRUCT_DECL: fill_class,
+        CursorKind.CLASS_TEMPLATE: fill_class,
+        CursorKind.CONSTRUCTOR: fill_ctor,
+        CursorKind.FIELD_DECL: fill_field,
+        CursorKind.CXX_METHOD: fill_method,
+        CursorKind.TYPEDEF_DECL: fill_typedef,
+    }
 
 
 def bind_enum(binder):
     """
     Bind an enum.
-    :param binder.core.CursorBinder binder: The binder.
-    :return: None.
+    :param pybinder.ir.Node binder: The binder.
+    :return: The source, extra headers and opaque type definitions.
+    :rtype: tuple(list(str), list(str), list(str))
     """
     src = ['// ENUM: {}\n'.format(binder.python_name.upper())]
 
@@ -2493,15 +4783,15 @@ def bind_enum(binder):
         src.append('\n')
     src.append('\n')
 
-    binder.src = src
-    return []
+    return src, [], []
 
 
 def bind_function(binder):
     """
     Bind a function.
-    :param binder.core.CursorBinder binder: The binder.
-    :return: None.
+    :param pybinder.ir.Node binder: The binder.
+    :return: The source, extra headers and opaque type definitions.
+    :rtype: tuple(list(str), list(str), list(str))
     """
     src = ['// FUNCTION: {}\n'.format(binder.python_name.upper())]
 
@@ -2512,35 +4802,34 @@ def bind_function(binder):
     for binder_ in binders:
         src += generate_function(binder_)
 
-    binder.src = src
-    return []
+    return src, [], []
 
 
 def bind_class(binder):
     """
     Bind a class.
-    :param binder.core.CursorBinder binder: The binder.
-    :return: None.
+    :param pybinder.ir.Node binder: The binder.
+    :return: The source, extra headers and opaque type definitions.
+    :rtype: tuple(list(str), list(str), list(str))
     """
     src = ['// CLASS: {}\n'.format(binder.python_name.upper())]
 
     # Generate source
-    src += generate_class(binder)
+    src += generate_class(binder, alias=binder.alias)
     src.append('\n')
 
-    binder.src = src
-
     # Add extra header for special macro case
     if binder.macro is None:
-        return []
-    return binder.macro.headers()
+        return src, [], []
+    return src, binder.macro.headers(), []
 
 
 def bind_typedef(binder):
     """
     Bind a typedef.
-    :param binder.core.CursorBinder binder: The binder.
-    :return: None.
+    :param pybinder.ir.Node binder: The binder.
+    :return: The source, extra headers and opaque type definitions.
+    :rtype: tuple(list(str), list(str), list(str))
     """
     src = ['// TYPEDEF: {}\n'.format(binder.python_name.upper())]
 
@@ -2579,23 +4868,18 @@ def bind_typedef(binder):
         if template in Generator.available_templates:
             extra_headers.append(template + '.hxx')
 
-    # Add opaque defs
-    for txt in extra:
-        binder.opaque.append(txt)
-
-    binder.src = src
-    return extra_headers
+    return src, extra_headers, extra
 
 
 def bind_class_template(binder, path):
     """
     Bind a class template.
-    :param binder.core.CursorBinder binder: The binder.
+    :param pybinder.ir.Node binder: The binder.
     :param str path: The path to write the source file.
     :return: None.
     """
     # Bind function name
-    bind_name = f"bind_{binder.python_name}"
+    bind_name = template_bind_name(binder)
 
     # Include guard
     src = ['#pragma once\n']
@@ -2608,10 +4892,6 @@ def bind_class_template(binder, path):
         src.append(f'#include <{inc}>\n')
     src.append('\n')
 
-    # Bind function name
-    binder.bind_name = bind_name
-    Generator.available_templates.add(binder.bind_name)
-
     # Function template
     template_params = []
     for t in binder.template_parameters:
@@ -2648,10 +4928,11 @@ def bind_class_template(binder, path):
     overwrite_if_changed(fname, fout)
 
 
-def generate_enum(binder):
+def generate_enum(binder, parent_name='mod'):
     """
     Generate source for enumeration.
-    :param binder.core.CursorBinder binder: The binder.
+    :param pybinder.ir.Node binder: The binder.
+    :param str parent_name: The name of the binding parent.
     :return: List of binder source lines.
     :rtype: list(str)
     """
@@ -2659,7 +4940,7 @@ def generate_enum(binder):
 
     # Names
     qname = binder.qualified_name
-    parent = binder.parent_name
+    parent = parent_name
     docs = binder.docs
 
     name = binder.python_name
@@ -2718,7 +4999,7 @@ def generate_enum(binder):
 def generate_function(binder):
     """
     Generate source for function.
-    :param binder.core.CursorBinder binder: The binder.
+    :param pybinder.ir.Node binder: The binder.
     :return: Binder source as a list of lines.
     :rtype: list(str)
     """
@@ -2767,13 +5048,18 @@ def generate_function(binder):
     return src
 
 
-def generate_class(binder):
+def generate_class(binder, python_name=None, alias=None):
     """
     Generate source for class.
-    :param binder.core.CursorBinder binder: The binder.
+    :param pybinder.ir.Node binder: The binder.
+    :param str python_name: The Python name if not the one of the binder.
+    :param pybinder.ir.Node alias: The class it is an alias of if any.
     :return: Binder source as a list of lines.
     :rtype: list(str)
     """
+    if python_name is None:
+        python_name = binder.python_name
+
     # Special handling of certain macro types
     macro = binder.macro
     if macro is not None:
@@ -2781,13 +5067,13 @@ def generate_class(binder):
         return src
 
     # Don't bind if it doesn't have any children.
-    if not any(binder.get_children()):
+    if not binder.has_children:
         logger.write(
-            '\tNot binding class: {}\n'.format(binder.python_name))
+            '\tNot binding class: {}\n'.format(python_name))
         return []
 
     # Names
-    name = binder.python_name
+    name = python_name
     qname = binder.qualified_name
     docs = binder.docs
 
@@ -2809,16 +5095,14 @@ def generate_class(binder):
         cls = '_'.join(['cls', source_name])
 
     # Holder
-    if binder.is_transient:
+    holder_type = binder.holder_type
+    if holder_type == 'opencascade::handle':
         holder = ', opencascade::handle<{}>'.format(qname)
-        holder_type = 'opencascade::handle'
-    elif binder.needs_nodelete or qname in Generator.nodelete:
+    elif binder.nodelete:
         holder = ', std::unique_ptr<{}, py::nodelete>'.format(qname)
-        holder_type = 'std::unique_ptr'
     else:
         # Use default std::unique_ptr
         holder = ''
-        holder_type = 'std::unique_ptr'
 
     # Excluded base classes
     base_names = []
@@ -2837,17 +5121,8 @@ def generate_class(binder):
         name = base.type.spelling
         if name in excluded_bases or name in Generator.excluded_classes:
             continue
-        # A total hack to try and figure out holder type. Might be a libclang
-        # issue. Seems like the same cursor comes back from both methods but
-        # only one returns an 'opencascade::handle' holder type. So, if either
-        # of them returns that just use it.
-        holder1 = base.type.get_declaration().holder_type
-        holder2 = base.type.get_canonical().get_declaration().holder_type
-        base_holder_type = 'std::unique_ptr'
-        if 'opencascade::handle' in [holder1, holder2]:
-            base_holder_type = 'opencascade::handle'
         # Check to see if type uses same holder type
-        if holder_type != base_holder_type:
+        if holder_type != base.holder_type:
             msg = '\tMismatched holder types: {} --> {}\n'.format(
                 binder.spelling, name
             )
@@ -2869,7 +5144,7 @@ def generate_class(binder):
     if binder.is_class_template:
         name_ = 'name.c_str()'
     else:
-        name_ = '\"{}\"'.format(binder.python_name)
+        name_ = '\"{}\"'.format(python_name)
     if qname in Generator.python_names:
         name_ = '\"{}\"'.format(Generator.python_names[qname])
 
@@ -2882,7 +5157,7 @@ def generate_class(binder):
     local = ''
     if binder.is_class_template or binder.parent.is_class_template:
         local = ', local'
-    elif binder.alias is not None:
+    elif alias is not None:
         local = ', py::module_local()'
 
     # Source
@@ -2896,8 +5171,7 @@ def generate_class(binder):
     if not binder.is_abstract:
         for item in binder.ctors:
             if item.is_public:
-                item.parent_name = cls
-                src_ctor += generate_ctor(item)
+                src_ctor += generate_ctor(item, cls)
 
         # Check for default constructor
         if not src_ctor and binder.needs_default_ctor \
@@ -2916,8 +5190,7 @@ def generate_class(binder):
     src_fields = []
     for item in binder.fields:
         if item.is_public:
-            item.parent_name = cls
-            src_fields += generate_field(item)
+            src_fields += generate_field(item, cls)
     if src_fields:
         src_fields.insert(0, '\n// Fields\n')
         src += src_fields
@@ -2926,9 +5199,8 @@ def generate_class(binder):
     src_methods = []
     for item in binder.methods:
         if item.is_public:
-            item.parent_name = cls
             # TODO: Determine macro fn's eg  'vtkTypeMacro'
-            src_methods += generate_method(item)
+            src_methods += generate_method(item, cls)
     if src_methods:
         src_methods.insert(0, '\n// Methods\n')
         src += src_methods
@@ -2944,8 +5216,7 @@ def generate_class(binder):
     src_enums = []
     for item in binder.enums:
         if item.is_public:
-            item.parent_name = cls
-            src_enums += generate_enum(item)
+            src_enums += generate_enum(item, cls)
     if src_enums:
         src_enums.insert(0, '\n// Enums\n')
         src += src_enums
@@ -2961,7 +5232,7 @@ def generate_class(binder):
         if not has_nested:
             src.append('\n// Nested classes\n')
             has_nested = True
-        src += generate_class(nested)
+        src += generate_class(nested, alias=nested.alias)
 
     # Extra text for the class
     if qname in Generator.after_type:
@@ -2978,10 +5249,11 @@ def generate_class(binder):
     return src
 
 
-def generate_ctor(binder):
+def generate_ctor(binder, parent_name):
     """
     Generate source for class constructor.
-    :param binder.core.CursorBinder binder: The binder.
+    :param pybinder.ir.Node binder: The binder.
+    :param str parent_name: The name of the binding parent.
     :return: Binder source as a list of lines.
     :rtype: list(str)
     """
@@ -3001,7 +5273,7 @@ def generate_ctor(binder):
             py_args.append(', py::arg(\"{}\")'.format(name))
         py_args = ''.join(py_args)
 
-        src = '{}.def(py::init<{}>(){});\n'.format(binder.parent_name,
+        src = '{}.def(py::init<{}>(){});\n'.format(parent_name,
                                                    signature, py_args)
         # Comment if excluded
         if binder.is_excluded or binder.is_move_ctor or "&&" in signature:
@@ -3011,14 +5283,15 @@ def generate_ctor(binder):
     return ctors
 
 
-def generate_field(binder):
+def generate_field(binder, parent_name):
     """
     Generate source for class member fields.
-    :param binder.core.CursorBinder binder: The binder.
+    :param pybinder.ir.Node binder: The binder.
+    :param str parent_name: The name of the binding parent.
     :return: Binder source as a list of lines.
     :rtype: list(str)
     """
-    prefix = binder.parent_name
+    prefix = parent_name
     name = binder.spelling
     qname = binder.qualified_name
     docs = binder.docs
@@ -3058,16 +5331,17 @@ def generate_field(binder):
     return src
 
 
-def generate_method(binder):
+def generate_method(binder, parent_name):
     """
     Generate source for class member function.
-    :param binder.core.CursorBinder binder: The binder.
+    :param pybinder.ir.Node binder: The binder.
+    :param str parent_name: The name of the binding parent.
     :return: Binder source as a list of lines.
     :rtype: list(str)
     """
     methods = []
 
-    prefix = '{}'.format(binder.parent_name)
+    prefix = '{}'.format(parent_name)
 
     if binder.is_static_method:
         is_static = '_static'
@@ -3084,12 +5358,7 @@ def generate_method(binder):
     elif binder.is_pure_virtual_method:
         prefix = '// virtual // {}'.format(prefix)
 
-    if binder.rtype.is_opaque:
-        rtype = f"void* /* {binder.rtype.spelling} */"
-    elif binder.rtype.is_alias:
-        rtype = binder.rtype.alias_spelling
-    else:
-        rtype = binder.rtype.spelling
+    rtype = binder.rtype.resolution[0]
 
 
     qname = binder.qualified_name
@@ -3116,19 +5385,19 @@ def generate_method(binder):
 
     # Return policy
     return_policy = ''
-    if qname in Generator.return_policies:
-        return_policy = ', py::return_value_policy::{}'.format(Generator.return_policies[qname])
-    elif binder.is_getter_method:
-        return_policy = ', py::return_value_policy::reference_internal'
+    if binder.return_policy is not None:
+        return_policy = ', py::return_value_policy::{}'.format(
+            binder.return_policy)
 
     keep_alive = ''
-    if qname in Generator.keep_alive:
-        keep_alive = ', py::keep_alive<{}>()'.format(Generator.keep_alive[qname])
+    if binder.keep_alive is not None:
+        keep_alive = ', py::keep_alive<{}>()'.format(binder.keep_alive)
 
     # Call guards
     cguards = ''
-    if qname in Generator.call_guards:
-        cguards = ', ' + ', '.join(Generator.call_guards[qname])
+    if binder.call_guards is not None:
+        cguards = ', py::call_guard<{}>()'.format(
+            ', '.join('Import' + name for name in binder.call_guards))
 
     needs_inout = binder.needs_inout_method
 
@@ -3139,9 +5408,8 @@ def generate_method(binder):
             for name in args_name:
                 py_args.append(', py::arg(\"{}\")'.format(name))
             py_args = ''.join(py_args)
-            src = '{}.def{}(\"{}\", {}, \"{}\"{});\n'.format(prefix, is_static,
-                                                             fname, txt,
-                                                             docs, py_args)
+            src = '{}.def{}(\"{}\", {}, \"{}\"{}{});\n'.format(
+                prefix, is_static, fname, txt, docs, py_args, cguards)
             if True in is_array_like:
                 src = ' '.join(['//', src])
             return [src]
@@ -3214,7 +5482,7 @@ def generate_method(binder):
 def generate_typedef2(binder):
     """
     Generate source for a typedef.
-    :param binder.core.CursorBinder binder: The binder.
+    :param pybinder.ir.Node binder: The binder.
     :return: Binder source as a list of lines and extra headers if needed.
     :rtype: tuple(list(str), list(str))
     """
@@ -3229,30 +5497,27 @@ def generate_typedef2(binder):
         ]
         return src, None, []
 
-    # Bind class
-    type_ = binder.type.get_canonical()
-    decl = type_.get_declaration()
-    template = decl.get_specialization()
-    decl.alias = alias
+    # Bind class as the typedef
+    type_ = binder.type.canonical
+    decl = type_.declaration
+    template = decl.specialization
     local = ', py::module_local(false)'
     if alias is not None:
         local = ', py::module_local()'
     if type_.is_record and template.is_class_template:
         if type_.spelling.startswith('std::vector'):
-            txt = type_.spelling, binder.parent_name, binder.python_name
+            txt = type_.spelling, 'mod', binder.python_name
             src = ['py::bind_vector<{}>({}, \"{}\");\n'.format(*txt)]
             extra = ['PYBIND11_MAKE_OPAQUE({})\n'.format(txt[0])]
             return src, [], extra
         else:
-            src = ['bind_{}({}, \"{}\"{});\n'.format(type_.spelling,
-                                                     binder.parent_name,
+            src = ['bind_{}({}, \"{}\"{});\n'.format(type_.spelling, 'mod',
                                                      binder.python_name,
                                                      local)]
             return src, ['bind_{}'.format(decl.spelling)], []
 
     elif type_.is_record and decl.is_class:
-        decl.python_name = binder.spelling
-        src = generate_class(decl)
+        src = generate_class(decl, binder.spelling, alias)
         return src, [], []
 
     logger.write(
@@ -3265,7 +5530,7 @@ def patch_typenames(binder, src):
     Hack to correct spelling of some types that miss the template parameters
     and "typename" qualifier like "NCollection_List::iterator" should be
     "typename NCollection_List<TheItemType>::iterator".
-    :param binder.core.CursorBinder binder: The binder.
+    :param pybinder.ir.Node binder: The binder.
     :param str src: The class souce code
     :return: Binder source as a list of lines.
     :rtype: list(str)
@@ -3284,19 +5549,244 @@ def patch_typenames(binder, src):
 def generate_class_template(binder):
     """
     Generate source for a class template.
-    :param binder.core.CursorBinder binder: The binder.
+    :param pybinder.ir.Node binder: The binder.
     :return: Binder source as a list of lines.
     :rtype: list(str)
     """
-    src = generate_class(binder)
+    src = generate_class(binder, alias=binder.alias)
     src_out = patch_typenames(binder, src)
     return src_out
 
 
+# Bind function by cursor kind name. Class templates are bound separately since
+# they need the output path.
+BIND_FUNCTIONS = {
+    'ENUM_DECL': bind_enum,
+    'FUNCTION_DECL': bind_function,
+    'CLASS_DECL': bind_class,
+    'STRUCT_DECL': bind_class,
+    'TYPEDEF_DECL': bind_typedef,
+}
+
+
+def bind_node(binder, path):
+    """
+    Bind a declaration.
+    :param pybinder.ir.Node binder: The binder.
+    :param str path: The path to write the source file of a class template.
+    :return: The source, extra headers and opaque type definitions. Class
+        templates are written to their own file so they have none.
+    :rtype: tuple(list(str), list(str), list(str))
+    """
+    logger.write('\tBinding {}.\n'.format(binder.qualified_spelling))
+    if binder.is_class_template:
+        bind_class_template(binder, path)
+        return [], [], []
+    try:
+        bind_func = BIND_FUNCTIONS[binder.kind]
+    except KeyError:
+        logger.write('\tUnsupported {}.\n'.format(binder.qualified_spelling))
+        return [], [], []
+    return bind_func(binder)
+
+
+def template_bind_name(binder):
+    """
+    Get the name of the function binding a class template.
+    :param binder: The class template.
+    :type binder: pybinder.ir.Node or binder.core.CursorBinder
+    :return: The function name.
+    :rtype: str
+    """
+    return f"bind_{binder.python_name}"
+
+
+def bind_module_templates(module, path):
+    """
+    Bind the class templates of a module.
+    :param pybinder.ir.ModuleNode module: The module.
+    :param str path: Path to write templates.
+    :return: None.
+    """
+    # Create module folder
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+    for binder in module.templates:
+        bind_node(binder, path)
+
+
+def bind_module(module, path):
+    """
+    Bind a module.
+    :param pybinder.ir.ModuleNode module: The module.
+    :param str path: Path to write sub-directory.
+    :return: None.
+    """
+    # Create module folder and main source file
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    fname = '/'.join([path, module.name + '.cxx'])
+
+    # Check if module is split
+    is_split = module.name in Generator.split
+
+    fout = io.StringIO()
+
+    # File header
+    fout.write(SRC_PREFIX)
+
+    # Generate binding source and headers
+    sources = []
+    extra_headers = []
+    opaque_src = []
+    for binder in module.binders:
+        src, headers, opaque = bind_node(binder, path)
+        sources.append(src)
+        extra_headers += headers
+        opaque_src += opaque
+
+    # Write include files
+    used_includes = set()
+    inc_src = []
+    for inc in module.includes + extra_headers:
+        if inc in used_includes:
+            continue
+        used_includes.add(inc)
+        line = '#include <{}>\n'.format(inc)
+        fout.write(line)
+        inc_src.append(line)
+    fout.write('\n')
+
+    # Write opaque types
+    if opaque_src:
+        fout.writelines(opaque_src)
+        fout.write('\n')
+
+    # Write manual text before module
+    before_mod_src = []
+    if module.name in Generator.before_module:
+        for txt in Generator.before_module[module.name]:
+            fout.write('{}\n'.format(txt))
+            before_mod_src.append(txt)
+        fout.write('\n')
+
+    # Import guards
+    guard_src = []
+    guarded = module.import_guards
+    for mod_name in guarded:
+        package_name = Generator.get_namespace(mod_name)
+        guard_src.append('struct Import{}{{\n'.format(mod_name))
+        guard_src.append(
+            '\tImport{}() {{ py::module::import(\"{}.{}\"); }}\n'.format(
+                mod_name, package_name, mod_name))
+        guard_src.append('};\n\n')
+
+    # Methods in the split file may use the automatic guards so write them at
+    # file scope
+    global_guards = bool(module.lazy_imports)
+    if global_guards:
+        fout.writelines(guard_src)
+
+    # Write split function signature
+    if is_split:
+        fout.write('// Functions for split modules\n')
+        fout.write('void bind_{}_2(py::module&);\n\n'.format(module.name))
+
+    # Initialize
+    fout.write('PYBIND11_MODULE({}, mod) {{\n\n'.format(module.name))
+
+    # Import other modules
+    for mod_name in module.reduced_imports:
+        if mod_name in guarded:
+            continue
+        if mod_name != module.name:
+            package_name = Generator.get_namespace(mod_name)
+            fout.write('py::module::import(\"{}.{}\");\n'.format(
+                package_name, mod_name))
+    fout.write('\n')
+
+    if not global_guards:
+        fout.writelines(guard_src)
+
+    # If the module is split in two, only bind half and save the rest for another file
+    split_sources = []
+    if is_split:
+        indx = len(sources) // 2
+        sources, split_sources = sources[:indx], sources[indx:]
+
+    # Main bind loop
+    src = []
+    for binder_src in sources:
+        src.extend(binder_src)
+
+    # Patch the file
+    # TODO: Line Number is off
+    patch_src(module.name, src)
+
+    # Write it out
+    for line in src:
+        fout.write(line)
+    fout.write('\n')
+
+    # Call the split function
+    if is_split:
+        line = 'bind_{}_2(mod);\n\n'.format(module.name)
+        fout.write(line)
+
+    # End module
+    fout.write('}\n')
+    overwrite_if_changed(fname, fout)
+
+    # Create the split file
+    if is_split:
+        fname = '/'.join([path, module.name + '_2.cxx'])
+        fout = io.StringIO()
+
+        # File header
+        fout.write(SRC_PREFIX)
+
+        # Duplicate all the include files for now
+        fout.writelines(inc_src)
+        fout.write('\n')
+
+        # Duplicate text before module
+        if before_mod_src:
+            fout.writelines(before_mod_src)
+            fout.write('\n\n')
+
+        # Duplicate import guards
+        if global_guards:
+            fout.writelines(guard_src)
+
+        # Function signature
+        line = 'void bind_{}_2(py::module &mod)\n'.format(module.name)
+        fout.write(line)
+        fout.write('{\n\n')
+
+        # Main bind loop
+        src = []
+        for binder_src in split_sources:
+            src.extend(binder_src)
+
+        # Patch the split file
+        # TODO: Line Number is off
+        patch_src(module.name, src)
+
+        # Write it out
+        for line in src:
+            fout.write(line)
+        fout.write('\n')
+
+        # End module
+        fout.write('}\n')
+        overwrite_if_changed(fname, fout)
+
+
 def function_signature(binder):
     """
     Generate data for the function signature.
-    :param binder.core.CursorBinder binder: The binder.
+    :param pybinder.ir.Node binder: The binder.
     :return: Number of arguments, number of default values, list of names,
         list of types, their default values, and if their type is array-like.
     :rtype: tuple(int, int, list(str), list(str), list(str), list(bool))
@@ -3307,20 +5797,13 @@ def function_signature(binder):
     for arg in binder.parameters:
         nargs += 1
         args_name.append(arg.spelling)
-        if arg.type.is_opaque:
-            args_type.append(f"void* /* {arg.type.spelling} */")
-        elif arg.type.is_alias:
-            args_type.append(arg.type.alias_spelling)
-        else:
-            args_type.append(arg.type.spelling)
+        spelling, _, _, is_array_like, _ = arg.type.resolution
+        args_type.append(spelling)
         default = arg.default_value
         defaults.append(default)
         if default:
             ndefaults += 1
-        if arg.type.is_array_like:
-            is_array.append(True)
-        else:
-            is_array.append(False)
+        is_array.append(is_array_like)
 
     return nargs, ndefaults, args_name, args_type, defaults, is_array
 
@@ -3328,7 +5811,7 @@ def function_signature(binder):
 def generate_immutable_inout_method(binder, qname):
     """
     Generate binding for a function that modifies immutable types in place.
-    :param binder.core.CursorBinder binder: The binder.
+    :param pybinder.ir.Node binder: The binder.
     :param str qname: The function fully qualified name.
     :return: The binding text.
     :rtype: str
@@ -0,0 +1,232 @@
+# This file is part of pyOCCT_binder which automatically generates Python
+# bindings to the OpenCASCADE geometry kernel using pybind11.
+#
+# Copyright (C) 2016-2018  Laughlin Research, LLC
+# Copyright (C) 2019 Trevor Laughlin
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+"""
+Intermediate representation of the bindings. It is built from the binders by
+*Generator.build_ir* once the modules are sorted and their includes and
+imports are known. The binding functions only use this representation to
+generate the source and never change it, so the source does not depend on
+the order the declarations are bound in.
+
+The nodes are plain data without any reference to libclang so the
+representation can be saved to disk and loaded again to generate the source
+without parsing the headers. The configuration the binding functions use is
+saved with it.
+"""
+import pickle
+
+VERSION = 6
+
+
+class TypeNode(object):
+    """
+    A type as used by the binding functions.
+    :ivar str spelling: The type spelling.
+    :ivar bool is_const_qualified: If the type is const qualified.
+    :ivar bool is_pointer_like: If the type is a pointer or reference.
+    :ivar bool is_array_like: If the type is an array.
+    :ivar bool is_record: If the type is a class or struct.
+    :ivar bool is_alias: If the type is an alias (only set for parameter and
+        return types).
+    :ivar str alias_spelling: The qualified spelling of an alias.
+    :ivar bool is_opaque: If the type is bound as *void**.
+    :ivar tuple resolution: The binding spelling, alias flag, opaque flag,
+        array flag and pointer flag.
+    :ivar pybinder.ir.TypeNode canonical: The canonical type (only set for
+        typedefs).
+    :ivar pybinder.ir.Node declaration: The declaration of the canonical type
+        (only set for the canonical type of typedefs).
+    """
+
+    spelling = ''
+    is_const_qualified = False
+    is_pointer_like = False
+    is_array_like = False
+    is_record = False
+    is_alias = False
+    alias_spelling = ''
+    is_opaque = False
+    resolution = None
+    canonical = None
+    declaration = None
+
+    def __repr__(self):
+        return 'Type: {}'.format(self.spelling)
+
+
+class Node(object):
+    """
+    A declaration to bind or a parameter, base class, enum constant, template
+    parameter or scope referenced by one. Only the attributes relevant to the
+    kind are set, the others keep their defaults.
+    :param str kind: Name of the cursor kind (e.g., "CLASS_DECL").
+    :ivar str kind: Name of the cursor kind.
+    :ivar str usr: The USR of a declaration. Identifies the declaration
+        across translation units and runs.
+    :ivar pybinder.ir.Node parent: The semantic parent.
+    :ivar pybinder.ir.Node alias: The alias of a typedef or class.
+    :ivar pybinder.ir.TypeNode type: The type.
+    :ivar pybinder.ir.TypeNode rtype: The return type of a function.
+    :ivar str holder_type: The holder type of a class or base class.
+    :ivar bool nodelete: If a class is held with *py::nodelete*.
+    :ivar str return_policy: The return value policy of a method if any.
+    :ivar str keep_alive: The keep alive indices of a method if any.
+    :ivar list(str) call_guards: Names of the modules the call guard of a
+        method imports if any.
+    """
+
+    usr = ''
+    spelling = ''
+    display_name = ''
+    qualified_name = ''
+    qualified_spelling = ''
+    python_name = ''
+    docs = ''
+    module_name = None
+    default_value = ''
+
+    is_public = True
+    is_excluded = False
+    is_nested = False
+    is_class = False
+    is_class_template = False
+    is_template_type_param = False
+    is_static_method = False
+    is_const_method = False
+    is_pure_virtual_method = False
+    is_operator = False
+    is_move_ctor = False
+    is_bitfield = False
+    is_immutable = False
+    is_abstract = False
+    is_maybe_iterable = False
+    needs_inout_method = False
+    needs_default_ctor = False
+    has_unimplemented_methods = False
+    has_children = False
+
+    parent = None
+    alias = None
+    macro = None
+    type = None
+    rtype = None
+    specialization = None
+
+    holder_type = 'std::unique_ptr'
+    nodelete = False
+    return_policy = None
+    keep_alive = None
+    call_guards = None
+
+    includes = ()
+    grouped_binders = ()
+    parameters = ()
+    enum_constants = ()
+    template_parameters = ()
+    bases = ()
+    ctors = ()
+    fields = ()
+    methods = ()
+    enums = ()
+    nested_classes = ()
+
+    def __init__(self, kind):
+        self.kind = kind
+
+    def __repr__(self):
+        return 'Node: {}'.format(self.qualified_name or self.spelling)
+
+
+class ModuleNode(object):
+    """
+    A module to bind.
+    :param str name: Module name.
+    :ivar str name: Module name.
+    :ivar bool is_excluded: If the module is excluded.
+    :ivar list(str) includes: The include files.
+    :ivar list(str) imports: Names of the modules to import.
+    :ivar list(str) reduced_imports: Names of the modules to import when
+        initialized.
+    :ivar list(str) import_guards: Names of the modules imported by call
+        guards.
+    :ivar list(str) lazy_imports: Names of the modules imported by call
+        guards found automatically.
+    :ivar list(pybinder.ir.Node) binders: The sorted declarations.
+    :ivar list(pybinder.ir.Node) templates: The class templates.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.is_excluded = False
+        self.includes = []
+        self.imports = []
+        self.reduced_imports = []
+        self.import_guards = []
+        self.lazy_imports = []
+        self.binders = []
+        self.templates = []
+
+    def __repr__(self):
+        return 'Module: {}'.format(self.name)
+
+
+class BindingIR(object):
+    """
+    The modules to bind.
+    :param str package_name: Name of the main package.
+    :param dict settings: The configuration the binding functions use.
+    :ivar str package_name: Name of the main package.
+    :ivar dict settings: The configuration the binding functions use by
+        name, see *pybinder.core.Generator.get_bind_settings*. Applied when
+        loaded so the representation does not depend on the configuration
+        files.
+    :ivar list(pybinder.ir.ModuleNode) modules: The modules in order.
+    :ivar list(str) templates: Names of the functions binding the class
+        templates of all the traversed modules, including those not in
+        *modules*.
+    """
+
+    def __init__(self, package_name, settings=None):
+        self.package_name = package_name
+        self.settings = settings or {}
+        self.modules = []
+        self.templates = []
+
+    def save(self, fname):
+        """
+        Save the representation to a file.
+        :param str fname: The filename.
+        :return: None.
+        """
+        with open(fname, 'wb') as f:
+            pickle.dump((VERSION, self), f, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(fname):
+        """
+        Load a representation saved with *save*.
+        :param str fname: The filename.
+        :return: The representation.
+        :rtype: pybinder.ir.BindingIR
+        """
+        with open(fname, 'rb') as f:
+            version, ir = pickle.load(f)
+        if version != VERSION:
+            raise ValueError('Unsupported IR version: {}'.format(version))
+        return ir
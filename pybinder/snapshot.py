@@ -0,0 +1,326 @@
+# This file is part of pyOCCT_binder which automatically generates Python
+# bindings to the OpenCASCADE geometry kernel using pybind11.
+#
+# Copyright (C) 2016-2018  Laughlin Research, LLC
+# Copyright (C) 2019 Trevor Laughlin
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+"""
+Columnar snapshot of the traversed declarations. A snapshot is written by
+*Generator.export_snapshot* and can be memory-mapped and queried without
+libclang.
+
+The file starts with a magic string, the size of a JSON header and the header
+itself. It is followed by one block of 32-bit integers per column and the
+strings as UTF-8 with their offsets. All blocks are aligned to 8 bytes.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b'PYBSNAP1'
+
+VERSION = 1
+
+COLUMNS = ('kind', 'parent', 'end', 'file', 'line', 'access', 'spelling',
+           'usr', 'referenced', 'referenced_file', 'qualified_name')
+
+# Values of CX_CXXAccessSpecifier
+PROTECTED = 2
+PRIVATE = 3
+
+
+def _padding(size):
+    return b'\0' * (-size % 8)
+
+
+def write_snapshot(path, columns, qualified_names, kinds):
+    """
+    Write a snapshot.
+    :param str path: The output file.
+    :param pybinder.clangext.CursorColumns columns: The cursor columns.
+    :param dict(int, str) qualified_names: Qualified name of the root rows.
+    :param dict(int, str) kinds: Names of the cursor kinds by id.
+    :return: None.
+    """
+    n = len(columns)
+    qualified = array('i', [-1]) * n
+    for row, qname in qualified_names.items():
+        qualified[row] = columns.string_id(qname)
+
+    data = [getattr(columns, name) for name in COLUMNS[:-1]] + [qualified]
+    strings = [s.encode('utf-8') for s in columns.strings]
+    offsets = array('q', [0])
+    for s in strings:
+        offsets.append(offsets[-1] + len(s))
+
+    # Offsets of the blocks relative to the end of the header
+    blocks = {}
+    position = 0
+    for name, values in zip(COLUMNS, data):
+        blocks[name] = position
+        position += len(values) * values.itemsize
+        position += len(_padding(position))
+    blocks['string_offsets'] = position
+    position += len(offsets) * offsets.itemsize
+    blocks['string_data'] = position
+
+    header = json.dumps({
+        'version': VERSION,
+        'byteorder': sys.byteorder,
+        'rows': n,
+        'strings': len(strings),
+        'blocks': blocks,
+        'files': columns.files,
+        'kinds': kinds,
+    }).encode('utf-8')
+    # Pad with whitespace to keep the header valid JSON
+    header += b' ' * (-(len(MAGIC) + 8 + len(header)) % 8)
+
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for values in data:
+            values.tofile(f)
+            f.write(_padding(len(values) * values.itemsize))
+        offsets.tofile(f)
+        for s in strings:
+            f.write(s)
+    os.replace(tmp, path)
+
+
+class Snapshot(object):
+    """
+    Memory-mapped snapshot of the traversed declarations. Rows are cursors in
+    depth-first preorder of each exported declaration.
+    :param str path: The snapshot file.
+    :ivar int rows: Number of rows.
+    :ivar list(str) files: The file names.
+    :ivar memoryview kind: Cursor kind id per row. The other columns are
+        *parent*, *end*, *file*, *line*, *access*, *spelling*, *usr*,
+        *referenced*, *referenced_file* and *qualified_name*.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        try:
+            header, start = self._read_header(view, path)
+        except ValueError:
+            view.release()
+            self._mmap.close()
+            raise
+
+        self.rows = n = header['rows']
+        self.files = header['files']
+        self._kind_names = {int(k): v for k, v in header['kinds'].items()}
+        self._kind_ids = {v: k for k, v in self._kind_names.items()}
+        blocks = header['blocks']
+        for name in COLUMNS:
+            offset = start + blocks[name]
+            setattr(self, name, view[offset:offset + 4 * n].cast('i'))
+        offset = start + blocks['string_offsets']
+        count = header['strings'] + 1
+        self._offsets = view[offset:offset + 8 * count].cast('q')
+        self._data = start + blocks['string_data']
+        self._view = view
+        self._strings = {}
+        self._qualified_rows = None
+
+    @staticmethod
+    def _read_header(view, path):
+        """
+        Read and check the header.
+        :param memoryview view: The file contents.
+        :param str path: The snapshot file.
+        :return: The header and the position following it.
+        :rtype: tuple(dict, int)
+        """
+        if view[:len(MAGIC)] != MAGIC:
+            raise ValueError('Not a snapshot: {}'.format(path))
+        size, = struct.unpack('<Q', view[len(MAGIC):len(MAGIC) + 8])
+        start = len(MAGIC) + 8
+        header = json.loads(bytes(view[start:start + size]).decode('utf-8'))
+        if header['version'] != VERSION:
+            raise ValueError('Unsupported snapshot version: {}'.format(
+                header['version']))
+        if header['byteorder'] != sys.byteorder:
+            raise ValueError('Snapshot was written with a different byte '
+                             'order: {}'.format(path))
+        return header, start + size
+
+    def close(self):
+        """
+        Release the memory map.
+        :return: None.
+        """
+        for name in COLUMNS:
+            getattr(self, name).release()
+        self._offsets.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.rows
+
+    def string(self, i):
+        """
+        Get a string of the string table.
+        :param int i: The string index.
+        :return: The string or *None* if the index is -1.
+        :rtype: str
+        """
+        if i < 0:
+            return None
+        try:
+            return self._strings[i]
+        except KeyError:
+            start = self._data + self._offsets[i]
+            end = self._data + self._offsets[i + 1]
+            s = self._strings[i] = bytes(self._view[start:end]).decode('utf-8')
+            return s
+
+    def kind_name(self, row):
+        """
+        :param int row: The row.
+        :return: The name of the cursor kind.
+        :rtype: str
+        """
+        return self._kind_names[self.kind[row]]
+
+    def spelling_of(self, row):
+        """
+        :param int row: The row.
+        :return: The spelling.
+        :rtype: str
+        """
+        return self.string(self.spelling[row])
+
+    def filename(self, row):
+        """
+        :param int row: The row.
+        :return: The file name of the cursor location or *None*.
+        :rtype: str
+        """
+        i = self.file[row]
+        return self.files[i] if i >= 0 else None
+
+    def is_public(self, row):
+        """
+        :param int row: The row.
+        :return: *True* unless the cursor is private or protected.
+        :rtype: bool
+        """
+        return self.access[row] not in (PROTECTED, PRIVATE)
+
+    def rows_of_kind(self, *names):
+        """
+        Get the rows of the given cursor kinds.
+        :param str names: The cursor kind names (e.g., "CLASS_DECL").
+        :return: The rows.
+        :rtype: list(int)
+        """
+        ids = {self._kind_ids[name] for name in names if name in self._kind_ids}
+        return [row for row, kind in enumerate(self.kind) if kind in ids]
+
+    def children(self, row, *names):
+        """
+        Get the child rows of a row.
+        :param int row: The row.
+        :param str names: Only return children of these cursor kinds if any.
+        :return: The rows.
+        :rtype: list(int)
+        """
+        ids = {self._kind_ids[name] for name in names if name in self._kind_ids}
+        children = []
+        end = self.end[row]
+        child = row + 1
+        while child < end:
+            if not names or self.kind[child] in ids:
+                children.append(child)
+            child = self.end[child]
+        return children
+
+    @property
+    def declarations(self):
+        """
+        :return: Rows of the exported declarations by qualified name.
+        :rtype: dict(str, list(int))
+        """
+        if self._qualified_rows is None:
+            self._qualified_rows = {}
+            for row, i in enumerate(self.qualified_name):
+                if i >= 0:
+                    self._qualified_rows.setdefault(
+                        self.string(i), []).append(row)
+        return self._qualified_rows
+
+    def find(self, qname):
+        """
+        Find an exported declaration.
+        :param str qname: The qualified name.
+        :return: The first row or *None* if not found.
+        :rtype: int
+        """
+        rows = self.declarations.get(qname)
+        return rows[0] if rows else None
+
+    def classes(self):
+        """
+        :return: Rows of the exported classes, structs and class templates.
+        :rtype: list(int)
+        """
+        ids = {self._kind_ids.get(name) for name in
+               ('CLASS_DECL', 'STRUCT_DECL', 'CLASS_TEMPLATE')}
+        return [row for rows in self.declarations.values() for row in rows
+                if self.kind[row] in ids]
+
+    def methods(self, row):
+        """
+        :param int row: The row of a class.
+        :return: Rows of its methods.
+        :rtype: list(int)
+        """
+        return self.children(row, 'CXX_METHOD')
+
+    def includes(self, row):
+        """
+        Get the files declaring the types and templates referenced by a
+        declaration and its descendants.
+        :param int row: The row.
+        :return: The file names.
+        :rtype: list(str)
+        """
+        ids = {self._kind_ids.get(name) for name in ('TYPE_REF', 'TEMPLATE_REF')}
+        files = []
+        for i in range(row, self.end[row]):
+            if self.kind[i] not in ids:
+                continue
+            f = self.referenced_file[i]
+            if f >= 0 and self.files[f] not in files:
+                files.append(self.files[f])
+        return files
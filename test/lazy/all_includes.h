@@ -0,0 +1,4 @@
+#include <G_Pnt.hxx>
+#include <G_Vec.hxx>
+#include <U_Base.hxx>
+#include <U_Obj.hxx>
@@ -0,0 +1,6 @@
+#pragma once
+
+class G_Pnt {
+public:
+  double X() const;
+};
@@ -0,0 +1,6 @@
+#pragma once
+
+class G_Vec {
+public:
+  double Y() const;
+};
@@ -0,0 +1,9 @@
+#pragma once
+
+#include <G_Vec.hxx>
+
+class U_Base {
+public:
+  double Length(const G_Vec& v) const;
+  int Plain() const;
+};
@@ -0,0 +1,10 @@
+#pragma once
+
+#include <G_Pnt.hxx>
+#include <U_Base.hxx>
+
+class U_Obj : public U_Base {
+public:
+  G_Pnt Get() const;
+  double Body() const { G_Pnt p; return p.X(); }
+};
@@ -0,0 +1,9 @@
+#pragma once
+
+#include <G_Vec.hxx>
+
+template <typename T>
+class U_Tmpl {
+public:
+  G_Vec Get() const;
+};
@@ -0,0 +1,5 @@
+#include <G_Pnt.hxx>
+#include <G_Vec.hxx>
+#include <U_Base.hxx>
+#include <U_Obj.hxx>
+#include <U_Tmpl.hxx>
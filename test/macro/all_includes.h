@@ -0,0 +1,3 @@
+#include <M_Array.hxx>
+#include <M_Excluded.hxx>
+#include <N_Array.hxx>
@@ -0,0 +1,9 @@
+#pragma once
+#include <M_Define.hxx>
+
+class M_Array {
+public:
+  int Length() const;
+};
+
+DEFINE_HARRAY1(M_HArray, M_Array)
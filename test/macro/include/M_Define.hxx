@@ -0,0 +1,7 @@
+#pragma once
+
+#define DEFINE_HARRAY1(HClassName, _Array1Type_) \
+class HClassName : public _Array1Type_ { \
+public: \
+  HClassName(); \
+};
@@ -0,0 +1,4 @@
+#pragma once
+#include <M_Array.hxx>
+
+DEFINE_HARRAY1(M_HExcluded, M_Array)
@@ -0,0 +1,4 @@
+#pragma once
+#include <M_Array.hxx>
+
+DEFINE_HARRAY1(N_HArray, M_Array)
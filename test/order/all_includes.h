@@ -0,0 +1,6 @@
+#include <A_X.hxx>
+#include <A_Y.hxx>
+#include <A_Z.hxx>
+#include <B_1.hxx>
+#include <B_2.hxx>
+#include <C_1.hxx>
@@ -0,0 +1,14 @@
+#pragma once
+
+class A_W {
+public:
+  int Value() const;
+};
+
+#include <B_2.hxx>
+
+class A_X {
+public:
+  A_X();
+  B_2 Get() const;
+};
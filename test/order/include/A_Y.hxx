@@ -0,0 +1,6 @@
+#pragma once
+
+class A_Y {
+public:
+  int Value() const;
+};
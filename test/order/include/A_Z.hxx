@@ -0,0 +1,7 @@
+#pragma once
+#include <A_Y.hxx>
+
+class A_Z : public A_Y {
+public:
+  A_Z();
+};
@@ -0,0 +1,8 @@
+#pragma once
+
+class B_1 {
+public:
+  void Set(int value);
+};
+
+typedef B_1 B_Alias1;
@@ -0,0 +1,14 @@
+#pragma once
+
+enum B_Kind {
+  B_First,
+  B_Second
+};
+
+class B_2 {
+public:
+  double Distance() const;
+  B_Kind Kind() const;
+};
+
+typedef B_2 B_Alias2;
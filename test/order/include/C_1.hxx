@@ -0,0 +1,15 @@
+#pragma once
+#include <B_1.hxx>
+#include <A_Z.hxx>
+
+class C_1 {
+public:
+  B_1 Make() const;
+};
+
+class C_2 : public A_Z {
+public:
+  C_2();
+};
+
+typedef B_1 C_B1;
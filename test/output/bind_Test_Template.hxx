@@ -0,0 +1,35 @@
+/*
+This file is part of pyOCCT which provides Python bindings to the OpenCASCADE
+geometry kernel.
+
+Copyright (C) 2016-2018  Laughlin Research, LLC
+Copyright (C) 2019-2020  Trevor Laughlin and the pyOCCT contributors
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+*/
+#pragma once
+#include <Test_Template.h>
+#include <pyOCCT_Common.hxx>
+
+template <typename T, typename K=int>
+void bind_Test_Template(py::module &mod, std::string const &name, py::module_local const &local){
+
+py::class_<Test_Template<T, K>> cls_Test_Template(mod, name.c_str(), "Test template", local);
+
+// Constructors
+cls_Test_Template.def(py::init<>());
+
+}
+
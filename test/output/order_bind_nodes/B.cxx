@@ -0,0 +1,66 @@
+/*
+This file is part of pyOCCT which provides Python bindings to the OpenCASCADE
+geometry kernel.
+
+Copyright (C) 2016-2018  Laughlin Research, LLC
+Copyright (C) 2019-2020  Trevor Laughlin and the pyOCCT contributors
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+*/
+#include <pyOCCT_Common.hxx>
+#include <B_2.hxx>
+#include <B_1.hxx>
+
+PYBIND11_MODULE(B, mod) {
+
+
+// ENUM: B_KIND
+py::enum_<B_Kind>(mod, "B_Kind", "")
+	.value("B_First", B_Kind::B_First)
+	.value("B_Second", B_Kind::B_Second)
+	.export_values();
+
+
+// CLASS: B_2
+py::class_<B_2> cls_B_2(mod, "B_2", "");
+
+// Constructors
+cls_B_2.def(py::init<>());
+
+// Methods
+cls_B_2.def("Distance", (double (B_2::*)() const) &B_2::Distance, "");
+cls_B_2.def("Kind", (B_Kind (B_2::*)() const) &B_2::Kind, "");
+
+// TYPEDEF: B_ALIAS2
+if (py::hasattr(mod, "B_2")) {
+	mod.attr("B_Alias2") = mod.attr("B_2");
+}
+
+// CLASS: B_1
+py::class_<B_1> cls_B_1(mod, "B_1", "");
+
+// Constructors
+cls_B_1.def(py::init<>());
+
+// Methods
+cls_B_1.def("Set", (void (B_1::*)(int)) &B_1::Set, "", py::arg("value"));
+
+// TYPEDEF: B_ALIAS1
+if (py::hasattr(mod, "B_1")) {
+	mod.attr("B_Alias1") = mod.attr("B_1");
+}
+
+
+}
@@ -0,0 +1,56 @@
+/*
+This file is part of pyOCCT which provides Python bindings to the OpenCASCADE
+geometry kernel.
+
+Copyright (C) 2016-2018  Laughlin Research, LLC
+Copyright (C) 2019-2020  Trevor Laughlin and the pyOCCT contributors
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+*/
+#include <pyOCCT_Common.hxx>
+#include <B_1.hxx>
+#include <C_1.hxx>
+#include <A_Z.hxx>
+
+PYBIND11_MODULE(C, mod) {
+
+py::module::import("OCCT.A");
+
+// CLASS: C_1
+py::class_<C_1> cls_C_1(mod, "C_1", "");
+
+// Constructors
+cls_C_1.def(py::init<>());
+
+// Methods
+cls_C_1.def("Make", (B_1 (C_1::*)() const) &C_1::Make, "");
+
+// CLASS: C_2
+py::class_<C_2, A_Z> cls_C_2(mod, "C_2", "");
+
+// Constructors
+cls_C_2.def(py::init<>());
+
+// TYPEDEF: C_B1
+py::class_<B_1> cls_C_B1(mod, "C_B1", "", py::module_local());
+
+// Constructors
+cls_C_B1.def(py::init<>());
+
+// Methods
+cls_C_B1.def("Set", (void (B_1::*)(int)) &B_1::Set, "", py::arg("value"));
+
+
+}
@@ -0,0 +1,66 @@
+/*
+This file is part of pyOCCT which provides Python bindings to the OpenCASCADE
+geometry kernel.
+
+Copyright (C) 2016-2018  Laughlin Research, LLC
+Copyright (C) 2019-2020  Trevor Laughlin and the pyOCCT contributors
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+*/
+#include <pyOCCT_Common.hxx>
+#include <A_X.hxx>
+#include <B_2.hxx>
+#include <A_Y.hxx>
+#include <A_Z.hxx>
+
+PYBIND11_MODULE(A, mod) {
+
+py::module::import("OCCT.B");
+
+// CLASS: A_W
+py::class_<A_W> cls_A_W(mod, "A_W", "");
+
+// Constructors
+cls_A_W.def(py::init<>());
+
+// Methods
+cls_A_W.def("Value", (int (A_W::*)() const) &A_W::Value, "");
+
+// CLASS: A_X
+py::class_<A_X> cls_A_X(mod, "A_X", "");
+
+// Constructors
+cls_A_X.def(py::init<>());
+
+// Methods
+cls_A_X.def("Get", (B_2 (A_X::*)() const) &A_X::Get, "");
+
+// CLASS: A_Y
+py::class_<A_Y> cls_A_Y(mod, "A_Y", "");
+
+// Constructors
+cls_A_Y.def(py::init<>());
+
+// Methods
+cls_A_Y.def("Value", (int (A_Y::*)() const) &A_Y::Value, "");
+
+// CLASS: A_Z
+py::class_<A_Z, A_Y> cls_A_Z(mod, "A_Z", "");
+
+// Constructors
+cls_A_Z.def(py::init<>());
+
+
+}
@@ -0,0 +1,49 @@
+/*
+This file is part of pyOCCT which provides Python bindings to the OpenCASCADE
+geometry kernel.
+
+Copyright (C) 2016-2018  Laughlin Research, LLC
+Copyright (C) 2019-2020  Trevor Laughlin and the pyOCCT contributors
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation; either
+version 2.1 of the License, or (at your option) any later version.
+
+This library is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public
+License along with this library; if not, write to the Free Software
+Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+*/
+#include <pyOCCT_Common.hxx>
+#include <U_Class.hxx>
+
+PYBIND11_MODULE(U, mod) {
+
+
+// CLASS: U_BASE
+py::class_<U_Base> cls_U_Base(mod, "U_Base", "");
+
+// Constructors
+cls_U_Base.def(py::init<>());
+
+// TYPEDEF: U_ALIAS
+if (py::hasattr(mod, "U_Base")) {
+	mod.attr("U_Alias") = mod.attr("U_Base");
+}
+
+// CLASS: U_CLASS
+py::class_<U_Class, U_Base> cls_U_Class(mod, "U_Class", "");
+
+// Constructors
+cls_U_Class.def(py::init<>());
+
+// Methods
+cls_U_Class.def("Self", (const U_Class& (U_Class::*)() const) &U_Class::Self, "");
+
+
+}
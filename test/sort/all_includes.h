@@ -0,0 +1,2 @@
+#include <S_Tmpl.hxx>
+#include <S_Derived.hxx>
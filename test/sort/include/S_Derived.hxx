@@ -0,0 +1,21 @@
+#pragma once
+#include <S_Tmpl.hxx>
+
+class S_Derived : public S_Tmpl<int> {
+public:
+  S_Derived();
+};
+
+class S_First {
+public:
+  int Value() const;
+};
+
+class S_Last {
+public:
+  int Value() const;
+};
+
+typedef S_Tmpl<int> S_IntTmpl;
+
+typedef S_Derived S_Alias;
@@ -0,0 +1,7 @@
+#pragma once
+
+template <class T>
+class S_Tmpl {
+public:
+  T Value() const;
+};
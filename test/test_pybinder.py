@@ -17,9 +17,49 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+import json
+import os
+import pickle
+import re
+import shutil
+import sys
 import unittest
+from tempfile import TemporaryDirectory
+from unittest import mock
 
-from pybinder.core import Generator
+from clang.cindex import CursorKind
+
+from pybinder import clangext
+from pybinder.snapshot import MAGIC, Snapshot
+from pybinder.core import (CursorBinder, Generator, PatternSet, TypeBinder,
+                           is_cache_valid, stat_files, write_manifest)
+
+
+def generate_order(output_path, jobs=1, modules=None):
+    """
+    Generate the bindings of the modules in the "order" directory where a
+    header of one module includes a header of another.
+    """
+    gen = Generator('OCCT', {'OCCT': {'A', 'B', 'C'}}, './order/include/')
+    gen.reset_config()
+    gen.reset_modules()
+    gen.process_config('order/config.txt')
+    if modules is not None:
+        gen.select_modules(modules)
+    gen.parse('order/all_includes.h', jobs=jobs)
+    gen.generate(output_path)
+    return gen
+
+
+def read_output(output_path):
+    """
+    Read the generated files of an output directory.
+    """
+    files = {}
+    for filename in sorted(os.listdir(output_path)):
+        with open(os.path.join(output_path, filename)) as f:
+            files[filename] = f.read()
+    return files
 
 
 class TestBinder(unittest.TestCase):
@@ -66,5 +106,685 @@ class TestBinder(unittest.TestCase):
                         self.assertEqual(l1, l2)
 
 
+class TestIdentity(unittest.TestCase):
+    """
+    Tests for identifying declarations by their USR.
+    """
+
+    def setUp(self):
+        self.gen = Generator('OCCT', {'OCCT': {'U'}}, './usr/include/')
+        self.gen.reset_config()
+        self.gen.process_config('usr/config.txt')
+        self.gen.parse('usr/all_includes.h')
+
+    def test_forward_declaration(self):
+        classes = [binder for binder in self.gen.tu_binder.get_children()
+                   if binder.kind == CursorKind.CLASS_DECL and
+                   binder.spelling == 'U_Class']
+        self.assertEqual(len(classes), 2)
+        declaration, definition = classes
+        self.assertFalse(declaration.is_definition)
+        self.assertEqual(declaration.usr, definition.usr)
+        self.assertNotEqual(declaration, definition)
+        self.assertEqual(declaration.get_definition(), definition)
+        self.assertEqual(len({declaration, definition}), 2)
+        # Cursors without a USR are compared by their cursor
+        base, = definition.bases
+        ref, = [child for child in base.get_children() if child.is_type_ref]
+        self.assertEqual((base.usr, ref.usr), ('', ''))
+        self.assertNotEqual(base, ref)
+        self.assertEqual(ref, CursorBinder.from_cursor(ref.cursor))
+
+    def test_interning(self):
+        def find(spelling):
+            # New cursor objects on each call
+            return [c for c in self.gen.tu.cursor.get_children()
+                    if c.spelling == spelling and c.is_definition()][0]
+
+        # Keys from the structure fields and from the public API
+        for raw_keys in (True, False):
+            with mock.patch('pybinder.clangext.RAW_KEYS', raw_keys):
+                CursorBinder.clear_instances()
+                TypeBinder.clear_instances()
+                cursor = find('U_Class')
+                binder = CursorBinder.from_cursor(cursor)
+                self.assertIs(CursorBinder.from_cursor(find('U_Class')),
+                              binder)
+                self.assertIsNot(CursorBinder.from_cursor(find('U_Base')),
+                                 binder)
+                self.assertIs(TypeBinder.from_type(find('U_Class').type),
+                              TypeBinder.from_type(cursor.type))
+
+                # A reference to the class gives the same binder
+                method, = [c for c in cursor.get_children()
+                           if c.spelling == 'Self']
+                ref, = [c for c in method.walk_preorder()
+                        if c.kind == CursorKind.TYPE_REF]
+                self.assertIs(CursorBinder.from_cursor(ref.referenced),
+                              binder)
+
+                # Tokens are cached by extent, not by binder
+                tokens = CursorBinder(find('U_Class')).tokens
+                self.assertIs(CursorBinder(cursor).tokens, tokens)
+                self.assertEqual(tokens[:2], ('class', 'U_Class'))
+
+    def test_redeclaration(self):
+        # Repeated declarations of an entity are only bound once
+        self.gen.generate('./output/usr')
+        output = read_output('./output/usr')
+        self.assertEqual(output['U.cxx'].count('// TYPEDEF: U_ALIAS'), 1)
+        # The forward declaration is not taken for the definition after it
+        types = self.gen.get_module('U').types
+        self.assertEqual([binder.spelling for binder in types],
+                         ['U_Base', 'U_Alias', 'U_Class'])
+        self.assertTrue(types[2].is_definition)
+        self.assertEqual(output['U.cxx'].count('// CLASS: U_CLASS'), 1)
+        self.assertIn('cls_U_Class.def(py::init<>());', output['U.cxx'])
+
+
+class TestColumns(unittest.TestCase):
+    """
+    Tests for extracting cursors into columns.
+    """
+
+    def test_extract_columns(self):
+        gen = Generator('OCCT', {'OCCT': {'A', 'B', 'C'}}, './order/include/')
+        gen.reset_config()
+        gen.process_config('order/config.txt')
+        gen.parse('order/all_includes.h')
+        cursors = [c for c in gen.tu.cursor.get_children()
+                   if c.kind == CursorKind.CLASS_DECL and
+                   os.path.basename(c.location.file.name) == 'C_1.hxx']
+        self.assertEqual([c.spelling for c in cursors], ['C_1', 'C_2'])
+
+        columns = clangext.CursorColumns()
+        rows = []
+        for cursor in cursors:
+            first = len(columns)
+            clangext.extract_columns(cursor, usr=True, references=True,
+                                     columns=columns)
+            # The same rows as walking the children in preorder
+            stack = [(cursor, -1)]
+            while stack:
+                c, parent = stack.pop()
+                rows.append(c)
+                self.assertEqual(columns.parent[len(rows) - 1], parent)
+                stack.extend((child, len(rows) - 1) for child in
+                             reversed(list(c.get_children())))
+            self.assertEqual(columns.parent[first], -1)
+            self.assertEqual(columns.end[first], len(rows))
+        self.assertEqual(len(columns), len(rows))
+
+        strings, files = columns.strings, columns.files
+        for i, c in enumerate(rows):
+            self.assertEqual(columns.kind[i], c.kind.value)
+            self.assertEqual(files[columns.file[i]], c.location.file.name)
+            self.assertEqual(columns.line[i], c.location.line)
+            self.assertEqual(columns.access[i], c.access_specifier.value)
+            self.assertEqual(strings[columns.spelling[i]], c.spelling)
+            self.assertEqual(strings[columns.usr[i]], c.get_usr())
+            if c.kind.is_reference():
+                ref = c.referenced
+                self.assertEqual(strings[columns.referenced[i]],
+                                 ref.get_usr())
+                self.assertEqual(files[columns.referenced_file[i]],
+                                 ref.location.file.name)
+            else:
+                self.assertEqual(columns.referenced[i], -1)
+        kinds = {c.kind for c in rows}
+        self.assertIn(CursorKind.CXX_BASE_SPECIFIER, kinds)
+        self.assertIn(CursorKind.TYPE_REF, kinds)
+
+
+class TestSnapshot(unittest.TestCase):
+    """
+    Tests for exporting the traversed declarations to a snapshot.
+    """
+
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()
+        self.fname = os.path.join(self.tmp_dir.name, 'order.snap')
+        gen = Generator('OCCT', {'OCCT': {'A', 'B', 'C'}}, './order/include/')
+        gen.reset_config()
+        gen.reset_modules()
+        gen.process_config('order/config.txt')
+        gen.parse('order/all_includes.h')
+        gen.traverse()
+        gen.export_snapshot(self.fname)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_queries(self):
+        with Snapshot(self.fname) as snap:
+            names = [snap.spelling_of(row) for row in snap.classes()]
+            self.assertEqual(sorted(names), ['A_W', 'A_X', 'A_Y', 'A_Z',
+                                             'B_1', 'B_2', 'C_1', 'C_2'])
+            self.assertIsNone(snap.find('C_3'))
+
+            row = snap.find('C_1')
+            self.assertEqual(snap.kind_name(row), 'CLASS_DECL')
+            self.assertEqual(os.path.basename(snap.filename(row)), 'C_1.hxx')
+            self.assertEqual([snap.spelling_of(method)
+                              for method in snap.methods(row)], ['Make'])
+            self.assertEqual([os.path.basename(f) for f in snap.includes(row)],
+                             ['B_1.hxx'])
+
+            row = snap.find('C_2')
+            self.assertEqual([snap.kind_name(child)
+                              for child in snap.children(row)],
+                             ['CXX_BASE_SPECIFIER', 'CXX_ACCESS_SPEC_DECL',
+                              'CONSTRUCTOR'])
+            ctor, = snap.children(row, 'CONSTRUCTOR')
+            self.assertTrue(snap.is_public(ctor))
+            self.assertEqual([os.path.basename(f) for f in snap.includes(row)],
+                             ['A_Z.hxx'])
+
+            row = snap.find('B_Kind')
+            self.assertEqual(snap.kind_name(row), 'ENUM_DECL')
+            self.assertEqual(len(snap.children(row, 'ENUM_CONSTANT_DECL')), 2)
+
+    def replace(self, old, new):
+        # Same size so the header stays valid
+        self.assertEqual(len(old), len(new))
+        with open(self.fname, 'rb') as f:
+            data = f.read()
+        self.assertIn(old, data)
+        with open(self.fname, 'wb') as f:
+            f.write(data.replace(old, new, 1))
+
+    def test_invalid(self):
+        self.replace(b'"version": 1', b'"version": 9')
+        with self.assertRaisesRegex(ValueError, 'version'):
+            Snapshot(self.fname)
+        self.replace(b'"version": 9', b'"version": 1')
+        other = 'big' if sys.byteorder == 'little' else 'little'
+        old = '"byteorder": "{}"'.format(sys.byteorder)
+        new = '"byteorder": "{}"'.format(other).ljust(len(old))
+        self.replace(old.encode(), new.encode())
+        with self.assertRaisesRegex(ValueError, 'byte order'):
+            Snapshot(self.fname)
+        self.replace(MAGIC, b'X' * len(MAGIC))
+        with self.assertRaisesRegex(ValueError, 'Not a snapshot'):
+            Snapshot(self.fname)
+
+
+class TestIR(unittest.TestCase):
+    """
+    Tests for the intermediate representation of the bindings.
+    """
+
+    def test_save_load(self):
+        with TemporaryDirectory() as tmp_dir:
+            fname = os.path.join(tmp_dir, 'bindings.ir')
+            gen = Generator('OCCT', {'OCCT': {'Test', 'TestSplit'}},
+                            './include/')
+            gen.reset_config()
+            gen.process_config('config.txt')
+            gen.parse('all_includes.h')
+            gen.generate(os.path.join(tmp_dir, 'parsed'))
+            gen.save_ir(fname)
+
+            # Without parsing or the configuration
+            gen = Generator('OCCT', {'OCCT': {'Test', 'TestSplit'}},
+                            './include/')
+            gen.reset_config()
+            gen.reset_modules()
+            gen.load_ir(fname)
+            output_path = os.path.join(tmp_dir, 'loaded')
+            gen.bind_templates(output_path)
+            gen.bind(output_path)
+            output = read_output(output_path)
+            self.assertEqual(output,
+                             read_output(os.path.join(tmp_dir, 'parsed')))
+            for filename in ('Test.cxx', 'bind_Test_Template.hxx',
+                             'TestSplit.cxx', 'TestSplit_2.cxx'):
+                with open(f'expected/{filename}') as f:
+                    for l1, l2 in zip(output[filename].splitlines(), f):
+                        self.assertEqual(l1, l2.rstrip('\n'))
+
+    def test_read_only(self):
+        # Binding does not change the nodes so it can be repeated
+        with TemporaryDirectory() as tmp_dir:
+            gen = Generator('OCCT', {'OCCT': {'A', 'B', 'C'}},
+                            './order/include/')
+            gen.reset_config()
+            gen.reset_modules()
+            gen.process_config('order/config.txt')
+            gen.parse('order/all_includes.h')
+            gen.generate(os.path.join(tmp_dir, 'parsed'))
+            ir = gen.build_ir()
+            data = pickle.dumps(ir)
+            for name in ('first', 'second'):
+                output_path = os.path.join(tmp_dir, name)
+                gen.bind_templates(output_path)
+                gen.bind(output_path)
+                self.assertEqual(pickle.dumps(ir), data)
+            output = read_output(os.path.join(tmp_dir, 'first'))
+            self.assertEqual(output,
+                             read_output(os.path.join(tmp_dir, 'second')))
+            self.assertEqual(output,
+                             read_output(os.path.join(tmp_dir, 'parsed')))
+
+
+class TestPatternSet(unittest.TestCase):
+    """
+    Tests for the excluded function patterns.
+    """
+
+    def test_changed_patterns(self):
+        patterns = PatternSet({'Foo::Bar'})
+        self.assertTrue(patterns.match('Foo::Bar'))
+        self.assertFalse(patterns.match('Foo::Baz'))
+        patterns.add('Foo::B*z')
+        self.assertTrue(patterns.match('Foo::Baz'))
+        patterns -= {'Foo::Bar'}
+        self.assertFalse(patterns.match('Foo::Bar'))
+        patterns.clear()
+        self.assertFalse(patterns.match('Foo::Baz'))
+
+
+class TestSort(unittest.TestCase):
+    """
+    Tests for sorting the types of a module by their dependencies.
+    """
+
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read_order(self, filename):
+        with open(os.path.join(self.tmp_dir.name, filename)) as f:
+            return re.findall(r'// (?:CLASS|TYPEDEF): (\w+)\n', f.read())
+
+    def test_dependencies(self):
+        # The derived class comes before the typedef binding its base and
+        # the priorities only order the types that are ready
+        gen = Generator('OCCT', {'OCCT': {'S'}}, './sort/include/')
+        gen.reset_config()
+        gen.reset_modules()
+        gen.process_config('sort/config.txt')
+        gen.parse('sort/all_includes.h')
+        gen.generate(self.tmp_dir.name)
+        mod = gen.get_module('S')
+        self.assertEqual([binder.spelling for binder in mod.types],
+                         ['S_Derived', 'S_First', 'S_Last', 'S_IntTmpl',
+                          'S_Alias'])
+        self.assertEqual(self.read_order('S.cxx'),
+                         ['S_LAST', 'S_FIRST', 'S_INTTMPL', 'S_DERIVED',
+                          'S_ALIAS'])
+
+    def test_foreign_alias(self):
+        # A typedef of a class of another module does not bind the class
+        generate_order(self.tmp_dir.name)
+        self.assertEqual(self.read_order('C.cxx'), ['C_1', 'C_2', 'C_B1'])
+        self.assertEqual(self.read_order('B.cxx'), ['B_2', 'B_ALIAS2', 'B_1',
+                                                    'B_ALIAS1'])
+
+
+class TestParallel(unittest.TestCase):
+    """
+    Tests for parsing the main include file split by module or only the
+    headers of selected modules.
+    """
+
+    def test_parallel_parse(self):
+        generate_order('./output/order_serial')
+        generate_order('./output/order_parallel', jobs=3)
+        serial = read_output('./output/order_serial')
+        self.assertEqual(sorted(serial), ['A.cxx', 'B.cxx', 'C.cxx'])
+        self.assertEqual(serial, read_output('./output/order_parallel'))
+
+    def test_parallel_bind(self):
+        gen = generate_order('./output/order_bind_serial')
+        expected = read_output('./output/order_bind_serial')
+        gen.generate('./output/order_bind_nodes', jobs=2)
+        self.assertEqual(read_output('./output/order_bind_nodes'), expected)
+
+    def test_parallel_bind_split(self):
+        # Class templates and split modules
+        gen = Generator('OCCT', {'OCCT': {'Test', 'TestSplit'}}, './include/')
+        gen.reset_config()
+        gen.process_config('config.txt')
+        gen.parse('all_includes.h')
+        with TemporaryDirectory() as tmp_dir:
+            serial_path = os.path.join(tmp_dir, 'serial')
+            parallel_path = os.path.join(tmp_dir, 'parallel')
+            gen.generate(serial_path)
+            gen.generate(parallel_path, jobs=3)
+            serial = read_output(serial_path)
+            self.assertEqual(sorted(serial),
+                             ['Test.cxx', 'TestSplit.cxx', 'TestSplit_2.cxx',
+                              'bind_Test_Template.hxx'])
+            self.assertEqual(read_output(parallel_path), serial)
+
+    def test_select_modules(self):
+        generate_order('./output/order_all')
+        expected = read_output('./output/order_all')
+        # Module A is not parsed so its import of B does not cover the import
+        # of C
+        import_a = 'py::module::import("OCCT.A");\n'
+        import_b = 'py::module::import("OCCT.B");\n'
+        self.assertNotIn(import_b, expected['C.cxx'])
+        expected['C.cxx'] = expected['C.cxx'].replace(import_a,
+                                                      import_b + import_a)
+        for jobs in (1, 2):
+            output_path = './output/order_selected_{}'.format(jobs)
+            generate_order(output_path, jobs, 'B,C')
+            self.assertEqual(read_output(output_path),
+                             {'B.cxx': expected['B.cxx'],
+                              'C.cxx': expected['C.cxx']})
+
+    def test_select_no_module(self):
+        gen = Generator('OCCT', {'OCCT': {'A', 'B', 'C'}}, './order/include/')
+        with self.assertWarns(RuntimeWarning):
+            self.assertEqual(gen.select_modules('B, D*'), {'B'})
+
+
+class TestCache(unittest.TestCase):
+    """
+    Tests for the cache of parsed translation units.
+    """
+
+    def test_cache(self):
+        with TemporaryDirectory() as tmp_dir:
+            inc = os.path.join(tmp_dir, 'include')
+            shutil.copytree('./order/include', inc)
+            cache_dir = os.path.join(tmp_dir, 'cache')
+            gen = Generator('OCCT', {'OCCT': {'A', 'B', 'C'}}, inc)
+            gen.reset_config()
+            gen.process_config('order/config.txt')
+            gen.parse('order/all_includes.h', cache_dir=cache_dir)
+            fname, = [os.path.join(cache_dir, name)
+                      for name in os.listdir(cache_dir)
+                      if name.endswith('.ast')]
+            self.assertTrue(is_cache_valid(fname))
+
+            # Recorded as they were before parsing
+            with open(fname + '.json') as f:
+                files = json.load(f)['files']
+            path = os.path.abspath(os.path.join(inc, 'B_1.hxx'))
+            st = os.stat(path)
+            self.assertIn([path, st.st_mtime_ns, st.st_size], files)
+            stats = stat_files([inc])
+            stats[path] = (st.st_mtime_ns - 1, st.st_size)
+            write_manifest(gen.tu, fname, stats, 0)
+            self.assertFalse(is_cache_valid(fname))
+
+            # Files that are not known before parsing must be older
+            stats = stat_files([inc])
+            del stats[path]
+            write_manifest(gen.tu, fname, stats, st.st_mtime_ns)
+            self.assertFalse(is_cache_valid(fname))
+            write_manifest(gen.tu, fname, stats, st.st_mtime_ns + 1)
+            self.assertTrue(is_cache_valid(fname))
+
+            # Headers in subdirectories are recorded before parsing too
+            os.makedirs(os.path.join(inc, 'nested'))
+            nested = os.path.join(inc, 'nested', 'N_1.hxx')
+            with open(nested, 'w') as f:
+                f.write('#pragma once\nclass N_1 {};\n')
+            with open(os.path.join(inc, 'B_2.hxx'), 'a') as f:
+                f.write('\n#include <nested/N_1.hxx>\n')
+            self.assertIn(nested, stat_files([inc]))
+            self.assertFalse(is_cache_valid(fname))
+            gen.parse('order/all_includes.h', cache_dir=cache_dir)
+            with open(fname + '.json') as f:
+                files = json.load(f)['files']
+            st = os.stat(nested)
+            self.assertIn([nested, st.st_mtime_ns, st.st_size], files)
+            self.assertTrue(is_cache_valid(fname))
+            with open(nested, 'a') as f:
+                f.write('class N_2 {};\n')
+            self.assertFalse(is_cache_valid(fname))
+
+            # A changed header is parsed again
+            with open(path, 'a') as f:
+                f.write('\nclass B_3 {};\n')
+            self.assertFalse(is_cache_valid(fname))
+            gen.parse('order/all_includes.h', cache_dir=cache_dir)
+            gen.generate(os.path.join(tmp_dir, 'output'))
+            with open(os.path.join(tmp_dir, 'output', 'B.cxx')) as f:
+                self.assertIn('CLASS: B_3', f.read())
+
+
+class TestLean(unittest.TestCase):
+    """
+    Tests for parsing without function bodies and the detailed preprocessing
+    record.
+    """
+
+    def setUp(self):
+        self.gen = Generator('OCCT', {'OCCT': {'M'}}, './macro/include/')
+        self.gen.reset_config()
+        self.gen.process_config('macro/config.txt')
+
+    def test_handle_macros(self):
+        # All the macro instantiations of the preprocessing record
+        self.gen.parse('macro/all_includes.h')
+        macros = self.gen.find_handle_macros([self.gen.tu_binder])
+        self.assertEqual(sorted(macros),
+                         ['M_HArray', 'M_HExcluded', 'N_HArray'])
+        self.gen.generate('./output/macro')
+
+        # Only the headers of the available modules are scanned
+        self.gen.parse('macro/all_includes.h', lean=True)
+        self.assertEqual(sorted(self.gen.scan_handle_macros()), ['M_HArray'])
+        self.gen.generate('./output/macro_lean')
+        output = read_output('./output/macro')
+        self.assertIn('bind_Define_HArray1<M_HArray, M_Array>',
+                      output['M.cxx'])
+        self.assertEqual(output, read_output('./output/macro_lean'))
+
+    def test_load(self):
+        with TemporaryDirectory() as tmp_dir:
+            fname = os.path.join(tmp_dir, 'lean.ast')
+            self.gen.parse('macro/all_includes.h', lean=True)
+            self.gen.generate(os.path.join(tmp_dir, 'parsed'))
+            self.gen.save(fname)
+            self.gen.load(fname, lean=True)
+            self.gen.generate(os.path.join(tmp_dir, 'loaded'))
+            self.assertEqual(read_output(os.path.join(tmp_dir, 'parsed')),
+                             read_output(os.path.join(tmp_dir, 'loaded')))
+
+
+class TestImports(unittest.TestCase):
+    """
+    Tests for the import graph of the modules.
+    """
+
+    def setUp(self):
+        self.gen = Generator('OCCT', {'OCCT': {'A', 'B', 'C', 'D', 'E'}},
+                             './order/include/')
+        self.gen.reset_config()
+        self.gen.reset_modules()
+
+    def set_imports(self, imports):
+        for name in sorted(imports):
+            self.gen.get_module(name).imports = imports[name]
+
+    def test_circular(self):
+        self.set_imports({'A': ['B'], 'B': ['C', 'D'], 'C': ['A'],
+                          'D': ['D'], 'E': ['A']})
+        with TemporaryDirectory() as tmp_dir:
+            fname = os.path.join(tmp_dir, 'circular.json')
+            groups = self.gen.check_circular(fname)
+            with open(fname) as f:
+                self.assertEqual(json.load(f), [
+                    {'modules': ['A', 'B', 'C'],
+                     'edges': [['A', 'B'], ['B', 'C'], ['C', 'A']],
+                     'cycle': ['A', 'B', 'C', 'A']},
+                    {'modules': ['D'], 'edges': [['D', 'D']],
+                     'cycle': ['D', 'D']}])
+        self.assertEqual(len(groups), 2)
+
+    def test_no_circular(self):
+        self.set_imports({'A': ['B', 'C'], 'B': ['C'], 'C': [], 'D': ['A'],
+                          'E': []})
+        self.assertEqual(self.gen.find_circular(), [])
+
+    def test_reduce_imports(self):
+        self.set_imports({'A': ['B', 'C'], 'B': ['C'], 'C': [],
+                          'D': ['E', 'C'], 'E': ['D', 'C']})
+        self.gen.reduce_imports()
+        reduced = {mod.name: mod.reduced_imports for mod in self.gen.modules}
+        # C is imported by B so A only calls B, but the imports in the cycle
+        # between D and E are all kept
+        self.assertEqual(reduced, {'A': ['B'], 'B': ['C'], 'C': [],
+                                   'D': ['E', 'C'], 'E': ['D', 'C']})
+
+    def test_reduce_lazy_imports(self):
+        self.set_imports({'A': ['B', 'C'], 'B': ['C'], 'C': [], 'D': [],
+                          'E': []})
+        # A guarded import does not import anything on initialization
+        self.gen.get_module('A').lazy_imports = ['B']
+        self.gen.reduce_imports()
+        self.assertEqual(self.gen.get_module('A').reduced_imports, ['C'])
+
+
+class TestLazyImports(unittest.TestCase):
+    """
+    Tests for guarding the imports only needed by some methods.
+    """
+
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()
+        self.gen = Generator('OCCT', {'OCCT': {'G', 'U'}}, './lazy/include/')
+        self.gen.reset_config()
+        self.gen.reset_modules()
+        self.gen.process_config('lazy/config.txt')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lazy_imports(self):
+        self.gen.parse('lazy/all_includes.h')
+        self.gen.generate(self.tmp_dir.name)
+        mod = self.gen.get_module('U')
+        self.assertEqual(mod.lazy_imports, ['G'])
+        self.assertEqual(mod.reduced_imports, [])
+        guards = {method.qualified_name: names
+                  for method, names in mod.method_guards.items()}
+        self.assertEqual(guards, {'U_Base::Length': ['G'],
+                                  'U_Obj::Get': ['G']})
+
+        # Both halves of the split module declare the guard at file scope
+        output = read_output(self.tmp_dir.name)
+        struct = 'struct ImportG{\n'
+        for filename, start in (('U.cxx', 'PYBIND11_MODULE(U, mod)'),
+                                ('U_2.cxx', 'void bind_U_2(')):
+            src = output[filename]
+            self.assertEqual(src.count(struct), 1)
+            self.assertLess(src.index(struct), src.index(start))
+        self.assertIn('&U_Obj::Get, "", py::call_guard<ImportG>());',
+                      output['U_2.cxx'])
+
+    def test_manual_guards(self):
+        # Without automatic guards a configured guard is written after the
+        # imports of the module only
+        self.gen.reset_config()
+        self.gen.process_config('order/config.txt')
+        self.gen.split.add('U')
+        self.gen.import_guards['U'] = {'G'}
+        self.assertFalse(self.gen.auto_import_guards)
+        self.gen.parse('lazy/all_includes.h')
+        self.gen.generate(self.tmp_dir.name)
+        self.assertEqual(self.gen.get_module('U').lazy_imports, [])
+        output = read_output(self.tmp_dir.name)
+        src = output['U.cxx']
+        self.assertEqual(src.count('struct ImportG{\n'), 1)
+        self.assertLess(src.index('PYBIND11_MODULE(U, mod)'),
+                        src.index('struct ImportG{\n'))
+        self.assertEqual(src.count('py::module::import("OCCT.G");'), 1)
+        self.assertNotIn('ImportG', output['U_2.cxx'])
+        self.assertNotIn('call_guard', src + output['U_2.cxx'])
+
+    def test_template_imports(self):
+        # The class template is bound without call guards
+        self.gen.parse('lazy/template_includes.h')
+        self.gen.generate(self.tmp_dir.name)
+        mod = self.gen.get_module('U')
+        self.assertEqual(mod.lazy_imports, [])
+        self.assertEqual(mod.reduced_imports, ['G'])
+        self.assertEqual(mod.method_guards, {})
+        output = read_output(self.tmp_dir.name)
+        self.assertIn('py::module::import("OCCT.G");', output['U.cxx'])
+        self.assertNotIn('ImportG', output['U.cxx'] + output['U_2.cxx'])
+
+
+class TestWatch(unittest.TestCase):
+    """
+    Tests for regenerating the bindings when headers change.
+    """
+
+    def setUp(self):
+        self.tmp_dir = TemporaryDirectory()
+        self.inc = os.path.join(self.tmp_dir.name, 'include')
+        shutil.copytree('./order/include', self.inc)
+        self.config = os.path.join(self.tmp_dir.name, 'config.txt')
+        shutil.copy('./order/config.txt', self.config)
+        self.output_path = os.path.join(self.tmp_dir.name, 'output')
+        self.gen = Generator('OCCT', {'OCCT': {'A', 'B', 'C'}}, self.inc)
+        self.gen.reset_config()
+        self.gen.process_config(self.config)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def append(self, filename, txt):
+        with open(os.path.join(self.inc, filename), 'a') as f:
+            f.write(txt)
+
+    def test_affected_modules(self):
+        self.gen.parse('order/all_includes.h')
+        self.gen.generate(self.output_path)
+        self.assertEqual(self.gen.affected_modules(['B_2.hxx']), {'A', 'B'})
+        # C_2 derives from A_Z which derives from A_Y
+        self.assertEqual(self.gen.affected_modules(['A_Y.hxx']), {'A', 'C'})
+
+    def test_regenerate(self):
+        self.gen.parse('order/all_includes.h')
+        self.gen.generate(self.output_path)
+        expected = read_output(self.output_path)
+        self.append('B_2.hxx', '\nclass B_3 {};\n')
+        self.gen.reparse('order/all_includes.h', {})
+        self.assertEqual(self.gen.regenerate(self.output_path, {'B'}), {'B'})
+        output = read_output(self.output_path)
+        self.assertIn('CLASS: B_3', output['B.cxx'])
+        self.assertEqual(output['A.cxx'], expected['A.cxx'])
+
+        # The same as generating all the modules
+        self.gen.generate(os.path.join(self.tmp_dir.name, 'all'))
+        self.assertEqual(output,
+                         read_output(os.path.join(self.tmp_dir.name, 'all')))
+
+    def test_watch(self):
+        def edit(interval):
+            edits.pop(0)()
+
+        def write_config(txt=''):
+            shutil.copy('./order/config.txt', self.config)
+            with open(self.config, 'a') as f:
+                f.write(txt)
+
+        edits = [
+            lambda: self.append('B_2.hxx', '\nclass B_3 {};\n'),
+            # Errors are logged and the next change is watched for
+            lambda: write_config('+arg broken\n'),
+            lambda: write_config() or
+            self.append('C_1.hxx', '\nclass C_3 {};\n'),
+        ]
+        self.gen.parse('order/all_includes.h', jobs=2)
+        with mock.patch('pybinder.core.time.sleep', edit):
+            self.gen.watch('order/all_includes.h', self.output_path,
+                           [self.config], interval=0, count=3)
+        self.assertFalse(edits)
+        output = read_output(self.output_path)
+        self.assertIn('CLASS: B_3', output['B.cxx'])
+        self.assertIn('CLASS: C_3', output['C.cxx'])
+
+
 if __name__ == '__main__':
     unittest.main()
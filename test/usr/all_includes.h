@@ -0,0 +1 @@
+#include <U_Class.hxx>
@@ -0,0 +1,17 @@
+#pragma once
+
+class U_Class;
+
+class U_Base {
+public:
+  U_Base();
+};
+
+typedef U_Base U_Alias;
+typedef U_Base U_Alias;
+
+class U_Class : public U_Base {
+public:
+  U_Class();
+  const U_Class& Self() const;
+};